@@ -0,0 +1,204 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import jsonify, request, session
+
+# ================== ADMISSION CONTROL ==================
+# Two checks run before a request is handled:
+#
+#   rate         a token bucket per (client, scope), refilled at `rate`
+#                requests/second up to `burst`. An empty bucket means 429.
+#   concurrency  a semaphore per route or table scope, shared by all
+#                clients. A request waits up to `queue_timeout` seconds for
+#                a slot, then gets 503.
+#
+# Both answer with Retry-After, so an overloaded server turns extra work away
+# at once instead of letting it queue for pooled connections.
+#
+# A request is subject to up to three scopes, each with its own limits:
+#   'client'            every request from one client
+#   'route:<rule>'      e.g. 'route:/getTable'
+#   'table:<name>'      requests naming a VALID_TABLE entry as table_name
+# A limit dict may set any of rate, burst, concurrency and queue_timeout
+# (concurrency is ignored for 'client'); keys left out are not enforced.
+
+
+class RateLimited(Exception):
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f'Rate limit exceeded for {scope}')
+        self.retry_after = retry_after
+
+
+class Overloaded(Exception):
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f'Too many concurrent requests for {scope}')
+        self.retry_after = retry_after
+
+
+def retry_after_header(seconds):
+    return str(max(1, math.ceil(seconds)))
+
+
+class TokenBucket:
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    # Take one token; returns 0 on success, else seconds until one is available
+    def take(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionControl:
+
+    def __init__(self, client_limit=None, routes=None, tables=None, max_buckets=100000):
+        self.limits = {'client': client_limit or {}}
+        for route, limit in (routes or {}).items():
+            self.limits[f'route:{route}'] = limit
+        for table, limit in (tables or {}).items():
+            self.limits[f'table:{table}'] = limit
+        self.max_buckets = max_buckets
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()   # (client, scope) -> TokenBucket, least recently used first
+        self._semaphores = {
+            scope: threading.BoundedSemaphore(limit['concurrency'])
+            for scope, limit in self.limits.items() if scope != 'client' and limit.get('concurrency')
+        }
+        self._in_flight = {scope: 0 for scope in self._semaphores}
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+
+    # Scopes that apply to a request, most general first
+    def scopes(self, route=None, table=None):
+        scopes = ['client']
+        if route is not None and f'route:{route}' in self.limits:
+            scopes.append(f'route:{route}')
+        if table is not None and f'table:{table}' in self.limits:
+            scopes.append(f'table:{table}')
+        return scopes
+
+    def check_rate(self, client, scopes):
+        now = time.monotonic()
+        with self._lock:
+            for scope in scopes:
+                limit = self.limits[scope]
+                if not limit.get('rate'):
+                    continue
+                key = (client, scope)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(
+                        limit['rate'], limit.get('burst', limit['rate']), now)
+                    if len(self._buckets) > self.max_buckets:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(key)
+                wait = bucket.take(now)
+                if wait:
+                    self.rate_limited += 1
+                    raise RateLimited(scope, wait)
+
+    # Take a concurrency slot in every scope that has one. Returns the scopes
+    # held, to pass to release(). blocking=False never waits (for event loops).
+    def acquire(self, scopes, blocking=True):
+        held = []
+        for scope in scopes:
+            semaphore = self._semaphores.get(scope)
+            if semaphore is None:
+                continue
+            timeout = self.limits[scope].get('queue_timeout', 0) if blocking else 0
+            acquired = semaphore.acquire(timeout=timeout) if timeout > 0 else semaphore.acquire(blocking=False)
+            if not acquired:
+                self.release(held)
+                with self._lock:
+                    self.overloaded += 1
+                raise Overloaded(scope, max(timeout, 1))
+            held.append(scope)
+            with self._lock:
+                self._in_flight[scope] += 1
+        with self._lock:
+            self.admitted += 1
+        return held
+
+    def release(self, held):
+        for scope in held:
+            with self._lock:
+                self._in_flight[scope] -= 1
+            self._semaphores[scope].release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'admitted': self.admitted,
+                'rate_limited': self.rate_limited,
+                'overloaded': self.overloaded,
+                'clients_tracked': len(self._buckets),
+                'in_flight': dict(self._in_flight),
+                'limits': self.limits,
+            }
+
+
+# Who a request counts against: the logged-in user, else the client address
+def client_key(user_id, remote_addr):
+    return f'user:{user_id}' if user_id is not None else f'ip:{remote_addr}'
+
+
+def table_of(data):
+    table = (data or {}).get('table_name')
+    return table.lower() if isinstance(table, str) else None
+
+
+def overload_response(e, status):
+    response = jsonify({'error': str(e)})
+    response.status_code = status
+    response.headers['Retry-After'] = retry_after_header(e.retry_after)
+    return response
+
+
+def init_app(app, control):
+
+    @app.before_request
+    def admit_request():
+        if request.method == 'OPTIONS' or request.endpoint == 'static':
+            return
+        if request.method == 'GET':
+            data = request.args
+        else:
+            data = request.get_json(silent=True, force=True)
+            data = data if isinstance(data, dict) else None
+        route = request.url_rule.rule if request.url_rule else None
+        scopes = control.scopes(route, table_of(data))
+        control.check_rate(client_key(session.get('user_id'), request.remote_addr), scopes)
+        # Streamed responses (stream_with_context) hold their slot until the stream ends
+        request.admission_held = control.acquire(scopes)
+
+    @app.teardown_request
+    def release_request(exc):
+        held = getattr(request, 'admission_held', None)
+        if held:
+            control.release(held)
+            request.admission_held = None
+
+    @app.errorhandler(RateLimited)
+    def handle_rate_limited(e):
+        return overload_response(e, 429)
+
+    @app.errorhandler(Overloaded)
+    def handle_overloaded(e):
+        return overload_response(e, 503)
@@ -0,0 +1,342 @@
+import threading
+
+import numpy as np
+
+# ================== MATCH ANALYTICS ==================
+# Head-to-head records, recent form and win rates computed from an in-memory
+# columnar copy of MatchInfo (one NumPy array per column) instead of pulling
+# the table to the client.
+#
+# Matches live in two blocks with the same layout:
+#   base   the bulk of the table, built by load()
+#   delta  matches written since, rebuilt on the next query after a write
+# refresh() re-reads changed matches: the old copy is masked out of base (or
+# dropped from delta) and the current one goes into delta. Once delta holds
+# COMPACT_AT matches it is merged into base. Queries run on both blocks and
+# merge the results.
+#
+# Each block is sorted by match time and has two indexes, both positions into
+# the block in time order:
+#   pair_keys/pair_order  one entry per match, keyed by the unordered team pair
+#   team_keys/team_order  two entries per match, one per team
+# so a head-to-head or form query is a searchsorted plus a slice.
+#
+# Ids (teams, games, tournaments) are mapped to dense int32 codes; -1 means NULL.
+
+COMPACT_AT = 10000
+
+MATCH_COLUMNS = ('match_id', 'match_date_time', 'match_rounds', 'team1_id', 'team2_id',
+                 'match_winner_id', 'game_id', 'tournament_id')
+
+MATCHES_QUERY = f"SELECT {', '.join(MATCH_COLUMNS)} FROM MatchInfo"
+
+
+class Codes:
+
+    def __init__(self):
+        self.codes = {}
+        self.ids = []
+
+    def code(self, id):
+        if id is None:
+            return -1
+        code = self.codes.get(id)
+        if code is None:
+            code = self.codes[id] = len(self.ids)
+            self.ids.append(id)
+        return code
+
+    # Code for a query value; None if the id has never been seen
+    def find(self, id):
+        return self.codes.get(id)
+
+
+class Block:
+
+    def __init__(self, rows):
+        # rows: [(match_id, time, rounds, team1, team2, winner, game, tournament), ...] with coded ids
+        count = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * 8
+        time = np.array(columns[1], dtype='datetime64[s]') if count else np.empty(0, 'datetime64[s]')
+        match_ids = np.array(columns[0], dtype=object) if count else np.empty(0, object)
+        order = np.lexsort((match_ids.astype(str), time)) if count else np.empty(0, np.int64)
+
+        self.match_id = match_ids[order]
+        self.time = time[order]
+        self.rounds = np.array([-1 if r is None else r for r in columns[2]], dtype=np.int32)[order] \
+            if count else np.empty(0, np.int32)
+        self.team1, self.team2, self.winner, self.game, self.tournament = (
+            np.array(columns[i], dtype=np.int32)[order] if count else np.empty(0, np.int32)
+            for i in range(3, 8))
+        self.alive = np.ones(count, dtype=bool)
+        self.positions = {id: i for i, id in enumerate(self.match_id)}
+
+        pair_keys = pair_key(self.team1, self.team2)
+        self.pair_order = np.argsort(pair_keys, kind='stable')
+        self.pair_keys = pair_keys[self.pair_order]
+
+        team_keys = np.concatenate((self.team1, self.team2))
+        team_positions = np.concatenate((np.arange(count), np.arange(count)))
+        # Sort by team, then by position so each team's slice is in time order
+        order = np.lexsort((team_positions, team_keys))
+        self.team_order = team_positions[order]
+        self.team_keys = team_keys[order]
+
+    def __len__(self):
+        return len(self.match_id)
+
+    def rows(self):
+        alive = np.flatnonzero(self.alive)
+        return list(zip(self.match_id[alive], self.time[alive].astype(object), self.rounds[alive],
+                        self.team1[alive], self.team2[alive], self.winner[alive],
+                        self.game[alive], self.tournament[alive]))
+
+    def _slice(self, keys, order, key):
+        lo = np.searchsorted(keys, key, 'left')
+        hi = np.searchsorted(keys, key, 'right')
+        positions = order[lo:hi]
+        return positions[self.alive[positions]]
+
+    def pair_positions(self, team_a, team_b):
+        return self._slice(self.pair_keys, self.pair_order, pair_key(team_a, team_b))
+
+    def team_positions(self, team):
+        return self._slice(self.team_keys, self.team_order, team)
+
+    # Narrow positions by game, tournament and time range
+    def filter(self, positions, game=None, tournament=None, since=None, until=None):
+        mask = np.ones(len(positions), dtype=bool)
+        if game is not None:
+            mask &= self.game[positions] == game
+        if tournament is not None:
+            mask &= self.tournament[positions] == tournament
+        if since is not None:
+            mask &= self.time[positions] >= np.datetime64(since, 's')
+        if until is not None:
+            mask &= self.time[positions] < np.datetime64(until, 's')
+        return positions[mask]
+
+
+def pair_key(team_a, team_b):
+    low = np.minimum(team_a, team_b).astype(np.int64)
+    high = np.maximum(team_a, team_b).astype(np.int64)
+    return (low << 32) | (high & 0xFFFFFFFF)
+
+
+class MatchAnalytics:
+
+    def __init__(self, compact_at=COMPACT_AT):
+        self._lock = threading.Lock()
+        self.compact_at = compact_at
+        self.teams = Codes()
+        self.games = Codes()
+        self.tournaments = Codes()
+        self._base = Block([])
+        self._delta_rows = {}       # match_id -> coded row
+        self._delta = Block([])
+        self._delta_stale = False
+        self.loaded = False
+
+    def _code_row(self, row):
+        return (row['match_id'], row['match_date_time'], row['match_rounds'],
+                self.teams.code(row['team1_id']), self.teams.code(row['team2_id']),
+                self.teams.code(row['match_winner_id']), self.games.code(row['game_id']),
+                self.tournaments.code(row['tournament_id']))
+
+    def load(self, cursor):
+        cursor.execute(MATCHES_QUERY)
+        return self.load_rows(cursor.fetchall())
+
+    # Replace everything with rows shaped like MATCH_COLUMNS
+    def load_rows(self, rows):
+        with self._lock:
+            self.teams, self.games, self.tournaments = Codes(), Codes(), Codes()
+            self._base = Block([self._code_row(row) for row in rows])
+            self._delta_rows = {}
+            self._delta = Block([])
+            self._delta_stale = False
+            self.loaded = True
+            return len(self._base)
+
+    # Re-read matches after a write to MatchInfo; other tables are ignored
+    def refresh(self, cursor, table_name, ids):
+        ids = [id for id in ids if id is not None]
+        if table_name != 'matchinfo' or not ids:
+            return
+        cursor.execute(MATCHES_QUERY + f" WHERE match_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        self.apply(ids, cursor.fetchall())
+
+    # ids: matches that were written; rows: their current rows (missing = deleted)
+    def apply(self, ids, rows):
+        current = {row['match_id']: row for row in rows}
+        with self._lock:
+            for id in ids:
+                position = self._base.positions.get(id)
+                if position is not None:
+                    self._base.alive[position] = False
+                self._delta_rows.pop(id, None)
+                if id in current:
+                    self._delta_rows[id] = self._code_row(current[id])
+            self._delta_stale = True
+            if len(self._delta_rows) >= self.compact_at:
+                self._base = Block(self._base.rows() + list(self._delta_rows.values()))
+                self._delta_rows = {}
+                self._delta = Block([])
+                self._delta_stale = False
+
+    # (teams, games, tournaments, (base, delta)) taken together: load_rows()
+    # swaps in new Codes along with new blocks, so a query must decode the
+    # blocks it reads with the Codes they were built with
+    def _snapshot(self):
+        with self._lock:
+            if self._delta_stale:
+                self._delta = Block(list(self._delta_rows.values()))
+                self._delta_stale = False
+            return self.teams, self.games, self.tournaments, (self._base, self._delta)
+
+    # Matches of each block picked by select(block), merged in time order as
+    # (time, match_id, team1, team2, winner) arrays
+    def _collect(self, blocks, select):
+        parts = []
+        for block in blocks:
+            positions = select(block)
+            parts.append((block.time[positions], block.match_id[positions], block.team1[positions],
+                          block.team2[positions], block.winner[positions]))
+        time, match_id, team1, team2, winner = (np.concatenate(column) for column in zip(*parts))
+        order = np.argsort(time, kind='stable')
+        return time[order], match_id[order], team1[order], team2[order], winner[order]
+
+    @staticmethod
+    def _filters(games, tournaments, game_id, tournament_id):
+        game = games.find(game_id) if game_id is not None else None
+        tournament = tournaments.find(tournament_id) if tournament_id is not None else None
+        unknown = (game_id is not None and game is None) or (tournament_id is not None and tournament is None)
+        return game, tournament, unknown
+
+    @staticmethod
+    def _match_list(teams, time, match_id, team1, team2, winner):
+        ids = teams.ids
+        return [{
+            'match_id': m,
+            'match_date_time': t,
+            'team1_id': ids[a],
+            'team2_id': ids[b],
+            'match_winner_id': ids[w] if w >= 0 else None,
+        } for t, m, a, b, w in zip(time.astype(object), match_id, team1, team2, winner)]
+
+    def head_to_head(self, team_a, team_b, game_id=None, tournament_id=None,
+                     since=None, until=None, recent=10):
+        teams, games, tournaments, blocks = self._snapshot()
+        a, b = teams.find(team_a), teams.find(team_b)
+        game, tournament, unknown = self._filters(games, tournaments, game_id, tournament_id)
+        result = {'team_a': team_a, 'team_b': team_b, 'matches': 0,
+                  'wins': {team_a: 0, team_b: 0}, 'undecided': 0, 'recent': []}
+        if a is None or b is None or unknown:
+            return result
+        columns = self._collect(blocks, lambda block: block.filter(
+            block.pair_positions(a, b), game, tournament, since, until))
+        winner = columns[4]
+        wins_a = int(np.count_nonzero(winner == a))
+        wins_b = int(np.count_nonzero(winner == b))
+        result.update({
+            'matches': len(winner),
+            'wins': {team_a: wins_a, team_b: wins_b},
+            'undecided': len(winner) - wins_a - wins_b,
+            'recent': self._match_list(teams, *(column[-recent:] for column in columns))[::-1] if recent else [],
+        })
+        return result
+
+    # Results of a team's last `last` decided matches, oldest first
+    def form(self, team_id, last=10, game_id=None, tournament_id=None):
+        teams, games, tournaments, blocks = self._snapshot()
+        team = teams.find(team_id)
+        game, tournament, unknown = self._filters(games, tournaments, game_id, tournament_id)
+        result = {'team_id': team_id, 'matches': 0, 'wins': 0, 'losses': 0,
+                  'win_rate': None, 'streak': None, 'results': '', 'recent': []}
+        if team is None or unknown:
+            return result
+        columns = self._collect(blocks, lambda block: block.filter(block.team_positions(team), game, tournament))
+        decided = columns[4] >= 0
+        columns = tuple(column[decided][-last:] for column in columns)
+        won = columns[4] == team
+        if not len(won):
+            return result
+        wins = int(np.count_nonzero(won))
+        changes = np.flatnonzero(won != won[-1])
+        streak = len(won) - (changes[-1] + 1 if len(changes) else 0)
+        result.update({
+            'matches': len(won),
+            'wins': wins,
+            'losses': len(won) - wins,
+            'win_rate': round(wins / len(won), 4),
+            'streak': {'result': 'W' if won[-1] else 'L', 'length': int(streak)},
+            'results': ''.join(np.where(won, 'W', 'L')),
+            'recent': self._match_list(teams, *columns)[::-1],
+        })
+        return result
+
+    # Win rate of every team over decided matches, best first. With team_id,
+    # the same numbers for that one team broken down by game instead.
+    def win_rates(self, game_id=None, tournament_id=None, team_id=None, min_matches=1, limit=100):
+        teams, games, tournaments, blocks = self._snapshot()
+        game, tournament, unknown = self._filters(games, tournaments, game_id, tournament_id)
+        if unknown or (team_id is not None and teams.find(team_id) is None):
+            return []
+        if team_id is not None:
+            return self._team_game_rates(blocks, games, teams.find(team_id), game, tournament, min_matches)
+
+        # Every code the blocks hold was in teams.ids when they were taken
+        ids = list(teams.ids)
+        team_count = len(ids)
+        played = np.zeros(team_count, dtype=np.int64)
+        wins = np.zeros(team_count, dtype=np.int64)
+        for block in blocks:
+            mask = block.alive & (block.winner >= 0)
+            if game is not None:
+                mask &= block.game == game
+            if tournament is not None:
+                mask &= block.tournament == tournament
+            for column in (block.team1, block.team2):
+                teams = column[mask]
+                played += np.bincount(teams[teams >= 0], minlength=team_count)
+            wins += np.bincount(block.winner[mask], minlength=team_count)
+        return self._rates(played, wins, min_matches, limit, ids, 'team_id')
+
+    def _team_game_rates(self, blocks, games, team, game, tournament, min_matches):
+        ids = list(games.ids)
+        game_count = len(ids)
+        played = np.zeros(game_count + 1, dtype=np.int64)   # last slot: matches with no game
+        wins = np.zeros(game_count + 1, dtype=np.int64)
+        for block in blocks:
+            positions = block.filter(block.team_positions(team), game, tournament)
+            positions = positions[block.winner[positions] >= 0]
+            games = block.game[positions]
+            games = np.where(games >= 0, games, game_count)
+            played += np.bincount(games, minlength=game_count + 1)
+            wins += np.bincount(games[block.winner[positions] == team], minlength=game_count + 1)
+        return self._rates(played, wins, min_matches, None, ids + [None], 'game_id')
+
+    def _rates(self, played, wins, min_matches, limit, ids, id_key):
+        picked = np.flatnonzero(played >= max(min_matches, 1))
+        rate = wins[picked] / played[picked]
+        # Highest rate first, more matches breaking ties
+        order = np.lexsort((-played[picked], -rate))
+        if limit:
+            order = order[:limit]
+        return [{
+            id_key: ids[picked[i]],
+            'matches': int(played[picked[i]]),
+            'wins': int(wins[picked[i]]),
+            'win_rate': round(float(rate[i]), 4),
+        } for i in order]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'base_matches': int(np.count_nonzero(self._base.alive)),
+                'delta_matches': len(self._delta_rows),
+                'teams': len(self.teams.ids),
+                'games': len(self.games.ids),
+                'tournaments': len(self.tournaments.ids),
+            }
@@ -1,17 +1,59 @@
-from flask import Flask, jsonify, request, session, send_from_directory
+from flask import Flask, Response, has_request_context, jsonify, request, session, send_from_directory, stream_with_context
 from datetime import datetime
-import mysql.connector
-from mysql.connector import Error
+from contextlib import contextmanager
+from collections import deque
+import contextvars
+import threading
+import time
+import hashlib
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import click
+import io
+import itertools
+from mysql.connector import Error, IntegrityError
 from dotenv import load_dotenv
 import os
-import bcrypt   
 from flask_cors import CORS                    # Library for hashing passwords
+from db_pool import ConnectionPool, PoolError
+from replicas import ReplicaSet
+from cache import ResultCache
+import standings
+import live
+from search import SEARCH_SOURCES, SearchIndex
+from ratings import EloRatings
+from passwords import HasherBusy, PasswordHasher
+from sessions import ServerSession, make_session_interface
+try:
+    from analytics import MatchAnalytics
+except ImportError:     # numpy not installed: the analytics endpoints answer 503
+    MatchAnalytics = None
+from schema import SchemaCache, SchemaError
+import metrics
+import admission
+import compression
+import snapshot
+from json_provider import FastJSONProvider, to_columnar
 
 load_dotenv()
 
 app = Flask(__name__, static_folder="static")
 app.secret_key = 'super_secret_key' # required for session cookies
+# SESSION_STORE=memory or sqlite keeps sessions server-side (see sessions.py);
+# the default is Flask's signed-cookie session
+SESSION_STORE = os.getenv('SESSION_STORE', 'cookie')
+if SESSION_STORE != 'cookie':
+    app.session_interface = make_session_interface(
+        SESSION_STORE,
+        sqlite_path=os.getenv('SESSION_SQLITE_PATH', 'sessions.db'),
+        cache_ttl=float(os.getenv('SESSION_CACHE_TTL', 30))
+    )
 CORS(app)
+# orjson when installed (see json_provider.py); JSON_DATETIME_FORMAT=iso trades
+# the HTTP-date strings Flask has always sent for faster ISO 8601 output
+app.json = FastJSONProvider(app, os.getenv('JSON_DATETIME_FORMAT', 'http'))
 
 @app.route("/")
 def index():
@@ -28,12 +70,12 @@ db_config = {
 VALID_TABLE = {
     'game': 'game_id', 
     'tournament': 'tournament_id', 
-    'matchinfo': 'matchinfo_id', 
+    'matchinfo': 'match_id', 
     'team': 'team_id', 
     'player': 'player_id',
-    'place': 'place_id', 
+    'placement': 'placement_id', 
     'venue': 'venue_id', 
-    'prizepool': 'prizepool_id', 
+    'prizepool': 'prize_pool_id', 
     'sponsor': 'sponsor_id',  
     'commentator': 'commentator_id',
     'organizer': 'organizer_id', 
@@ -41,26 +83,486 @@ VALID_TABLE = {
     'coach': 'coach_id'
 }
 
-def get_db_connection():
+# Junction tables and their composite primary keys (written through /bulkInsert)
+JUNCTION_TABLES = {
+    'teamplayer': ('team_id', 'player_id'),
+    'playergame': ('player_id', 'game_id'),
+    'matchcommentator': ('match_id', 'commentator_id'),
+    'tournamentteam': ('tournament_id', 'team_id'),
+    'tournamentsponsor': ('tournament_id', 'sponsor_id'),
+    'tournamentcommentator': ('tournament_id', 'commentator_id'),
+}
+
+# Connection pool settings (override in .env)
+db_pool = ConnectionPool(
+    db_config,
+    size=int(os.getenv('DB_POOL_SIZE', 5)),
+    max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 5)),
+    idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+    timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    pre_ping=os.getenv('DB_POOL_PRE_PING', '1') != '0'
+)
+
+# Request profiling (see metrics.py); off unless METRICS_ENABLED=1
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '0') == '1'
+request_metrics = metrics.RequestMetrics(slow_query_ms=float(os.getenv('SLOW_QUERY_MS', 200)))
+if METRICS_ENABLED:
+    metrics.init_app(app, request_metrics)
+
+# ================== READ REPLICAS ==================
+# DB_REPLICAS=host:port,host:port adds read replicas (same user, password and
+# database as db_config; see replicas.py). Only the routes in REPLICA_ROUTES
+# read from them, and only through db_cursor() without commit; writes, auth,
+# the in-memory index loads and everything else stay on the primary.
+#
+# A read stays on the primary when it could see data older than a write it
+# should see:
+#   - for REPLICA_STICKY_SECONDS after a session's last write, so the writer
+#     reads its own writes (clients that drop the session cookie don't get this)
+#   - for REPLICA_STICKY_SECONDS after a write to a table the route reads,
+#     so view_cache and the ETags never pick up a pre-write copy
+# REPLICA_STICKY_SECONDS defaults to the longest a healthy replica can lag:
+# REPLICA_MAX_LAG plus one health check interval.
+#
+# To try it with two local servers, run a second mysqld on another port as a
+# replica of the first (CHANGE REPLICATION SOURCE TO ... ; START REPLICA), then
+# start the app with DB_REPLICAS=127.0.0.1:3307. REPLICA_REQUIRE_REPLICATION=0
+# also accepts a server that is only a copy, e.g. one loaded from the same dump.
+# The async app (asgi_app.py) still reads from the primary.
+REPLICA_HOSTS = [h.strip() for h in os.getenv('DB_REPLICAS', '').split(',') if h.strip()]
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 5))
+REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', 5))
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', REPLICA_MAX_LAG + REPLICA_CHECK_INTERVAL))
+REPLICA_ROUTES = {
+    '/getTable', '/getEntry', '/exportTable', '/byGame', '/upcomingTournaments', '/getFormat',
+    '/getPlacementPoints', '/getMatchesInTournament', '/getTeamsInTournament', '/getTeamWins',
+}
+
+replica_set = None
+if REPLICA_HOSTS:
+    replica_set = ReplicaSet(
+        [{**db_config, 'host': host.rpartition(':')[0] or host,
+          'port': int(host.rpartition(':')[2]) if ':' in host else 3306,
+          'connection_timeout': int(os.getenv('REPLICA_CONNECT_TIMEOUT', 2))} for host in REPLICA_HOSTS],
+        pool_options={
+            'size': int(os.getenv('REPLICA_POOL_SIZE', os.getenv('DB_POOL_SIZE', 5))),
+            'max_overflow': int(os.getenv('REPLICA_POOL_MAX_OVERFLOW', os.getenv('DB_POOL_MAX_OVERFLOW', 5))),
+            'idle_timeout': float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+            'timeout': float(os.getenv('REPLICA_POOL_TIMEOUT', 2)),
+        },
+        strategy=os.getenv('REPLICA_STRATEGY', 'round_robin'),
+        max_lag=REPLICA_MAX_LAG,
+        check_interval=REPLICA_CHECK_INTERVAL,
+        require_replication=os.getenv('REPLICA_REQUIRE_REPLICATION', '1') != '0'
+    )
+    replica_set.start()
+
+# True while the current request may read from a replica; set per request
+# below and copied into query_executor threads with the rest of the context
+use_replica = contextvars.ContextVar('use_replica', default=False)
+
+# Tables a replica-routed request reads, or None when that depends on the data
+def replica_route_tables(route, data):
+    endpoint = route.lstrip('/')
+    if endpoint in VIEW_DEPENDENCIES:
+        return VIEW_DEPENDENCIES[endpoint]
+    if route in ('/getTable', '/exportTable') and admission.table_of(data):
+        return (admission.table_of(data),)
+    return None
+
+if replica_set is not None:
+    @app.before_request
+    def route_reads():
+        route = request.url_rule.rule if request.url_rule else None
+        if route not in REPLICA_ROUTES or time.time() < session.get('primary_until', 0):
+            return
+        if request.method == 'GET':
+            data = request.args
+        else:
+            data = request.get_json(silent=True, force=True)
+            data = data if isinstance(data, dict) else None
+        if view_cache.changed_within(replica_route_tables(route, data), REPLICA_STICKY_SECONDS):
+            return
+        request.replica_token = use_replica.set(True)
+
+    @app.teardown_request
+    def reset_read_route(exc):
+        token = getattr(request, 'replica_token', None)
+        if token is not None:
+            use_replica.reset(token)
+
+# (pool, connection) for one unit of work: a replica for reads the current
+# request may send there, else the primary. A replica that cannot hand out a
+# connection is taken out of rotation and the read goes to the primary.
+def borrow_connection(commit):
+    if not commit and replica_set is not None and use_replica.get():
+        replica = replica_set.choose()
+        if replica is not None:
+            try:
+                return replica.pool, replica.pool.acquire()
+            except PoolError as e:
+                replica_set.mark_failed(replica, e)
+    return db_pool, db_pool.acquire()
+
+# Keep this session's reads on the primary until replicas have its write
+def mark_session_write():
+    if replica_set is not None and has_request_context():
+        session['primary_until'] = time.time() + REPLICA_STICKY_SECONDS
+
+@app.get('/replicaStats')
+def replica_stats():
+    if replica_set is None:
+        return jsonify({'replicas': []})
+    return jsonify(replica_set.stats())
+
+# Borrow a pooled connection and a dictionary cursor for one unit of work.
+# With commit=True the work is committed on a clean exit; any error rolls it back.
+# The connection goes back to the pool either way.
+@contextmanager
+def db_cursor(commit=False):
+    stats = metrics.current_stats.get()
+    start = time.perf_counter()
+    pool, connection = borrow_connection(commit)
     try:
-        connection = mysql.connector.connect(**db_config)
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
+        cursor = connection.cursor(dictionary=True)
+        if stats is not None:
+            stats.add(acquire_time=time.perf_counter() - start)
+            cursor = metrics.InstrumentedCursor(cursor, connection, stats, request_metrics)
+        try:
+            yield cursor
+            if commit:
+                connection.commit()
+                mark_session_write()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+    finally:
+        pool.release(connection)
+
+@app.errorhandler(PoolError)
+def handle_pool_error(e):
+    return jsonify({'error': str(e)}), 500
+
+@app.get('/poolStats')
+def pool_stats():
+    return jsonify(db_pool.stats())
+
+# Prometheus text exposition: request histograms (when METRICS_ENABLED) plus pool gauges
+@app.get('/metrics')
+def metrics_endpoint():
+    lines = request_metrics.render() if METRICS_ENABLED else []
+    if COMPRESSION_ENABLED:
+        lines.extend(response_compressor.render())
+    for name, value in db_pool.stats().items():
+        if name in ('size', 'max_overflow'):
+            continue
+        lines.append(f"# TYPE db_pool_{name} gauge")
+        lines.append(f"db_pool_{name} {value}")
+    return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+# ================== RESPONSE COMPRESSION ==================
+# gzip/brotli for text responses of at least COMPRESSION_MIN_SIZE bytes, as
+# the client's Accept-Encoding allows (see compression.py)
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1') == '1'
+response_compressor = compression.Compressor(
+    min_size=int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+    gzip_level=int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)),
+    brotli_quality=int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+)
+if COMPRESSION_ENABLED:
+    compression.init_app(app, response_compressor)
+
+@app.get('/compressionStats')
+def compression_stats():
+    return jsonify({'enabled': COMPRESSION_ENABLED, **response_compressor.stats()})
+
+# ================== ADMISSION CONTROL ==================
+# Per-client token buckets and per-route/per-table concurrency caps (see
+# admission.py), so a scraper on /getTable or /byGame gets a quick 429/503
+# instead of taking every pooled connection from cheap requests like /me.
+# /byGame runs its queries in parallel, so each request holds several
+# connections. ADMISSION_LIMITS takes a JSON object with "client", "routes"
+# and "tables" keys; each entry replaces the default for that route or table.
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', '1') == '1'
+ADMISSION_LIMITS = {
+    'client': {'rate': 50, 'burst': 100},
+    'routes': {
+        '/getTable': {'concurrency': 6, 'queue_timeout': 0.5},
+        '/byGame': {'rate': 5, 'burst': 20, 'concurrency': 2, 'queue_timeout': 1},
+        '/exportTable': {'rate': 0.2, 'burst': 2, 'concurrency': 2, 'queue_timeout': 0},
+        '/bulkInsert': {'concurrency': 1, 'queue_timeout': 5},
+        '/writeBatch': {'concurrency': 2, 'queue_timeout': 5},
+    },
+    # Keyed by VALID_TABLE (or junction table) name; applies to every route given that table_name
+    'tables': {
+        'matchinfo': {'rate': 10, 'burst': 40},
+        'player': {'rate': 10, 'burst': 40},
+    },
+}
+for section, overrides in json.loads(os.getenv('ADMISSION_LIMITS', '{}')).items():
+    if section == 'client':
+        ADMISSION_LIMITS['client'] = overrides
+    else:
+        ADMISSION_LIMITS[section].update(overrides)
+for table in ADMISSION_LIMITS['tables']:
+    if table not in VALID_TABLE and table not in JUNCTION_TABLES:
+        raise ValueError(f"ADMISSION_LIMITS names an unknown table: {table}")
+
+admission_control = admission.AdmissionControl(
+    client_limit=ADMISSION_LIMITS['client'],
+    routes=ADMISSION_LIMITS['routes'],
+    tables=ADMISSION_LIMITS['tables']
+)
+if ADMISSION_ENABLED:
+    admission.init_app(app, admission_control)
+
+@app.get('/admissionStats')
+def admission_stats():
+    return jsonify({'enabled': ADMISSION_ENABLED, **admission_control.stats()})
+
+# Cache for the tournament/team view endpoints (override in .env)
+view_cache = ResultCache(
+    max_entries=int(os.getenv('VIEW_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('VIEW_CACHE_TTL', 60))
+)
+
+# Base tables behind each cached view endpoint. A write to any of them
+# invalidates that endpoint's cached results.
+VIEW_DEPENDENCIES = {
+    'upcomingTournaments': ('tournament', 'game'),
+    'getFormat': ('tournament', 'game'),
+    'getPlacementPoints': ('placement', 'team', 'tournament'),
+    'getMatchesInTournament': ('matchinfo', 'team', 'tournament'),
+    'getTeamsInTournament': ('tournamentteam', 'team', 'tournament'),
+    'getTeamWins': ('matchinfo', 'team', 'tournament'),
+    'byGame': ('tournament', 'team', 'tournamentteam', 'player', 'playergame', 'organizer'),
+}
+
+def fetch_all(query, params=()):
+    with db_cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+# Return loader() through view_cache, keyed by endpoint and parameters
+def cached_result(endpoint, params, loader):
+    key = (endpoint, params)
+    hit, result = view_cache.get(key)
+    if hit:
+        return result
+    tables = VIEW_DEPENDENCIES[endpoint]
+    generation = view_cache.generation(tables)
+    result = loader()
+    view_cache.set(key, result, tables, generation)
+    return result
+
+# SQL behind each view endpoint, keyed like VIEW_DEPENDENCIES.
+# /getPlacementPoints and /getTeamWins read the materialized summaries from standings.py.
+VIEW_QUERIES = {
+    'upcomingTournaments': """
+        SELECT UT.tournament_name,
+               UT.tournament_schedule, 
+               UT.tournament_format, 
+               UT.game_name 
+        FROM UpcomingTournament UT
+        WHERE tournament_schedule >= %s
+    """,
+    'getFormat': """
+        SELECT UT.tournament_name,
+               UT.tournament_schedule, 
+               UT.game_name 
+        FROM UpcomingTournament UT
+        WHERE tournament_format = %s
+    """,
+    'getPlacementPoints': """
+        SELECT TS.team_name, 
+            TS.placement_rank AS placement_rank, 
+            TS.placement_points AS points, 
+            TS.placement_prize_amount AS prize_amount, 
+            TS.tournament_name AS tournament
+        FROM TournamentStandings TS
+        WHERE TS.tournament_name = %s
+        ORDER BY TS.placement_rank
+    """,
+    'getMatchesInTournament': """
+        SELECT TNM.match_date_time AS schedule, 
+               TNM.match_rounds AS rounds, 
+               TNM.team1_name, 
+               TNM.team2_name,
+               TNM.winning_team_name
+        FROM TournamentMatches TNM
+        WHERE TNM.tournament_name = %s
+        ORDER BY TNM.match_date_time
+    """,
+    'getTeamsInTournament': """
+        SELECT team_name
+        FROM TournamentTeams
+        WHERE tournament_name = %s
+    """,
+    'getTeamWins': """
+        SELECT TW.tournament_name, TW.wins
+        FROM TeamWinsSummary TW 
+        WHERE TW.team_name = %s
+        ORDER BY TW.wins DESC
+    """,
+}
+
+# Run a view endpoint's query through view_cache
+def cached_view(endpoint, params):
+    return cached_result(endpoint, params, lambda: fetch_all(VIEW_QUERIES[endpoint], params))
+
+@app.get('/cacheStats')
+def cache_stats():
+    return jsonify(view_cache.stats())
+
+# ================== LIVE UPDATES ==================
+# Server-Sent Events for a tournament's matches and placements (see live.py)
+LIVE_HEARTBEAT = float(os.getenv('LIVE_HEARTBEAT', 15))       # seconds between keepalive comments
+LIVE_RETRY_MS = int(os.getenv('LIVE_RETRY_MS', 3000))          # EventSource reconnect delay
+live_hub = live.EventHub(
+    lambda data: app.json.dumps(data),
+    max_pending=int(os.getenv('LIVE_MAX_PENDING', 100)),
+    replay=int(os.getenv('LIVE_REPLAY', 200)),
+    topic_ttl=float(os.getenv('LIVE_TOPIC_TTL', 600))   # seconds an unfollowed tournament's history is kept
+)
+
+# Publish what a committed write changed, one event per tournament
+def publish_changes(table_name, changes):
+    for tournament, tournament_changes in changes.items():
+        live_hub.publish(tournament, table_name, {'table': table_name, 'changes': tournament_changes})
+
+# GET /subscribe?tournament=<name> streams events named after the table:
+#   event: matchinfo
+#   data: {"table": "matchinfo", "changes": [{"op": "upsert", "id": ..., "row": {...}},
+#                                            {"op": "delete", "id": ...}]}
+# Rows look like those of /getMatchesInTournament and /getPlacementPoints.
+# After a "reset" event the client should reload both views.
+@app.get('/subscribe')
+def subscribe():
+    tournament = request.args.get('tournament')
+    if not tournament:
+        return jsonify({'error': 'Missing tournament'}), 400
+    subscriber = live_hub.subscribe(tournament, request.headers.get('Last-Event-ID'))
+
+    def generate():
+        try:
+            yield f"retry: {LIVE_RETRY_MS}\n\n"
+            while True:
+                frame = subscriber.next_frame(LIVE_HEARTBEAT)
+                if frame is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield frame
+                if frame is live.RESET_FRAME:
+                    return
+        finally:
+            live_hub.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.get('/liveStats')
+def live_stats():
+    return jsonify(live_hub.stats())
+
+# ================== HTTP CACHING ==================
+# Read endpoints send a weak ETag built from the endpoint, its parameters and
+# the change version of every table it reads. The write endpoints bump those
+# versions (view_cache.invalidate), so a matching If-None-Match gets a 304
+# without touching MySQL. BOOT_ID keeps tags from one process run from
+# matching the next, since the versions start over on restart.
+BOOT_ID = uuid.uuid4().hex[:8]
+HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', 0))
+
+# Request parameters: the JSON body for POST, the query string for GET
+def request_data():
+    if request.method != 'GET':
+        return request.get_json(force=True) or {}
+    return parse_query_args(request.args)
+
+# On GET, columns, ids and expand are comma-separated lists, entries is a
+# comma-separated list of table:id pairs and filters is a JSON object
+def parse_query_args(args):
+    data = args.to_dict()
+    for name in ('columns', 'ids'):
+        if name in data:
+            data[name] = [c for c in data[name].split(',') if c]
+    if 'entries' in data:
+        data['entries'] = [pair.split(':', 1) for pair in data['entries'].split(',') if pair]
+    if 'expand' in data:
+        expand = data['expand']
+        data['expand'] = expand in ('1', 'true', 'all') or [c for c in expand.split(',') if c]
+    if 'filters' in data:
+        try:
+            data['filters'] = json.loads(data['filters'])
+        except ValueError:
+            data['filters'] = None
+        if not isinstance(data['filters'], dict):
+            raise ValueError('filters must be a JSON object')
+    return data
+
+# Every GET route reads its parameters through parse_query_args inside a
+# catch-all 500 handler, so a malformed query string is turned away here
+@app.before_request
+def check_query_args():
+    if request.method == 'GET':
+        try:
+            parse_query_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+def make_etag(endpoint, params, tables):
+    versions = view_cache.generation(tables)
+    raw = json.dumps([endpoint, params, versions], sort_keys=True, default=str)
+    return f"{BOOT_ID}-{hashlib.sha1(raw.encode()).hexdigest()[:20]}"
+
+# Finish a read response: 304 if the client's copy is current, otherwise
+# body() is called and sent with ETag and Cache-Control headers
+def conditional_response(etag, body):
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        result = body()
+        # Bodies answered from a snapshot arrive already encoded
+        response = (app.response_class(result, mimetype='application/json')
+                    if isinstance(result, bytes) else jsonify(result))
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = f'public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate'
+    return response
+
+# format=columnar sends {"columns": [...], "rows": [[...], ...]} instead of a
+# list of objects, so column names are not repeated on every row
+def wants_columnar(data):
+    return data.get('format') == 'columnar'
+
+def view_response(endpoint, params):
+    columnar = wants_columnar(request_data())
+    if snapshot_holder is not None:
+        return conditional_response(*snapshot_view(endpoint, params, columnar))
+    etag = make_etag(endpoint, [params, columnar], VIEW_DEPENDENCIES[endpoint])
+    if columnar:
+        return conditional_response(etag, lambda: to_columnar(cached_view(endpoint, params)))
+    return conditional_response(etag, lambda: cached_view(endpoint, params))
 
 # ================== USER AUTHENTICATION ==================
 # For Demo: Admin Password = Admin123
+# bcrypt runs on its own bounded pool (see passwords.py). BCRYPT_ROUNDS is the
+# cost factor for new hashes; older hashes are upgraded at the next login.
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+    workers=int(os.getenv('BCRYPT_WORKERS', min(4, os.cpu_count() or 1))),
+    max_pending=int(os.getenv('BCRYPT_MAX_PENDING', 64)),
+    timeout=float(os.getenv('BCRYPT_TIMEOUT', 10))
+)
+
+@app.errorhandler(HasherBusy)
+def handle_hasher_busy(e):
+    return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+
 # Get user record from database using username
 def get_user_by_username(username: str):
-        
-    connection = get_db_connection()
-    if connection is None:
-        return None
-    
-    cursor = None
-    try: 
-        cursor = connection.cursor(dictionary=True)
+    with db_cursor() as cursor:
         query = """
             SELECT user_id, username, password_hash, role 
             FROM UserAccount 
@@ -69,11 +571,6 @@ def get_user_by_username(username: str):
         cursor.execute(query, (username,))
         user = cursor.fetchone()
         return user
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
 # User Registration Endpoint
 # Registers a new user account (creates username, hashed password, and default role)
@@ -86,50 +583,33 @@ def register():
     # Check if both username and password are included
     if not username or not password:
         return jsonify({'error': 'username and password required'}), 400
-    
-    # Check if username is already taken
-    if get_user_by_username(username):
-        return jsonify({'error': 'username already exists'}), 400
 
-    # Hash password using bcrypt
-    password_hash = bcrypt.hashpw(
-        password.encode(), 
-        bcrypt.gensalt()
-    ).decode()
-
-    # Connect to database
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    
-    cursor = None
     try:
-        cursor = connection.cursor()
-        query = """
-            INSERT INTO UserAccount(username, password_hash, role)
-            VALUES (%s, %s, %s)
-        """
-        cursor.execute(query, (username, password_hash, 'user')) # default to 'user' role
-        connection.commit()
+        # Hash password using bcrypt (HasherBusy is answered with a 503)
+        password_hash = password_hasher.hash(password)
+
+        # UserAccount.username is UNIQUE, so a taken name fails the insert
+        # instead of needing a lookup first
+        with db_cursor(commit=True) as cursor:
+            query = """
+                INSERT INTO UserAccount(username, password_hash, role)
+                VALUES (%s, %s, %s)
+            """
+            cursor.execute(query, (username, password_hash, 'user')) # default to 'user' role
+            user_id = cursor.lastrowid
 
         return jsonify({
             'success': True,
             'message': 'user registered',
-            'user_id': cursor.lastrowid,
+            'user_id': user_id,
             'username': username,
             'role': 'user'
         }), 201
     
+    except IntegrityError:
+        return jsonify({'error': 'username already exists'}), 400
     except Error as e:
-        if connection:
-            connection.rollback()
         return jsonify({'error':str(e)}), 500
-    
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
 # User Login Endpoint:
 # Logs existing users in
@@ -144,15 +624,26 @@ def login():
 
     # Look up user in database
     user = get_user_by_username(username)
-    if not user:
-        return jsonify({'error': 'invalid credentials'}), 401
-
-    stored_hash = user['password_hash'] # string stored in database
+    stored_hash = user['password_hash'] if user else None # string stored in database
 
     # Compare provided password to stored bcyrpt hashed password
-    if not bcrypt.checkpw(password.encode(), stored_hash.encode()):
+    # (an unknown user is checked against a throwaway hash, so it takes as long)
+    if not password_hasher.verify(password, stored_hash):
         return jsonify({'error': 'invalid credentials'}), 401
-    
+
+    # Re-hash with the current BCRYPT_ROUNDS if the stored hash used another cost
+    # (hashed before borrowing a connection, so none is held for the bcrypt run)
+    if password_hasher.needs_rehash(stored_hash):
+        new_hash = password_hasher.hash(password)
+        with db_cursor(commit=True) as cursor:
+            cursor.execute("UPDATE UserAccount SET password_hash = %s WHERE user_id = %s",
+                           (new_hash, user['user_id']))
+
+    # Server-side sessions get a new id, so one issued before login (or planted
+    # by someone else) is not the one that ends up authenticated
+    if isinstance(session, ServerSession):
+        session.rotate()
+
     # Store user info in the session so they stay logged in
     session['user_id'] = user['user_id']
     session['username'] = user['username']
@@ -175,6 +666,14 @@ def logout():
     session.clear()
     return jsonify({'success': True, 'message': 'logged out'}), 200
 
+@app.get('/authStats')
+def auth_stats():
+    store = getattr(app.session_interface, 'store', None)
+    return jsonify({
+        'hasher': password_hasher.stats(),
+        'sessions': store.stats() if store is not None else {'store': 'cookie'},
+    })
+
 @app.get("/me")
 def me():
     user_id = session.get('user_id')
@@ -190,15 +689,132 @@ def me():
     })
 # =========================================================
 
-@app.route('/getTable', methods=['POST']) 
-def get_table():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
+# /getTable page size: used when "after" comes without a limit, and the most one page may hold
+DEFAULT_PAGE_SIZE = int(os.getenv('TABLE_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.getenv('TABLE_MAX_PAGE_SIZE', 1000))
 
+# Range operators accepted in /getTable filters: {"col": {"gte": 1, "lt": 5}}
+FILTER_OPS = {'eq': '=', 'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>='}
+
+# Table/column/key metadata from information_schema, loaded on first use
+# (or at startup) and reloaded through /refreshSchema
+schema_cache = SchemaCache()
+
+def load_schema():
+    with db_cursor() as cursor:
+        schema_cache.load(cursor)
+    for table_name, primary_key in VALID_TABLE.items():
+        if not schema_cache.has_table(table_name):
+            app.logger.warning(f"VALID_TABLE lists {table_name}, which is not in the database")
+        elif schema_cache.primary_key(table_name) != (primary_key,):
+            app.logger.warning(
+                f"VALID_TABLE key for {table_name} is {primary_key}, schema has {schema_cache.primary_key(table_name)}")
+    return schema_cache
+
+def get_schema():
+    if not schema_cache.loaded:
+        load_schema()
+    return schema_cache
+
+def get_table_columns(table_name):
+    return get_schema().columns(table_name)
+
+@app.route('/refreshSchema', methods=['POST'])
+def refresh_schema():
+
+    # Admin Permission Check
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'admin access required'}), 403
+
+    try:
+        load_schema()
+        return jsonify(schema_cache.stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Build the WHERE clause for /getTable filters. Raises ValueError on bad input.
+def build_filters(filters, columns):
+    clauses = []
+    values = []
+    for column, condition in filters.items():
+        if column not in columns:
+            raise ValueError(f'Unknown filter column: {column}')
+        if not isinstance(condition, dict):
+            condition = {'eq': condition}
+        for op, value in condition.items():
+            if op not in FILTER_OPS:
+                raise ValueError(f'Unknown filter operator: {op}')
+            clauses.append(f"{column} {FILTER_OPS[op]} %s")
+            values.append(value)
+    return clauses, values
+
+# Build the page query for /getTable from its parameters:
+#   {"table_name": "team", "limit": 50, "after": "TM050",
+#    "columns": ["team_id", "team_name"], "filters": {"team_region": "Europe"}}
+# Returns (query, values, primary_key, limit); limit is None for an unpaged
+# read. Raises ValueError on bad input.
+def build_page_query(table_name, data):
+    primary_key = VALID_TABLE[table_name]
+
+    # Without limit or after the whole table is read, as before paging existed
+    paged = data.get('limit') is not None or data.get('after') is not None
+    limit = None
+    if paged:
+        try:
+            limit = int(data.get('limit') or DEFAULT_PAGE_SIZE)
+        except (TypeError, ValueError):
+            raise ValueError('limit must be an integer')
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    table_cols = get_table_columns(table_name)
+    columns = data.get('columns')
+    if columns:
+        unknown = [c for c in columns if c not in table_cols]
+        if unknown:
+            raise SchemaError('Unknown columns', unknown)
+        if primary_key not in columns:
+            columns = [primary_key] + list(columns)
+        select_list = ', '.join(columns)
+    else:
+        select_list = '*'
+
+    clauses, values = build_filters(data.get('filters') or {}, table_cols)
+
+    after = data.get('after')
+    if after is not None:
+        clauses.append(f"{primary_key} > %s")
+        values.append(after)
+
+    query = f"SELECT {select_list} FROM {table_name}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += f" ORDER BY {primary_key}"
+    if paged:
+        # Fetch one extra row to know whether another page exists
+        query += " LIMIT %s"
+        values.append(limit + 1)
+    return query, values, primary_key, limit
+
+# Trim the extra row fetched by build_page_query and work out the next cursor.
+# An unpaged read (limit None) keeps the original bare list of rows.
+def page_result(rows, primary_key, limit, columnar=False):
+    if limit is None:
+        return to_columnar(rows) if columnar else rows
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][primary_key]
+    if columnar:
+        return {**to_columnar(rows), 'next_cursor': next_cursor}
+    return {'rows': rows, 'next_cursor': next_cursor}
+
+# Returns a table ordered by primary key (see build_page_query): every row as
+# a bare list, or with "limit" and/or "after" one page as {rows, next_cursor}.
+# Pass the returned next_cursor back as "after" to get the next page.
+@app.route('/getTable', methods=['GET', 'POST']) 
+def get_table():
     try: 
-        data = request.get_json(force=True)
+        data = request_data()
         table_name = data.get('table_name')
 
         if table_name is None:
@@ -208,32 +824,215 @@ def get_table():
         if table_name not in VALID_TABLE:
             return jsonify({'error': 'Invalid table name'}), 400   
 
-        cursor = connection.cursor(dictionary=True)
-        query = f"Select * From {table_name};"
-        cursor.execute(query)
-        table = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(table)
+        etag = make_etag('getTable', data, (table_name,))
+        if request.if_none_match.contains_weak(etag):
+            return conditional_response(etag, None)
+
+        try:
+            query, values, primary_key, limit = build_page_query(table_name, data)
+        except SchemaError as e:
+            return jsonify({'error': str(e), 'columns': e.errors}), 400
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        with db_cursor() as cursor:
+            cursor.execute(query, values)
+            rows = cursor.fetchall()
+
+        return conditional_response(etag, lambda: page_result(rows, primary_key, limit, wants_columnar(data)))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/getEntry', methods=['POST']) 
-def get_entry():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
+# Rows pulled from the cursor per fetchmany() call while streaming an export
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
 
-    try: 
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Streams a whole table as NDJSON (one object per line) or CSV:
+#   {"table_name": "matchinfo", "format": "csv", "columns": [...], "filters": {...}}
+# Rows are read with an unbuffered cursor in EXPORT_BATCH_SIZE batches and written
+# out as they arrive, so memory stays flat regardless of table size.
+@app.route('/exportTable', methods=['POST'])
+def export_table():
+    try:
         data = request.get_json(force=True)
+        table_name = data.get('table_name')
+        export_format = (data.get('format') or 'ndjson').lower()
+
+        if table_name is None:
+            return jsonify({'error': 'Invalid input. Check json key format'}), 400
+        table_name = table_name.lower()
+        if table_name not in VALID_TABLE:
+            return jsonify({'error': 'Invalid table name'}), 400
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+        table_cols = get_table_columns(table_name)
+        columns = data.get('columns') or table_cols
+        unknown = [c for c in columns if c not in table_cols]
+        if unknown:
+            return jsonify({'error': 'Unknown columns', 'columns': unknown}), 400
+
+        try:
+            clauses, values = build_filters(data.get('filters') or {}, table_cols)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    query = f"SELECT {', '.join(columns)} FROM {table_name}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += f" ORDER BY {VALID_TABLE[table_name]}"
+
+    def generate():
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+
+        with db_cursor() as cursor:
+            cursor.execute(query, values)
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                if export_format == 'csv':
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerows([row[c] for c in columns] for row in rows)
+                    yield buffer.getvalue()
+                else:
+                    yield ''.join(app.json.dumps(row) + '\n' for row in rows)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename={table_name}.{export_format}'}
+    )
+
+# /getEntry also takes many keys at once, resolving each table with one
+# WHERE pk IN (...) query instead of a request per foreign key:
+#   {"table_name": "team", "ids": ["T1", "T2"]}
+#   {"entries": [["team", "T1"], ["venue", "V3"]]}
+#   GET ?table_name=team&ids=T1,T2  or  ?entries=team:T1,venue:V3
+# expand (true, or a list of foreign key columns) follows the foreign keys the
+# schema declares on the requested tables, one level deep, and adds the rows
+# they point to under "expanded", keyed by table and then by referenced value:
+#   {"entries": {"matchinfo": [...]}, "expanded": {"team": {"T1": {...}}}}
+# Only VALID_TABLE tables are expanded. A plain table_name + id request still
+# returns the bare list of matching rows.
+GET_ENTRY_MAX_IDS = int(os.getenv('GET_ENTRY_MAX_IDS', 500))
+
+def is_batch_request(data):
+    return 'ids' in data or 'entries' in data or bool(data.get('expand'))
+
+# {table: [ids]} from a batch request, duplicates dropped, in request order
+def requested_entries(data):
+    if 'entries' in data:
+        pairs = data['entries']
+        if not isinstance(pairs, list):
+            raise ValueError('entries must be a list of [table_name, id] pairs')
+    else:
+        table_name = data.get('table_name')
+        ids = data['ids'] if 'ids' in data else [data.get('id')]
+        if not isinstance(table_name, str) or not isinstance(ids, list):
+            raise ValueError('Invalid input. Check json format')
+        pairs = [(table_name, id) for id in ids]
+
+    requested = {}
+    for pair in pairs:
+        if isinstance(pair, dict):
+            pair = (pair.get('table_name'), pair.get('id'))
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2 or not isinstance(pair[0], str) \
+                or pair[1] is None or isinstance(pair[1], (list, dict)):
+            raise ValueError('entries must be a list of [table_name, id] pairs')
+        table_name = pair[0].lower()
+        if table_name not in VALID_TABLE:
+            raise ValueError(f'Invalid table name: {pair[0]}')
+        requested.setdefault(table_name, {})[pair[1]] = None
+
+    total = sum(len(ids) for ids in requested.values())
+    if total == 0:
+        raise ValueError('No ids given')
+    if total > GET_ENTRY_MAX_IDS:
+        raise ValueError(f'At most {GET_ENTRY_MAX_IDS} ids per request')
+    return {table_name: list(ids) for table_name, ids in requested.items()}
+
+# {table: {fk column: (referenced table, referenced column)}} to expand
+def entry_expansions(requested, expand):
+    if not expand:
+        return {}
+    if expand is not True and not (isinstance(expand, list) and all(isinstance(c, str) for c in expand)):
+        raise ValueError('expand must be true or a list of foreign key columns')
+    schema = get_schema()
+    expansions = {}
+    for table_name in requested:
+        for column, target in schema.foreign_keys(table_name).items():
+            if target[0] in VALID_TABLE and (expand is True or column in expand):
+                expansions.setdefault(table_name, {})[column] = target
+    if expand is not True:
+        unknown = set(expand) - {column for columns in expansions.values() for column in columns}
+        if unknown:
+            raise ValueError(f"Not a foreign key of the requested tables: {', '.join(sorted(unknown))}")
+    return expansions
+
+def in_query(table_name, column, values):
+    return f"SELECT * FROM {table_name} WHERE {column} IN ({', '.join(['%s'] * len(values))})", values
+
+# Every table the response reads, for the ETag
+def entry_tables(requested, expansions):
+    tables = set(requested)
+    for columns in expansions.values():
+        tables.update(target for target, _ in columns.values())
+    return tuple(sorted(tables))
+
+# One IN query per referenced (table, column), over the values the fetched rows hold
+def expansion_queries(entries, expansions):
+    wanted = {}
+    for table_name, columns in expansions.items():
+        for column, target in columns.items():
+            values = wanted.setdefault(target, {})
+            for row in entries[table_name]:
+                if row.get(column) is not None:
+                    values[row[column]] = None
+    return [(target, *in_query(*target, list(values))) for target, values in wanted.items() if values]
+
+def add_expanded(expanded, target, rows):
+    table_name, column = target
+    expanded.setdefault(table_name, {}).update((row[column], row) for row in rows)
+
+def load_entries(requested, expansions):
+    with db_cursor() as cursor:
+        entries = {}
+        for table_name, ids in requested.items():
+            cursor.execute(*in_query(table_name, VALID_TABLE[table_name], ids))
+            entries[table_name] = cursor.fetchall()
+        result = {'entries': entries}
+        if expansions:
+            expanded = result['expanded'] = {}
+            for target, query, values in expansion_queries(entries, expansions):
+                cursor.execute(query, values)
+                add_expanded(expanded, target, cursor.fetchall())
+    return result
+
+@app.route('/getEntry', methods=['GET', 'POST']) 
+def get_entry():
+    try: 
+        data = request_data()
+        if is_batch_request(data):
+            try:
+                requested = requested_entries(data)
+                expansions = entry_expansions(requested, data.get('expand'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            etag = make_etag('getEntry', [requested, expansions], entry_tables(requested, expansions))
+            if request.if_none_match.contains_weak(etag):
+                return conditional_response(etag, None)
+            result = load_entries(requested, expansions)
+            return conditional_response(etag, lambda: result)
+
         table_name = data.get('table_name')
         id = data.get('id')
 
@@ -244,22 +1043,17 @@ def get_entry():
             return jsonify({'error': 'Invalid table name'}), 400
         primary_key= VALID_TABLE[table_name];
 
-        cursor = connection.cursor(dictionary=True)
-        query = f"SELECT * FROM {table_name} WHERE {primary_key} = %s"
-        cursor.execute(query, (id,))
-        entry = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entry)
+        etag = make_etag('getEntry', (table_name, id), (table_name,))
+        if request.if_none_match.contains_weak(etag):
+            return conditional_response(etag, None)
+
+        with db_cursor() as cursor:
+            query = f"SELECT * FROM {table_name} WHERE {primary_key} = %s"
+            cursor.execute(query, (id,))
+            entry = cursor.fetchall()
+        return conditional_response(etag, lambda: entry)
     except Exception as e:  
-        if connection:
-            connection.rollback() 
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
 @app.route('/deleteEntry', methods=['DELETE']) 
 def delete_entry():
@@ -267,10 +1061,6 @@ def delete_entry():
     # Admin Permission Check
     if session.get('role') != 'admin':
         return jsonify({'error': 'admin access required'}), 403
-    
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
 
     try: 
         data = request.get_json(force=True)
@@ -284,24 +1074,24 @@ def delete_entry():
             return jsonify({'error': 'Invalid table name'}), 400
         primary_key= VALID_TABLE[table_name];
 
-        cursor = connection.cursor(dictionary=True)
-        query = f"DELETE FROM {table_name} WHERE {primary_key} = %s"
-        cursor.execute(query, (id,))
-        connection.commit()
+        with db_cursor(commit=True) as cursor:
+            touched = standings.touched_keys(cursor, table_name, [id])
+            before = live.snapshot(cursor, table_name, [id])
+            query = f"DELETE FROM {table_name} WHERE {primary_key} = %s"
+            cursor.execute(query, (id,))
+            rows_affected = cursor.rowcount
+            standings.refresh(cursor, table_name, touched)
+            changes = live.diff(table_name, before, {})
+        view_cache.invalidate(table_name)
+        publish_changes(table_name, changes)
+        refresh_indexes(table_name, [id])
         return jsonify({
             'success': True, 
             'message': 'Entry Deleted',
-            'rows_affected': cursor.rowcount
+            'rows_affected': rows_affected
         }), 201
     except Exception as e:
-        if connection:
-            connection.rollback()   
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
 @app.route('/insertEntry', methods=['POST']) 
 def insert_entry():
@@ -309,15 +1099,10 @@ def insert_entry():
     # Admin Permission Check
     if session.get('role') != 'admin':
         return jsonify({'error': 'admin access required'}), 403
-    
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None
 
     try: 
         data = request.get_json()
-        table_name = data.get('table_name').lower()
+        table_name = data.get('table_name')
         entry = data.get('entry')
 
         if table_name is None or entry is None:
@@ -326,26 +1111,31 @@ def insert_entry():
         if table_name not in VALID_TABLE.keys():
             return jsonify({'error': 'Invalid table name'}), 400
 
-        cursor = connection.cursor(dictionary=True)
-        column_names = ', '.join(entry.keys())
-        placeholders = ', '.join(['%s'] * len(entry))
-        query = f"INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})"
-        cursor.execute(query, tuple(entry.values()))
-        connection.commit()
+        try:
+            entry = get_schema().validate(table_name, entry)
+        except SchemaError as e:
+            return jsonify({'error': str(e), 'details': e.errors}), 400
+
+        with db_cursor(commit=True) as cursor:
+            column_names = ', '.join(entry.keys())
+            placeholders = ', '.join(['%s'] * len(entry))
+            query = f"INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})"
+            cursor.execute(query, tuple(entry.values()))
+            new_id = cursor.lastrowid
+            ids = [entry.get(VALID_TABLE[table_name])]
+            touched = standings.touched_keys(cursor, table_name, ids)
+            standings.refresh(cursor, table_name, touched)
+            changes = live.diff(table_name, {}, live.snapshot(cursor, table_name, ids))
+        view_cache.invalidate(table_name)
+        publish_changes(table_name, changes)
+        refresh_indexes(table_name, ids)
         return jsonify({
             'success': True, 
             'message': 'Entry inserted',
-            'id': cursor.lastrowid
+            'id': new_id
         }), 201
     except Exception as e:
-        if connection:
-            connection.rollback()   
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
 @app.route('/updateEntry', methods=['PUT']) 
 def update_entry():
@@ -353,15 +1143,10 @@ def update_entry():
     # Admin Permission Check
     if session.get('role') != 'admin':
         return jsonify({'error': 'admin access required'}), 403
-    
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None
 
     try: 
         data = request.get_json()
-        table_name = data.get('table_name').lower()
+        table_name = data.get('table_name')
         id = data.get('id')
         update_colms = data.get('update_colms')
 
@@ -373,316 +1158,1054 @@ def update_entry():
 
         primary_key = VALID_TABLE[table_name]
 
+        try:
+            update_colms = get_schema().validate(table_name, update_colms, partial=True)
+        except SchemaError as e:
+            return jsonify({'error': str(e), 'details': e.errors}), 400
+
         set_clause = ", ".join([f"{key} = %s" for key in update_colms.keys()])
         query = f"UPDATE {table_name} SET {set_clause} WHERE {primary_key} = %s"
 
-        cursor = connection.cursor(dictionary=True)
-        values = list(update_colms.values()) + [id]
-        cursor.execute(query, values)
-        connection.commit()
+        with db_cursor(commit=True) as cursor:
+            touched = standings.touched_keys(cursor, table_name, [id])
+            before = live.snapshot(cursor, table_name, [id])
+            values = list(update_colms.values()) + [id]
+            cursor.execute(query, values)
+            rows_affected = cursor.rowcount
+            new_id = update_colms.get(primary_key, id)
+            touched |= standings.touched_keys(cursor, table_name, [new_id])
+            standings.refresh(cursor, table_name, touched)
+            changes = live.diff(table_name, before, live.snapshot(cursor, table_name, [new_id]))
+        view_cache.invalidate(table_name)
+        publish_changes(table_name, changes)
+        refresh_indexes(table_name, [id, new_id])
 
         return jsonify({
             'success': True, 
             'message': 'Entry updated',
-            'rows_affected': cursor.rowcount
+            'rows_affected': rows_affected
         }), 200 
     except Exception as e:
-        if connection:
-            connection.rollback()   
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/upcomingTournaments', methods=['POST']) 
-def upcoming_tournaments():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
+# ================== BULK WRITES ==================
+# Rows written per transaction, and the most rows one /bulkInsert request may carry
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 500))
+BULK_MAX_ROWS = int(os.getenv('BULK_MAX_ROWS', 50000))
+
+def primary_key_columns(table_name):
+    if table_name in VALID_TABLE:
+        return (VALID_TABLE[table_name],)
+    return JUNCTION_TABLES[table_name]
+
+def row_id(table_name, row):
+    key = primary_key_columns(table_name)
+    return row.get(key[0]) if len(key) == 1 else [row.get(c) for c in key]
+
+# INSERT (or upsert) rows sharing one column list with a single executemany,
+# keeping the standings summaries in step. Returns the live changes (see live.diff).
+def write_rows(cursor, table_name, columns, rows, upsert=False):
+    query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    ids = [row.get(VALID_TABLE.get(table_name)) for row in rows]
+    touched = set()
+    before = {}
+    if upsert:
+        key = primary_key_columns(table_name)
+        updates = [c for c in columns if c not in key] or list(key)
+        query += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in updates)
+        touched = standings.touched_keys(cursor, table_name, ids)
+        before = live.snapshot(cursor, table_name, ids)
+    cursor.executemany(query, [tuple(row[c] for c in columns) for row in rows])
+    touched |= standings.touched_keys(cursor, table_name, ids)
+    standings.refresh(cursor, table_name, touched)
+    return live.diff(table_name, before, live.snapshot(cursor, table_name, ids))
+
+# Write [(index, row), ...] in chunk_size transactions. A chunk that fails is
+# rolled back and retried row by row so the bad rows can be reported.
+# Returns (indexes written, [{'index', 'error'}, ...]).
+def bulk_write_table(table_name, indexed_rows, upsert=False, chunk_size=BULK_CHUNK_SIZE):
+    written = []
+    errors = []
+    for start in range(0, len(indexed_rows), chunk_size):
+        chunk = indexed_rows[start:start + chunk_size]
+        groups = {}
+        for index, row in chunk:
+            groups.setdefault(tuple(row), []).append(row)
+        try:
+            with db_cursor(commit=True) as cursor:
+                changes = {}
+                for columns, rows in groups.items():
+                    for tournament, events in write_rows(cursor, table_name, columns, rows, upsert).items():
+                        changes.setdefault(tournament, []).extend(events)
+            written.extend(index for index, _ in chunk)
+            publish_changes(table_name, changes)
+        except Error:
+            for index, row in chunk:
+                try:
+                    with db_cursor(commit=True) as cursor:
+                        changes = write_rows(cursor, table_name, tuple(row), [row], upsert)
+                    written.append(index)
+                    publish_changes(table_name, changes)
+                except Error as e:
+                    errors.append({'index': index, 'error': str(e)})
+    return written, errors
+
+# Insert many rows into one or more tables:
+#   {"tables": {"matchinfo": [{...}, ...], "tournamentteam": [{...}, ...]},
+#    "upsert": true, "chunk_size": 500}
+# Tables are written in the order given. With upsert, existing rows are updated
+# (ON DUPLICATE KEY UPDATE). Errors are reported per row by its index.
+@app.route('/bulkInsert', methods=['POST'])
+def bulk_insert():
 
-    try: 
+    # Admin Permission Check
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'admin access required'}), 403
+
+    try:
         data = request.get_json(force=True)
+        tables = data.get('tables')
+        if tables is None and data.get('table_name'):
+            tables = {data.get('table_name'): data.get('rows')}
+        if not isinstance(tables, dict) or not tables:
+            return jsonify({'error': 'Invalid input. Check json format'}), 400
+        if not all(isinstance(rows, list) for rows in tables.values()):
+            return jsonify({'error': 'Rows for each table must be a list'}), 400
+        if sum(len(rows) for rows in tables.values()) > BULK_MAX_ROWS:
+            return jsonify({'error': f'At most {BULK_MAX_ROWS} rows per request'}), 413
+
+        upsert = bool(data.get('upsert'))
+        try:
+            chunk_size = int(data.get('chunk_size') or BULK_CHUNK_SIZE)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'chunk_size must be an integer'}), 400
+        chunk_size = max(1, min(chunk_size, BULK_CHUNK_SIZE * 10))
+
+        results = {}
+        for table_name, rows in tables.items():
+            table_name = table_name.lower()
+            if table_name not in VALID_TABLE and table_name not in JUNCTION_TABLES:
+                results[table_name] = {'inserted': 0, 'ids': [], 'errors': [{'error': 'Invalid table name'}]}
+                continue
+
+            schema = get_schema()
+            valid = []
+            errors = []
+            for index, row in enumerate(rows):
+                try:
+                    valid.append((index, schema.validate(table_name, row, partial=upsert)))
+                except SchemaError as e:
+                    errors.append({'index': index, 'error': str(e)})
+
+            written, write_errors = bulk_write_table(table_name, valid, upsert, chunk_size)
+            written = set(written)
+            ids = [row_id(table_name, row) for index, row in valid if index in written]
+            if written:
+                view_cache.invalidate(table_name)
+                refresh_indexes(table_name, ids)
+            errors = sorted(errors + write_errors, key=lambda e: e['index'])
+            results[table_name] = {
+                'inserted': len(written),
+                'ids': ids,
+                'errors': errors
+            }
+
+        failed = any(r['errors'] for r in results.values())
+        return jsonify({
+            'success': not failed,
+            'message': 'Rows written' if not failed else 'Some rows failed',
+            'tables': results
+        }), 207 if failed else 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ================== WRITE BATCHES ==================
+# Inserts, updates and deletes across tables in one transaction: all of them
+# commit or none do.
+#   {"operations": [
+#       {"op": "insert", "table_name": "prizepool", "entry": {...}},
+#       {"op": "insert", "table_name": "tournament", "entry": {...}},
+#       {"op": "update", "table_name": "team", "id": "T1", "update_colms": {...}},
+#       {"op": "delete", "table_name": "tournamentteam",
+#        "id": {"tournament_id": "...", "team_id": "..."}}
+#   ]}
+# Junction tables take their composite id as an object or a list in key order.
+# Operations on one table run in the given order, so a row can be deleted
+# and inserted again in the same batch. Across tables they are reordered by
+# foreign key: inserts and updates of parents before their children
+# (PrizePool, then Tournament, then TournamentTeam), deletes of children
+# before their parents. A run of inserts into one table with the same
+# columns goes out as a single executemany.
+#
+# The work that follows a write is done once per table, not once per row:
+# standings and live changes come from one read of the batch's rows before
+# and one after, and after the commit each table is invalidated in
+# view_cache, published to subscribers and refreshed in the in-memory indexes once.
+BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS', 1000))
+BATCH_OPS = ('insert', 'update', 'delete')
+
+# Primary key values named by an operation's id: the value itself, or for
+# the composite key of a junction table an object or list of them
+def key_values(table_name, id):
+    key = primary_key_columns(table_name)
+    if len(key) == 1:
+        return [id]
+    if isinstance(id, dict):
+        id = [id.get(c) for c in key]
+    if not isinstance(id, list) or len(id) != len(key) or None in id:
+        raise SchemaError(f"id for {table_name} must give {', '.join(key)}")
+    return id
+
+# Validate one operation and coerce its values; raises SchemaError
+def parse_operation(index, operation):
+    if not isinstance(operation, dict):
+        raise SchemaError('Operation must be an object')
+    op = operation.get('op')
+    if op not in BATCH_OPS:
+        raise SchemaError(f"op must be one of: {', '.join(BATCH_OPS)}")
+    table_name = str(operation.get('table_name') or '').lower()
+    if table_name not in VALID_TABLE and table_name not in JUNCTION_TABLES:
+        raise SchemaError('Invalid table name')
+
+    parsed = {'index': index, 'op': op, 'table_name': table_name}
+    if op == 'insert':
+        parsed['entry'] = get_schema().validate(table_name, operation.get('entry'))
+        return parsed
+    if operation.get('id') is None:
+        raise SchemaError('Missing id')
+    parsed['key'] = key_values(table_name, operation['id'])
+    if op == 'update':
+        parsed['update_colms'] = get_schema().validate(table_name, operation.get('update_colms'), partial=True)
+    return parsed
+
+# Tables of the batch each table references, directly or through others
+def foreign_key_ancestors(table_names):
+    schema = get_schema()
+    parents = {
+        table_name: {ref for ref, _ in schema.foreign_keys(table_name).values() if ref in table_names}
+        for table_name in table_names
+    }
+    ancestors = {}
+    for table_name in table_names:
+        seen = set()
+        stack = list(parents[table_name])
+        while stack:
+            parent = stack.pop()
+            if parent not in seen:
+                seen.add(parent)
+                stack.extend(parents[parent])
+        seen.discard(table_name)
+        ancestors[table_name] = seen
+    return ancestors
+
+# Each table's operations run in the given order. Across tables the next one
+# is the earliest whose foreign keys allow it: a write waits for pending
+# writes to the tables it references, a delete for pending deletes from the
+# tables that reference it. When none can go (the given order interleaves
+# the two), the earliest runs anyway.
+def batch_order(operations):
+    ancestors = foreign_key_ancestors({o['table_name'] for o in operations})
+    queues = {}
+    pending = {}    # (table, is delete) -> operations not yet ordered
+    for o in operations:
+        queues.setdefault(o['table_name'], deque()).append(o)
+        key = (o['table_name'], o['op'] == 'delete')
+        pending[key] = pending.get(key, 0) + 1
+
+    def ready(o):
+        table_name = o['table_name']
+        if o['op'] == 'delete':
+            return not any(pending.get((child, True)) for child, parents in ancestors.items()
+                           if table_name in parents)
+        return not any(pending.get((parent, False)) for parent in ancestors[table_name])
+
+    ordered = []
+    while queues:
+        heads = sorted((queue[0] for queue in queues.values()), key=lambda o: o['index'])
+        o = next((head for head in heads if ready(head)), heads[0])
+        queue = queues[o['table_name']]
+        queue.popleft()
+        if not queue:
+            del queues[o['table_name']]
+        pending[(o['table_name'], o['op'] == 'delete')] -= 1
+        ordered.append(o)
+    return ordered
+
+# {table: [row id, ...]} of every row the batch may change, new ids of
+# updated keys included
+def batch_ids(operations):
+    ids = {}
+    for o in operations:
+        table_name = o['table_name']
+        table_ids = ids.setdefault(table_name, [])
+        if o['op'] == 'insert':
+            table_ids.append(row_id(table_name, o['entry']))
+            continue
+        old = dict(zip(primary_key_columns(table_name), o['key']))
+        table_ids.append(row_id(table_name, old))
+        if o['op'] == 'update':
+            new_id = row_id(table_name, {**old, **o['update_colms']})
+            if new_id != table_ids[-1]:
+                table_ids.append(new_id)
+    return ids
+
+# Run consecutive operations that share op, table and (for inserts) columns.
+# Returns rows affected per operation index.
+def run_operations(cursor, op, table_name, group):
+    if op == 'insert':
+        columns = tuple(group[0]['entry'])
+        cursor.executemany(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+            [tuple(o['entry'][c] for c in columns) for o in group])
+        return {o['index']: 1 for o in group}
+
+    where = ' AND '.join(f"{c} = %s" for c in primary_key_columns(table_name))
+    affected = {}
+    for o in group:
+        if op == 'update':
+            set_clause = ', '.join(f"{c} = %s" for c in o['update_colms'])
+            cursor.execute(f"UPDATE {table_name} SET {set_clause} WHERE {where}",
+                           list(o['update_colms'].values()) + o['key'])
+        else:
+            cursor.execute(f"DELETE FROM {table_name} WHERE {where}", o['key'])
+        affected[o['index']] = cursor.rowcount
+    return affected
+
+@app.route('/writeBatch', methods=['POST'])
+def write_batch():
+
+    # Admin Permission Check
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'admin access required'}), 403
+
+    try:
+        data = request.get_json(force=True) or {}
+        operations = data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'Invalid input. Check json format'}), 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return jsonify({'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}), 413
+
+        parsed = []
+        for index, operation in enumerate(operations):
+            try:
+                parsed.append(parse_operation(index, operation))
+            except SchemaError as e:
+                return jsonify({'error': str(e), 'index': index, 'details': e.errors}), 400
+        try:
+            ordered = batch_order(parsed)
+        except SchemaError as e:
+            return jsonify({'error': str(e)}), 400
+        ids = batch_ids(parsed)
+
+        rows_affected = {}
+        failed = []
+        try:
+            with db_cursor(commit=True) as cursor:
+                touched = {t: standings.touched_keys(cursor, t, table_ids) for t, table_ids in ids.items()}
+                before = {t: live.snapshot(cursor, t, table_ids) for t, table_ids in ids.items()}
+
+                groups = itertools.groupby(
+                    ordered, key=lambda o: (o['op'], o['table_name'], tuple(o.get('entry') or ())))
+                for (op, table_name, _), group in groups:
+                    group = list(group)
+                    failed = [o['index'] for o in group]
+                    rows_affected.update(run_operations(cursor, op, table_name, group))
+                failed = []
+
+                changes = {}
+                for table_name, table_ids in ids.items():
+                    touched[table_name] |= standings.touched_keys(cursor, table_name, table_ids)
+                    standings.refresh(cursor, table_name, touched[table_name])
+                    changes[table_name] = live.diff(
+                        table_name, before[table_name], live.snapshot(cursor, table_name, table_ids))
+        except Error as e:
+            # Nothing was committed
+            return jsonify({'error': str(e), 'indexes': failed}), 409 if isinstance(e, IntegrityError) else 500
+
+        for table_name, table_ids in ids.items():
+            view_cache.invalidate(table_name)
+            publish_changes(table_name, changes[table_name])
+            refresh_indexes(table_name, table_ids)
+        return jsonify({
+            'success': True,
+            'message': 'Batch committed',
+            'order': [o['index'] for o in ordered],
+            'rows_affected': [rows_affected[index] for index in range(len(parsed))]
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ================== NAME SEARCH ==================
+# Typeahead over team, player, tournament and game names (see search.py), so
+# the UI can find the exact name the view endpoints take without pulling
+# whole tables. Built when the app starts (or on first use if that failed)
+# and kept current by the write endpoints.
+SEARCH_MAX_RESULTS = 50
+name_index = SearchIndex()
+name_index_lock = threading.Lock()
+
+def get_name_index():
+    if not name_index.loaded:
+        with name_index_lock:
+            if not name_index.loaded:
+                with db_cursor() as cursor:
+                    name_index.load(cursor)
+    return name_index
+
+def build_name_index():
+    try:
+        get_name_index()
+    except Exception as e:
+        app.logger.warning(f"Could not build search index: {e}")
+
+# In the background, so startup under flask run or a WSGI server is not held
+# up by the database; requests that arrive first wait on name_index_lock
+if os.getenv('SEARCH_INDEX_ON_START', '1') == '1':
+    threading.Thread(target=build_name_index, name='search-index', daemon=True).start()
+
+# Have the in-memory indexes (name_index, match_analytics, team_ratings)
+# re-read the rows a committed write touched. The write has already
+# succeeded, so a failure here only drops that index to be rebuilt on its next use.
+def refresh_indexes(table_name, ids):
+    for index, tables in ((name_index, SEARCH_SOURCES), (match_analytics, ('matchinfo',)),
+                          (team_ratings, ('matchinfo',))):
+        if index is None or not index.loaded or table_name not in tables:
+            continue
+        try:
+            with db_cursor() as cursor:
+                index.refresh(cursor, table_name, ids)
+        except Exception as e:
+            app.logger.warning(f"Could not refresh {type(index).__name__} for {table_name}: {e}")
+            index.loaded = False
+
+# GET /search?q=fak&kinds=team,player&limit=10
+#   {"results": [{"kind": "player", "id": "P001", "name": "Faker", "field": "player_username", "score": 3.0}]}
+@app.get('/search')
+def search_names():
+    try:
+        kinds = {k.lower() for k in request.args.get('kinds', '').split(',') if k}
+        unknown = sorted(kinds - SEARCH_SOURCES.keys())
+        if unknown:
+            return jsonify({'error': f"Unknown kinds: {', '.join(unknown)}"}), 400
+        try:
+            limit = int(request.args.get('limit') or 10)
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, SEARCH_MAX_RESULTS))
+
+        results = get_name_index().search(request.args.get('q', ''), kinds, limit)
+        return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.get('/searchStats')
+def search_stats():
+    return jsonify(name_index.stats())
+
+# ================== MATCH ANALYTICS ==================
+# Head-to-head, form and win rates from an in-memory NumPy copy of MatchInfo
+# (see analytics.py). Built on first use and kept current by the write endpoints.
+match_analytics = MatchAnalytics() if MatchAnalytics is not None else None
+
+def get_match_analytics():
+    if not match_analytics.loaded:
+        with db_cursor() as cursor:
+            match_analytics.load(cursor)
+    return match_analytics
+
+def int_arg(args, name, default, low, high):
+    try:
+        value = int(args.get(name) or default)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    return max(low, min(value, high))
+
+def datetime_arg(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a date/time like YYYY-MM-DD HH:MM:SS')
+
+def analytics_response(query):
+    if match_analytics is None:
+        return jsonify({'error': 'Analytics need numpy installed'}), 503
+    try:
+        return jsonify(query(get_match_analytics(), request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# GET /headToHead?team_a=T001&team_b=T002[&game_id=&tournament_id=&since=&until=&recent=10]
+@app.get('/headToHead')
+def head_to_head():
+    if not request.args.get('team_a') or not request.args.get('team_b'):
+        return jsonify({'error': 'Missing team_a or team_b'}), 400
+    return analytics_response(lambda engine, args: engine.head_to_head(
+        args['team_a'], args['team_b'], args.get('game_id'), args.get('tournament_id'),
+        datetime_arg(args, 'since'), datetime_arg(args, 'until'), int_arg(args, 'recent', 10, 0, 100)))
+
+# GET /teamForm?team_id=T001[&last=10&game_id=&tournament_id=]
+@app.get('/teamForm')
+def team_form():
+    if not request.args.get('team_id'):
+        return jsonify({'error': 'Missing team_id'}), 400
+    return analytics_response(lambda engine, args: engine.form(
+        args['team_id'], int_arg(args, 'last', 10, 1, 1000), args.get('game_id'), args.get('tournament_id')))
+
+# GET /winRates[?game_id=&tournament_id=&min_matches=1&limit=100]
+# With team_id, that team's win rate per game instead of a leaderboard
+@app.get('/winRates')
+def win_rates():
+    return analytics_response(lambda engine, args: engine.win_rates(
+        args.get('game_id'), args.get('tournament_id'), args.get('team_id'),
+        int_arg(args, 'min_matches', 1, 1, 1000000), int_arg(args, 'limit', 100, 1, 1000)))
+
+@app.get('/analyticsStats')
+def analytics_stats():
+    if match_analytics is None:
+        return jsonify({'error': 'Analytics need numpy installed'}), 503
+    return jsonify(match_analytics.stats())
+
+# ================== TEAM RATINGS ==================
+# Per-game Elo ratings replayed from MatchInfo (see ratings.py). Checkpoints
+# in TeamRating/RatingCheckpoint let a restart skip the full replay.
+# Each worker keeps its own copy; writes made through other workers reach it
+# within RATING_VERIFY_INTERVAL seconds (0: only when it loads).
+team_ratings = EloRatings(
+    k=float(os.getenv('RATING_K', 24)),
+    k_provisional=float(os.getenv('RATING_K_PROVISIONAL', 40)),
+    provisional_matches=int(os.getenv('RATING_PROVISIONAL_MATCHES', 20)),
+    checkpoint_every=int(os.getenv('RATING_CHECKPOINT_EVERY', 1000)),
+    verify_interval=float(os.getenv('RATING_VERIFY_INTERVAL', 30))
+)
+rating_updates_wake = threading.Event()
+rating_updates_thread = None
+rating_updates_lock = threading.Lock()
+
+# Only the first load runs in the request. Verifying against MatchInfo,
+# replaying changed games and checkpoints run in update_team_ratings(), so a
+# read never waits for them and never pins the session to the primary.
+def get_team_ratings():
+    if not team_ratings.loaded:
+        with db_cursor() as cursor:
+            team_ratings.ensure_current(cursor)
+        start_rating_updates()
+    elif team_ratings.stale or team_ratings.checkpoint_due:
+        rating_updates_wake.set()
+    return team_ratings
+
+def start_rating_updates():
+    global rating_updates_thread
+    with rating_updates_lock:
+        if rating_updates_thread is None:
+            rating_updates_thread = threading.Thread(target=update_team_ratings, name='rating-updates', daemon=True)
+            rating_updates_thread.start()
+
+# Verify every RATING_VERIFY_INTERVAL seconds, and replay or checkpoint
+# whenever get_team_ratings() finds work to do
+def update_team_ratings():
+    while True:
+        timed_out = not rating_updates_wake.wait(team_ratings.verify_interval or None)
+        rating_updates_wake.clear()
+        try:
+            with db_cursor() as cursor:
+                if timed_out and team_ratings.loaded:
+                    team_ratings.verify(cursor)
+                team_ratings.ensure_current(cursor)
+            if team_ratings.checkpoint_due:
+                with db_cursor(commit=True) as cursor:
+                    team_ratings.checkpoint(cursor)
+        except Exception as e:
+            app.logger.warning(f"Could not update team ratings: {e}")
+
+# GET /ratings?team_id=T001[&game_id=G001]
+@app.get('/ratings')
+def get_ratings():
+    try:
+        team_id = request.args.get('team_id')
+        if not team_id:
+            return jsonify({'error': 'Missing team_id'}), 400
+        ratings = get_team_ratings().team(team_id, request.args.get('game_id'))
+        return jsonify({'team_id': team_id, 'ratings': ratings})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# GET /leaderboard?game_id=G001[&limit=20&min_matches=1]
+@app.get('/leaderboard')
+def leaderboard():
+    try:
+        game_id = request.args.get('game_id')
+        if not game_id:
+            return jsonify({'error': 'Missing game_id'}), 400
+        try:
+            limit = int_arg(request.args, 'limit', 20, 1, 500)
+            min_matches = int_arg(request.args, 'min_matches', 1, 1, 1000000)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'game_id': game_id,
+                        'teams': get_team_ratings().leaderboard(game_id, limit, min_matches)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.get('/ratingStats')
+def rating_stats():
+    return jsonify(team_ratings.stats())
+
+@app.route('/upcomingTournaments', methods=['GET', 'POST']) 
+def upcoming_tournaments():
+    try: 
+        data = request_data()
         current_time = data.get('search')
-        print(current_time)
         current_time = datetime.strptime(current_time, "%Y-%m-%d %H:%M:%S")
 
         if current_time is None:
             return jsonify({'error': 'Invalid input. Check json key format'}), 400
 
-        cursor = connection.cursor(dictionary=True)
-        query = """SELECT UT.tournament_name,
-                          UT.tournament_schedule, 
-                          UT.tournament_format, 
-                          UT.game_name 
-                    FROM UpcomingTournament UT
-                    WHERE tournament_schedule >= %s """ 
-        cursor.execute(query, (current_time,))
-        entries = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entries)
+        return view_response('upcomingTournaments', (current_time,))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/getFormat', methods=['POST']) 
+@app.route('/getFormat', methods=['GET', 'POST']) 
 def get_format():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
-
     try: 
-        data = request.get_json(force=True)
+        data = request_data()
         format = data.get('search')
 
         if format is None:
             return jsonify({'error': 'Invalid input. Check json key format: format)'}), 400
 
-        cursor = connection.cursor(dictionary=True)
-        query = """SELECT UT.tournament_name,
-                          UT.tournament_schedule, 
-                          UT.game_name 
-                    FROM UpcomingTournament UT
-                    WHERE tournament_format = %s """ 
-        cursor.execute(query, (format,))
-        entries = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entries)
+        return view_response('getFormat', (format,))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/getPlacementPoints', methods=['POST']) 
+@app.route('/getPlacementPoints', methods=['GET', 'POST']) 
 def get_placement_points():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
-
     try: 
-        data = request.get_json(force=True)
+        data = request_data()
         tournament_name = data.get('search')
 
         if tournament_name is None:
             return jsonify({'error': 'Invalid input. Check json key format: format)'}), 400
 
-        cursor = connection.cursor(dictionary=True)
-        query = """
-            SELECT PP.team_name, 
-                PP.placement_rank AS placement_rank, 
-                PP.placement_points AS points, 
-                PP.placement_prize_amount AS prize_amount, 
-                PP.tournament_name AS tournament
-            FROM PlacementPoints PP
-            WHERE tournament_name = %s
-            ORDER BY PP.placement_rank;
-        """
-        cursor.execute(query, (tournament_name,))
-        entries = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entries)
+        return view_response('getPlacementPoints', (tournament_name,))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/getMatchesInTournament', methods=['POST']) 
+@app.route('/getMatchesInTournament', methods=['GET', 'POST']) 
 def get_matches_in_tournament():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
-
     try: 
-        data = request.get_json(force=True)
+        data = request_data()
         tournament_name = data.get('search')
 
         if tournament_name is None:
             return jsonify({'error': 'Invalid input. Check json key format: format)'}), 400
 
-        cursor = connection.cursor(dictionary=True)
-        query = """SELECT TNM.match_date_time AS schedule, 
-                          TNM.match_rounds AS rounds, 
-                          TNM.team1_name, 
-                          TNM.team2_name,
-                          TNM.winning_team_name
-                FROM TournamentMatches TNM
-                WHERE TNM.tournament_name = %s
-                ORDER BY TNM.match_date_time;"""
-        cursor.execute(query, (tournament_name,))
-        entries = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entries)
+        return view_response('getMatchesInTournament', (tournament_name,))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/getTeamsInTournament', methods=['POST']) 
+@app.route('/getTeamsInTournament', methods=['GET', 'POST']) 
 def get_teams_in_tournament():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
-
     try: 
-        data = request.get_json(force=True)
+        data = request_data()
         tournament_name = data.get('search')
 
         if tournament_name is None:
             return jsonify({'error': 'Invalid input. Check json key format', 'received_keys': list(data.keys())}), 400                                               
-        cursor = connection.cursor(dictionary=True)
-        query = """SELECT team_name
-                   FROM TournamentTeams
-                   WHERE tournament_name = %s;""" 
-        cursor.execute(query, (tournament_name,))
-        entries = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entries)
+        return view_response('getTeamsInTournament', (tournament_name,))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.route('/getTeamWins', methods=['POST']) 
+@app.route('/getTeamWins', methods=['GET', 'POST']) 
 def get_team_wins():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
-    cursor = None 
-
     try: 
-        data = request.get_json(force=True)
+        data = request_data()
         team_name = data.get('search')
 
         if team_name is None:
             return jsonify({'error': 'Invalid input. Check json key format: format)'}), 400
 
-        cursor = connection.cursor(dictionary=True)
-        query = """SELECT TW.tournament_name, TW.wins
-                FROM TeamWins TW 
-                WHERE TW.team_name = %s
-                ORDER BY TW.wins DESC"""
-        cursor.execute(query, (team_name,))
-        entries = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(entries)
+        return view_response('getTeamWins', (team_name,))
     except Exception as e:  
-        if connection:
-            connection.rollback()  
         return jsonify({'error': str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
 
-@app.post("/byGame")
-def by_game():
-    connection = get_db_connection()
-    if connection is None:
-        return jsonify({'error': 'Database connection failed'}), 500
+# The four /byGame result sets. Each runs on its own pooled connection so
+# they come back in about one round trip instead of four. {fields} is the
+# select list: BY_GAME_FIELDS by default, every column with fields=all.
+BY_GAME_SQL = {
+    # Tournaments for the game
+    "tournaments": """
+        SELECT {fields}
+        FROM Tournament t
+        WHERE t.game_id = %s
+    """,
+    # Teams for the game (via tournaments)
+    "teams": """
+        SELECT DISTINCT {fields}
+        FROM Team tm
+        JOIN TournamentTeam tt ON tt.team_id = tm.team_id
+        JOIN Tournament t      ON t.tournament_id = tt.tournament_id
+        WHERE t.game_id = %s
+    """,
+    # Players for the game (direct junction)
+    "players": """
+        SELECT {fields}
+        FROM Player p
+        JOIN PlayerGame pg ON pg.player_id = p.player_id
+        WHERE pg.game_id = %s
+    """,
+    # Organizers for the game (via tournaments)
+    "organizers": """
+        SELECT DISTINCT {fields}
+        FROM Organizer o
+        JOIN Tournament t ON t.organizer_id = o.organizer_id
+        WHERE t.game_id = %s
+    """,
+}
 
+# What the landing page lists render, plus ids; long text columns
+# (rules, achievements, aliases) are left out
+BY_GAME_FIELDS = {
+    'tournaments': ('t', ('tournament_id', 'tournament_name', 'tournament_schedule', 'tournament_format')),
+    'teams': ('tm', ('team_id', 'team_name', 'team_region')),
+    'players': ('p', ('player_id', 'player_username', 'player_role')),
+    'organizers': ('o', ('organizer_id', 'organizer_name', 'organizer_organization')),
+}
+
+BY_GAME_QUERIES = {
+    name: sql.format(fields=', '.join(f'{BY_GAME_FIELDS[name][0]}.{c}' for c in BY_GAME_FIELDS[name][1]))
+    for name, sql in BY_GAME_SQL.items()
+}
+BY_GAME_FULL_QUERIES = {
+    name: sql.format(fields=f'{BY_GAME_FIELDS[name][0]}.*') for name, sql in BY_GAME_SQL.items()
+}
+
+# fields=all asks /byGame for every column
+def wants_all_fields(data):
+    return data.get('fields') == 'all'
+
+query_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('QUERY_WORKERS', 8)),
+    thread_name_prefix='query'
+)
+
+def load_game_payload(game_id, all_fields=False):
+    queries = BY_GAME_FULL_QUERIES if all_fields else BY_GAME_QUERIES
+    futures = {
+        name: query_executor.submit(contextvars.copy_context().run, fetch_all, query, (game_id,))
+        for name, query in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+@app.route("/byGame", methods=['GET', 'POST'])
+def by_game():
     try:
-        data = request.get_json(force=True) or {}
+        data = request_data()
         game_id = data.get("game_id")
         if not game_id:
             return jsonify({'error': 'Missing game_id'}), 400
 
-        cur = connection.cursor(dictionary=True)
-
-        # Tournaments for the game
-        cur.execute("""
-            SELECT t.*
-            FROM Tournament t
-            WHERE t.game_id = %s
-        """, (game_id,))
-        tournaments = cur.fetchall()
-
-        # Teams for the game (via tournaments)
-        cur.execute("""
-            SELECT DISTINCT tm.*
-            FROM Team tm
-            JOIN TournamentTeam tt ON tt.team_id = tm.team_id
-            JOIN Tournament t      ON t.tournament_id = tt.tournament_id
-            WHERE t.game_id = %s
-        """, (game_id,))
-        teams = cur.fetchall()
-
-        # Players for the game (direct junction)
-        cur.execute("""
-            SELECT p.*
-            FROM Player p
-            JOIN PlayerGame pg ON pg.player_id = p.player_id
-            WHERE pg.game_id = %s
-        """, (game_id,))
-        players = cur.fetchall()
-
-        # Organizers for the game (via tournaments)
-        cur.execute("""
-            SELECT DISTINCT o.*
-            FROM Organizer o
-            JOIN Tournament t ON t.organizer_id = o.organizer_id
-            WHERE t.game_id = %s
-        """, (game_id,))
-        organizers = cur.fetchall()
-
-        cur.close()
-        connection.close()
-        return jsonify({
-            "tournaments": tournaments,
-            "teams": teams,
-            "players": players,
-            "organizers": organizers
-        })
+        all_fields = wants_all_fields(data)
+        if snapshot_holder is not None:
+            return conditional_response(*snapshot_game(game_id, all_fields))
+        etag = make_etag('byGame', (game_id, all_fields), VIEW_DEPENDENCIES['byGame'])
+        return conditional_response(etag, lambda: cached_result(
+            'byGame', (game_id, all_fields), lambda: load_game_payload(game_id, all_fields)))
 
     except Exception as e:
-        if connection:
-            connection.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        try:
-            cur.close()
-        except: pass
-        try:
-            connection.close()
-        except: pass
+
+# ================== READ SNAPSHOTS ==================
+# With SNAPSHOT_PATH set, the six view endpoints and /byGame are answered from
+# a snapshot file (see snapshot.py) without touching MySQL. Build one with
+#   flask --app app build-snapshot snapshots/read.snap
+# and rebuild into the same path to publish newer data: running servers swap
+# to it within SNAPSHOT_POLL seconds (or on POST /reloadSnapshot) while
+# requests already in flight finish on the old one.
+#
+# Names match case-insensitively, like MySQL's default collation. Writes still
+# go to MySQL and reach these endpoints with the next build.
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH')
+SNAPSHOT_POLL = float(os.getenv('SNAPSHOT_POLL', 5))
+
+# Each view query for every search value at once, with the column the
+# endpoint looks up by selected as snapshot_key. The key is either equal to the
+# search value ('exact') or at least it ('range'). The other columns and the
+# ORDER BY are those of VIEW_QUERIES[endpoint], so each key's rows are the ones
+# the endpoint sends, in the same order. Keep the two in step.
+SNAPSHOT_QUERIES = {
+    'upcomingTournaments': ('range', """
+        SELECT UT.tournament_schedule AS snapshot_key,
+               UT.tournament_name,
+               UT.tournament_schedule,
+               UT.tournament_format,
+               UT.game_name
+        FROM UpcomingTournament UT
+    """),
+    'getFormat': ('exact', """
+        SELECT UT.tournament_format AS snapshot_key,
+               UT.tournament_name,
+               UT.tournament_schedule,
+               UT.game_name
+        FROM UpcomingTournament UT
+    """),
+    'getPlacementPoints': ('exact', """
+        SELECT TS.tournament_name AS snapshot_key,
+            TS.team_name,
+            TS.placement_rank AS placement_rank,
+            TS.placement_points AS points,
+            TS.placement_prize_amount AS prize_amount,
+            TS.tournament_name AS tournament
+        FROM TournamentStandings TS
+        ORDER BY TS.placement_rank
+    """),
+    'getMatchesInTournament': ('exact', """
+        SELECT TNM.tournament_name AS snapshot_key,
+               TNM.match_date_time AS schedule,
+               TNM.match_rounds AS rounds,
+               TNM.team1_name,
+               TNM.team2_name,
+               TNM.winning_team_name
+        FROM TournamentMatches TNM
+        ORDER BY TNM.match_date_time
+    """),
+    'getTeamsInTournament': ('exact', """
+        SELECT tournament_name AS snapshot_key,
+               team_name
+        FROM TournamentTeams
+    """),
+    'getTeamWins': ('exact', """
+        SELECT TW.team_name AS snapshot_key,
+               TW.tournament_name, TW.wins
+        FROM TeamWinsSummary TW
+        ORDER BY TW.wins DESC
+    """),
+}
+
+snapshot_holder = None
+if SNAPSHOT_PATH:
+    snapshot_holder = snapshot.SnapshotHolder(SNAPSHOT_PATH, SNAPSHOT_POLL)
+    snapshot_holder.start()
+
+def snapshot_key(value):
+    return value.casefold() if isinstance(value, str) else value
+
+def build_snapshot(path):
+    encode = app.json.encode
+    writer = snapshot.SnapshotWriter(path)
+    try:
+        with db_cursor() as cursor:
+            # Every dataset from the same point in time
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+            for endpoint, (kind, query) in SNAPSHOT_QUERIES.items():
+                cursor.execute(query)
+                columns = [c for c in cursor.column_names if c != 'snapshot_key']
+                writer.add(endpoint, kind, (
+                    (snapshot_key(row.pop('snapshot_key')), encode(row)) for row in cursor
+                ), columns)
+
+            cursor.execute("SELECT game_id FROM Game")
+            game_ids = [row['game_id'] for row in cursor.fetchall()]
+            for name, queries in (('byGame', BY_GAME_QUERIES), ('byGame:all', BY_GAME_FULL_QUERIES)):
+                payloads = []
+                for game_id in game_ids:
+                    payload = {}
+                    for result, query in queries.items():
+                        cursor.execute(query, (game_id,))
+                        payload[result] = cursor.fetchall()
+                    payloads.append((game_id, encode(payload)))
+                writer.add(name, 'exact', payloads)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.finish({'games': len(game_ids)})
+    return writer.build_id
+
+def snapshot_etag(snap, endpoint, params):
+    raw = json.dumps([endpoint, params], sort_keys=True, default=str)
+    return f"{snap.build_id}-{hashlib.sha1(raw.encode()).hexdigest()[:20]}"
+
+# (etag, body) for conditional_response; body() returns the encoded response
+def snapshot_view(endpoint, params, columnar=False):
+    snap = snapshot_holder.current
+    dataset = snap.dataset(endpoint)
+    etag = snapshot_etag(snap, endpoint, [params, columnar])
+
+    def body():
+        key = snapshot_key(params[0])
+        rows = dataset.range_from(key) if dataset.kind == 'range' else dataset.lookup(key)
+        if columnar:
+            return app.json.encode(to_columnar([json.loads(row) for row in rows], dataset.columns)) + b'\n'
+        return b'[' + b','.join(rows) + b']\n'
+    return etag, body
+
+def snapshot_game(game_id, all_fields=False):
+    snap = snapshot_holder.current
+    dataset = snap.dataset('byGame:all' if all_fields else 'byGame')
+    etag = snapshot_etag(snap, 'byGame', (game_id, all_fields))
+
+    def body():
+        found = dataset.lookup(game_id)
+        return (found[0] if found else app.json.encode({name: [] for name in BY_GAME_SQL})) + b'\n'
+    return etag, body
+
+@app.get('/snapshotStats')
+def snapshot_stats():
+    if snapshot_holder is None:
+        return jsonify({'path': None})
+    return jsonify(snapshot_holder.stats())
+
+@app.route('/reloadSnapshot', methods=['POST'])
+def reload_snapshot():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'admin access required'}), 403
+    if snapshot_holder is None:
+        return jsonify({'error': 'Not serving from a snapshot'}), 400
+    swapped = snapshot_holder.reload(force=True)
+    if not swapped:
+        return jsonify({'error': snapshot_holder.last_error}), 500
+    return jsonify(snapshot_holder.stats())
+
+# ================== INDEX CHECKS ==================
+# Secondary indexes from Database/migrations/
+REQUIRED_INDEXES = {
+    'Tournament': ('idx_tournament_name', 'idx_tournament_schedule', 'idx_tournament_format'),
+    'Team': ('idx_team_name',),
+    'MatchInfo': ('idx_matchinfo_tournament_time', 'idx_matchinfo_winner_tournament',
+                  'idx_matchinfo_game_time', 'idx_matchinfo_time'),
+    'TeamWinsSummary': ('idx_teamwins_team',),
+    'TournamentStandings': ('idx_standings_tournament',),
+    'TeamRating': ('idx_teamrating_game_rating',),
+}
+
+# Sample parameters used to EXPLAIN each view query. Selective ones, so the
+# optimizer has a reason to use the index even on the small seed data.
+EXPLAIN_PARAMS = {
+    'upcomingTournaments': (datetime(2100, 1, 1),),
+    'getFormat': ('Double Elimination',),
+    'getPlacementPoints': ('Worlds Championship 2024',),
+    'getMatchesInTournament': ('Worlds Championship 2024',),
+    'getTeamsInTournament': ('Worlds Championship 2024',),
+    'getTeamWins': ('T1',),
+}
+
+def find_missing_indexes():
+    rows = fetch_all("""
+        SELECT TABLE_NAME, INDEX_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    present = {(row['TABLE_NAME'].lower(), row['INDEX_NAME']) for row in rows}
+    return [
+        f"{table}.{index}"
+        for table, indexes in REQUIRED_INDEXES.items()
+        for index in indexes
+        if (table.lower(), index) not in present
+    ]
+
+# EXPLAIN rows of a base table read without an index. Derived tables
+# (<derived2>, ...) and single-row const/system tables are not counted.
+def full_scans(explain_rows):
+    return [
+        row for row in explain_rows
+        if row['table'] and not row['table'].startswith('<')
+        and row['type'] not in ('system', 'const')
+        and (row['type'] == 'ALL' or row['key'] is None)
+    ]
+
+# EXPLAIN every view query and return {endpoint: [tables read with a full scan]}
+def find_full_scans():
+    scans = {}
+    with db_cursor() as cursor:
+        for endpoint, query in VIEW_QUERIES.items():
+            cursor.execute("EXPLAIN " + query, EXPLAIN_PARAMS[endpoint])
+            tables = [row['table'] for row in full_scans(cursor.fetchall())]
+            if tables:
+                scans[endpoint] = tables
+    return scans
+
+def report_missing_indexes():
+    try:
+        missing = find_missing_indexes()
+    except Exception as e:
+        app.logger.warning(f"Could not check indexes: {e}")
+        return
+    if missing:
+        app.logger.warning(
+            f"Missing indexes: {', '.join(missing)}. Apply the scripts in Database/migrations")
+
+# Checked once per process, whatever serves it (flask run, a WSGI server),
+# on the first request and through the pool that request uses anyway
+index_check_pending = os.getenv('CHECK_INDEXES_ON_START', '1') == '1' and not SNAPSHOT_PATH
+
+@app.before_request
+def check_indexes_once():
+    global index_check_pending
+    if index_check_pending:
+        index_check_pending = False
+        report_missing_indexes()
+
+# flask --app app check-indexes
+# Exits non-zero if an index is missing or a view query falls back to a full scan
+@app.cli.command('check-indexes')
+def check_indexes_command():
+    missing = find_missing_indexes()
+    scans = find_full_scans()
+    for index in missing:
+        print(f"missing index: {index}")
+    for endpoint, tables in scans.items():
+        print(f"full scan: {endpoint} reads {', '.join(tables)} without an index")
+    if missing or scans:
+        raise SystemExit(1)
+    print("all view queries use indexes")
+
+# flask --app app rebuild-standings
+# Recomputes TeamWinsSummary and TournamentStandings from the base tables
+@app.cli.command('rebuild-standings')
+def rebuild_standings_command():
+    with db_cursor(commit=True) as cursor:
+        counts = standings.rebuild(cursor)
+    view_cache.clear()
+    print(f"rebuilt {counts['team_wins']} team win rows and {counts['standings']} standings rows")
+
+# flask --app app build-snapshot PATH
+# Dumps what the snapshot endpoints serve into PATH, replacing it atomically
+@app.cli.command('build-snapshot')
+@click.argument('path')
+def build_snapshot_command(path):
+    start = time.perf_counter()
+    build_id = build_snapshot(path)
+    stats = snapshot.Snapshot(path).stats()
+    rows = sum(d['rows'] for d in stats['datasets'].values())
+    print(f"built snapshot {build_id}: {rows} rows, {stats['bytes']} bytes in {time.perf_counter() - start:.1f}s")
+
+# flask --app app rebuild-ratings
+# Replays all of MatchInfo and writes a fresh rating checkpoint
+@app.cli.command('rebuild-ratings')
+def rebuild_ratings_command():
+    start = time.perf_counter()
+    with db_cursor(commit=True) as cursor:
+        matches = team_ratings.replay(cursor)
+        teams = team_ratings.checkpoint(cursor)
+    print(f"rated {matches} matches into {teams} team ratings in {time.perf_counter() - start:.1f}s")
 
 if __name__ == '__main__':
+    try:
+        load_schema()
+    except Exception as e:
+        app.logger.warning(f"Could not load schema metadata: {e}")
+    if match_analytics is not None:
+        try:
+            get_match_analytics()
+        except Exception as e:
+            app.logger.warning(f"Could not build match analytics: {e}")
+    try:
+        get_team_ratings()
+    except Exception as e:
+        app.logger.warning(f"Could not load team ratings: {e}")
     app.run(debug=True)
@@ -0,0 +1,387 @@
+import asyncio
+import os
+from datetime import datetime
+
+import aiomysql
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, jsonify, request
+from quart.wrappers.response import DataBody
+
+import admission
+import app as sync_app
+import live
+from app import (
+    ADMISSION_ENABLED, BY_GAME_FULL_QUERIES, BY_GAME_QUERIES, COMPRESSION_ENABLED,
+    HTTP_CACHE_MAX_AGE, LIVE_HEARTBEAT, LIVE_RETRY_MS, VALID_TABLE, VIEW_DEPENDENCIES,
+    VIEW_QUERIES, SchemaError, add_expanded, admission_control, build_page_query, db_config,
+    entry_expansions, entry_tables, expansion_queries, in_query, is_batch_request, live_hub,
+    make_etag, page_result, parse_query_args, requested_entries, response_compressor,
+    view_cache, wants_all_fields, wants_columnar
+)
+from json_provider import FastJSONProvider, to_columnar
+
+# ================== ASYNC SERVING MODE ==================
+# ASGI entry point, e.g.:
+#   cd Backend && uvicorn asgi_app:application --port 8000
+#
+# The read endpoints (/getTable, /getEntry, the tournament views and /byGame)
+# are answered by a Quart app on an aiomysql pool, so one process can keep
+# hundreds of queries in flight without a thread per request. /subscribe is
+# served here too, so idle live viewers do not each hold a thread. Every
+# other route (auth, writes, exports) falls through to the Flask app in
+# app.py, run on threads by asgiref's WsgiToAsgi. Both halves share app.py's
+# view_cache and live_hub, so a write through the Flask side still
+# invalidates what the async side serves and reaches its subscribers, and
+# ETags match between the two. With SNAPSHOT_PATH set, the views and /byGame
+# are answered from app.py's snapshot here as well.
+
+async_app = Quart(__name__, static_folder=None)
+async_app.secret_key = sync_app.app.secret_key
+# Same encoder and date format as the Flask side, so both halves send identical bodies
+async_app.json = FastJSONProvider(async_app, sync_app.app.json.datetime_format)
+
+db_pool = None
+
+
+@async_app.before_serving
+async def open_pool():
+    global db_pool
+    db_pool = await aiomysql.create_pool(
+        host=db_config['host'],
+        user=db_config['user'],
+        password=db_config['password'] or '',
+        db=db_config['database'],
+        minsize=int(os.getenv('ASYNC_DB_POOL_MIN', 5)),
+        maxsize=int(os.getenv('ASYNC_DB_POOL_SIZE', 200)),
+        pool_recycle=float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+        autocommit=True
+    )
+    # /getTable checks projections against the schema cache, which the sync pool fills
+    await asyncio.to_thread(sync_app.get_schema)
+    # /search (served by the Flask side) answers from memory once this is built
+    await asyncio.to_thread(sync_app.get_name_index)
+
+
+@async_app.after_serving
+async def close_pool():
+    db_pool.close()
+    await db_pool.wait_closed()
+
+
+# Same CORS behaviour as CORS(app) on the Flask side
+@async_app.after_request
+async def add_cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+        requested = request.headers.get('Access-Control-Request-Headers')
+        if requested:
+            response.headers['Access-Control-Allow-Headers'] = requested
+    return response
+
+
+# Same compression as the Flask side, counted in the same app.response_compressor
+# stats; only whole bodies are compressed here, not streams
+@async_app.after_request
+async def compress_response(response):
+    if not COMPRESSION_ENABLED or not isinstance(response.response, DataBody) or not \
+            response_compressor.eligible(response.status_code, response.mimetype, response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    body, encoding = response_compressor.encode(
+        await response.get_data(), request.headers.get('Accept-Encoding'), route)
+    if encoding is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+# The same limits as the Flask side (app.admission_control), counted together.
+# Clients are told apart by address only, since the session lives on the
+# Flask side, and a full route never queues: a blocking wait would stall the
+# event loop, so the request gets 503 at once.
+@async_app.before_request
+async def admit_request():
+    if not ADMISSION_ENABLED or request.method == 'OPTIONS':
+        return
+    if request.method == 'GET':
+        data = request.args
+    else:
+        data = await request.get_json(silent=True, force=True)
+        data = data if isinstance(data, dict) else None
+    route = request.url_rule.rule if request.url_rule else None
+    scopes = admission_control.scopes(route, admission.table_of(data))
+    admission_control.check_rate(admission.client_key(None, request.remote_addr), scopes)
+    request.admission_held = admission_control.acquire(scopes, blocking=False)
+
+
+# Async twin of app.check_query_args
+@async_app.before_request
+async def check_query_args():
+    if request.method == 'GET':
+        try:
+            parse_query_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+
+@async_app.teardown_request
+async def release_request(exc):
+    held = getattr(request, 'admission_held', None)
+    if held:
+        admission_control.release(held)
+        request.admission_held = None
+
+
+async def overload_response(e, status):
+    response = jsonify({'error': str(e)})
+    response.status_code = status
+    response.headers['Retry-After'] = admission.retry_after_header(e.retry_after)
+    return response
+
+
+@async_app.errorhandler(admission.RateLimited)
+async def handle_rate_limited(e):
+    return await overload_response(e, 429)
+
+
+@async_app.errorhandler(admission.Overloaded)
+async def handle_overloaded(e):
+    return await overload_response(e, 503)
+
+
+async def fetch_all(query, params=()):
+    async with db_pool.acquire() as connection:
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+
+async def request_data():
+    if request.method != 'GET':
+        return await request.get_json(force=True) or {}
+    return parse_query_args(request.args)
+
+
+# Async twin of app.cached_result
+async def cached_result(endpoint, params, loader):
+    key = (endpoint, params)
+    hit, result = view_cache.get(key)
+    if hit:
+        return result
+    tables = VIEW_DEPENDENCIES[endpoint]
+    generation = view_cache.generation(tables)
+    result = await loader()
+    view_cache.set(key, result, tables, generation)
+    return result
+
+
+# Async twin of app.conditional_response
+async def conditional_response(etag, body):
+    if request.if_none_match.contains_weak(etag):
+        response = async_app.response_class('', status=304)
+    else:
+        result = await body()
+        response = (async_app.response_class(result, mimetype='application/json')
+                    if isinstance(result, bytes) else jsonify(result))
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = f'public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate'
+    return response
+
+
+# Snapshot lookups are in-memory, so body() runs on the event loop
+async def snapshot_response(etag, body):
+    async def encoded():
+        return body()
+    return await conditional_response(etag, encoded)
+
+
+async def view_response(endpoint, params):
+    columnar = wants_columnar(await request_data())
+    if sync_app.snapshot_holder is not None:
+        return await snapshot_response(*sync_app.snapshot_view(endpoint, params, columnar))
+    etag = make_etag(endpoint, [params, columnar], VIEW_DEPENDENCIES[endpoint])
+
+    async def body():
+        rows = await cached_result(endpoint, params, lambda: fetch_all(VIEW_QUERIES[endpoint], params))
+        return to_columnar(rows) if columnar else rows
+    return await conditional_response(etag, body)
+
+
+@async_app.route('/getTable', methods=['GET', 'POST'])
+async def get_table():
+    try:
+        data = await request_data()
+        table_name = data.get('table_name')
+
+        if table_name is None:
+            return jsonify({'error': 'Invalid input. Check json key format'}), 400
+
+        table_name = table_name.lower()
+        if table_name not in VALID_TABLE:
+            return jsonify({'error': 'Invalid table name'}), 400
+
+        etag = make_etag('getTable', data, (table_name,))
+        if request.if_none_match.contains_weak(etag):
+            return await conditional_response(etag, None)
+
+        try:
+            query, values, primary_key, limit = build_page_query(table_name, data)
+        except SchemaError as e:
+            return jsonify({'error': str(e), 'columns': e.errors}), 400
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        rows = await fetch_all(query, values)
+
+        async def body():
+            return page_result(rows, primary_key, limit, wants_columnar(data))
+        return await conditional_response(etag, body)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Async twin of app.load_entries
+async def load_entries(requested, expansions):
+    entries = {}
+    for table_name, ids in requested.items():
+        entries[table_name] = await fetch_all(*in_query(table_name, VALID_TABLE[table_name], ids))
+    result = {'entries': entries}
+    if expansions:
+        expanded = result['expanded'] = {}
+        for target, query, values in expansion_queries(entries, expansions):
+            add_expanded(expanded, target, await fetch_all(query, values))
+    return result
+
+
+@async_app.route('/getEntry', methods=['GET', 'POST'])
+async def get_entry():
+    try:
+        data = await request_data()
+        if is_batch_request(data):
+            try:
+                requested = requested_entries(data)
+                expansions = entry_expansions(requested, data.get('expand'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            etag = make_etag('getEntry', [requested, expansions], entry_tables(requested, expansions))
+            return await conditional_response(etag, lambda: load_entries(requested, expansions))
+
+        table_name = data.get('table_name')
+        id = data.get('id')
+
+        if table_name is None or id is None:
+            return jsonify({'error': 'Invalid input. Check json format'}), 400
+        table_name = table_name.lower()
+        if table_name not in VALID_TABLE:
+            return jsonify({'error': 'Invalid table name'}), 400
+        primary_key = VALID_TABLE[table_name]
+
+        etag = make_etag('getEntry', (table_name, id), (table_name,))
+
+        async def body():
+            return await fetch_all(f"SELECT * FROM {table_name} WHERE {primary_key} = %s", (id,))
+        return await conditional_response(etag, body)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# The six view endpoints all take one "search" value
+def add_view_route(endpoint):
+    async def view():
+        try:
+            data = await request_data()
+            search = data.get('search')
+            if search is None:
+                return jsonify({'error': 'Invalid input. Check json key format'}), 400
+            if endpoint == 'upcomingTournaments':
+                search = datetime.strptime(search, "%Y-%m-%d %H:%M:%S")
+            return await view_response(endpoint, (search,))
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    async_app.add_url_rule(f'/{endpoint}', endpoint, view, methods=['GET', 'POST'])
+
+for view_endpoint in VIEW_QUERIES:
+    add_view_route(view_endpoint)
+
+
+async def load_game_payload(game_id, all_fields=False):
+    queries = BY_GAME_FULL_QUERIES if all_fields else BY_GAME_QUERIES
+    results = await asyncio.gather(*(
+        fetch_all(query, (game_id,)) for query in queries.values()
+    ))
+    return dict(zip(queries, results))
+
+
+@async_app.route('/byGame', methods=['GET', 'POST'])
+async def by_game():
+    try:
+        data = await request_data()
+        game_id = data.get("game_id")
+        if not game_id:
+            return jsonify({'error': 'Missing game_id'}), 400
+
+        all_fields = wants_all_fields(data)
+        if sync_app.snapshot_holder is not None:
+            return await snapshot_response(*sync_app.snapshot_game(game_id, all_fields))
+        etag = make_etag('byGame', (game_id, all_fields), VIEW_DEPENDENCIES['byGame'])
+
+        async def body():
+            return await cached_result(
+                'byGame', (game_id, all_fields), lambda: load_game_payload(game_id, all_fields))
+        return await conditional_response(etag, body)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Async twin of app.subscribe; the writes that publish run on the Flask side
+# of this process, and the hub hands their frames to this event loop
+@async_app.get('/subscribe')
+async def subscribe():
+    tournament = request.args.get('tournament')
+    if not tournament:
+        return jsonify({'error': 'Missing tournament'}), 400
+    subscriber = live_hub.subscribe(
+        tournament, request.headers.get('Last-Event-ID'), loop=asyncio.get_running_loop())
+
+    async def generate():
+        try:
+            yield f"retry: {LIVE_RETRY_MS}\n\n".encode()
+            while True:
+                frame = await subscriber.next_frame(LIVE_HEARTBEAT)
+                if frame is None:
+                    yield b": keepalive\n\n"
+                    continue
+                yield frame.encode()
+                if frame is live.RESET_FRAME:
+                    return
+        finally:
+            live_hub.unsubscribe(subscriber)
+
+    response = async_app.response_class(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None
+    return response
+
+
+@async_app.get('/asyncPoolStats')
+async def async_pool_stats():
+    return jsonify({
+        'size': db_pool.size,
+        'free': db_pool.freesize,
+        'in_use': db_pool.size - db_pool.freesize,
+        'max_size': db_pool.maxsize,
+    })
+
+
+ASYNC_PATHS = {rule.rule for rule in async_app.url_map.iter_rules()}
+wsgi_fallback = WsgiToAsgi(sync_app.app)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan' or scope.get('path') in ASYNC_PATHS:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_fallback(scope, receive, send)
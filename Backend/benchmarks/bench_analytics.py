@@ -0,0 +1,91 @@
+# Times MatchAnalytics on synthetic matches (no database needed): the initial
+# build, head-to-head / form / win-rate queries, incremental writes, and
+# queries while writes sit in the delta block.
+#
+#   cd Backend && python benchmarks/bench_analytics.py --matches 1000000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from analytics import MatchAnalytics
+
+
+def synthetic_matches(count, teams, games, tournaments, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    for i in range(count):
+        team1, team2 = rng.sample(teams, 2)
+        yield {
+            'match_id': f'M{i:07d}',
+            'match_date_time': start + timedelta(minutes=5 * i),
+            'match_rounds': rng.randint(1, 5),
+            'team1_id': team1,
+            'team2_id': team2,
+            'match_winner_id': rng.choice((team1, team2, team1, team2, None)),
+            'game_id': rng.choice(games),
+            'tournament_id': rng.choice(tournaments),
+        }
+
+
+def run(label, fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{label:<40} p50={statistics.median(timings):8.3f}ms "
+          f"p99={timings[int(len(timings) * 0.99) - 1]:8.3f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--matches', type=int, default=1000000)
+    parser.add_argument('--teams', type=int, default=2000)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--tournaments', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--writes', type=int, default=5000)
+    args = parser.parse_args()
+
+    teams = [f'T{i:05d}' for i in range(args.teams)]
+    games = [f'G{i:03d}' for i in range(args.games)]
+    tournaments = [f'R{i:04d}' for i in range(args.tournaments)]
+    rows = list(synthetic_matches(args.matches, teams, games, tournaments))
+
+    engine = MatchAnalytics()
+    start = time.perf_counter()
+    engine.load_rows(rows)
+    print(f"build {args.matches} matches: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    rng = random.Random(2)
+    pick_pair = lambda: rng.sample(teams, 2)
+
+    def queries(suffix=''):
+        run('head_to_head' + suffix, lambda: engine.head_to_head(*pick_pair()), args.iterations)
+        run('head_to_head game' + suffix,
+            lambda: engine.head_to_head(*pick_pair(), game_id=rng.choice(games)), args.iterations)
+        run('form last 20' + suffix, lambda: engine.form(rng.choice(teams), last=20), args.iterations)
+        run('win_rates' + suffix, lambda: engine.win_rates(), max(args.iterations // 10, 5))
+        run('win_rates game' + suffix,
+            lambda: engine.win_rates(game_id=rng.choice(games)), max(args.iterations // 10, 5))
+        run('win_rates by game of team' + suffix,
+            lambda: engine.win_rates(team_id=rng.choice(teams)), args.iterations)
+
+    queries()
+
+    # Rewrite existing matches one at a time, the way the write endpoints do
+    updates = list(synthetic_matches(args.writes, teams, games, tournaments, seed=3))
+    start = time.perf_counter()
+    for row in updates:
+        engine.apply([row['match_id']], [row])
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"apply {args.writes} single-match writes: {elapsed:.0f}ms "
+          f"({elapsed / args.writes * 1000:.1f}us each), stats={engine.stats()}")
+    queries(' (with delta)')
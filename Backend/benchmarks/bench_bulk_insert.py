@@ -0,0 +1,62 @@
+# Compares MatchInfo ingestion throughput: one INSERT + commit per row (the
+# /insertEntry path) against bulk_write_table() (executemany in chunked
+# transactions, the /bulkInsert path). Rows use match_id B00000.. and are
+# deleted again after each run.
+#
+#   cd Backend && python benchmarks/bench_bulk_insert.py --rows 5000 --chunk-size 500
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import bulk_write_table, db_cursor
+
+
+def make_rows(count):
+    return [
+        {'match_id': f'B{i:05d}', 'match_rounds': 1 + i % 5,
+         'match_date_time': '2024-10-15 15:00:00', 'match_results': 'bench'}
+        for i in range(count)
+    ]
+
+
+def cleanup():
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM MatchInfo WHERE match_id LIKE 'B%' AND match_results = 'bench'")
+
+
+def single_row(rows, chunk_size):
+    for row in rows:
+        with db_cursor(commit=True) as cursor:
+            columns = ', '.join(row)
+            placeholders = ', '.join(['%s'] * len(row))
+            cursor.execute(f"INSERT INTO matchinfo ({columns}) VALUES ({placeholders})",
+                           tuple(row.values()))
+
+
+def bulk(rows, chunk_size):
+    written, errors = bulk_write_table('matchinfo', list(enumerate(rows)), chunk_size=chunk_size)
+    if errors:
+        raise RuntimeError(errors[:3])
+
+
+def run(label, fn, rows, chunk_size):
+    cleanup()
+    start = time.perf_counter()
+    fn(rows, chunk_size)
+    elapsed = time.perf_counter() - start
+    cleanup()
+    print(f"{label:<10} {len(rows)} rows in {elapsed:8.3f}s  {len(rows) / elapsed:10.1f} rows/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    run('single', single_row, rows, args.chunk_size)
+    run('bulk', bulk, rows, args.chunk_size)
@@ -0,0 +1,48 @@
+# Compares /byGame latency: the old path (four queries one after another on one
+# connection) against load_game_payload() (four queries on pooled connections
+# at once). Both bypass the result cache so every iteration hits MySQL.
+#
+#   cd Backend && python benchmarks/bench_by_game.py --game G001 --iterations 500
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import BY_GAME_QUERIES, db_cursor, load_game_payload
+
+
+def sequential_payload(game_id):
+    with db_cursor() as cursor:
+        payload = {}
+        for name, query in BY_GAME_QUERIES.items():
+            cursor.execute(query, (game_id,))
+            payload[name] = cursor.fetchall()
+        return payload
+
+
+def run(label, fn, game_id, iterations, warmup):
+    for _ in range(warmup):
+        fn(game_id)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(game_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{label:<12} p50={statistics.median(timings):7.3f}ms "
+          f"p99={timings[int(len(timings) * 0.99) - 1]:7.3f}ms "
+          f"mean={statistics.fmean(timings):7.3f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--game', default='G001')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    args = parser.parse_args()
+
+    run('sequential', sequential_payload, args.game, args.iterations, args.warmup)
+    run('concurrent', load_game_payload, args.game, args.iterations, args.warmup)
@@ -0,0 +1,53 @@
+# Compares JSON encoding of every VALID_TABLE table: Flask's stdlib provider,
+# FastJSONProvider (orjson when installed) and FastJSONProvider with the
+# columnar {columns, rows} layout. Reports payload size and encode time.
+#
+#   cd Backend && python benchmarks/bench_json.py --iterations 50
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import VALID_TABLE, app, db_cursor
+from json_provider import FastJSONProvider, orjson, to_columnar
+
+
+def encode_time(encode, payload, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        encode(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--datetime-format', default='http', choices=('http', 'iso'))
+    args = parser.parse_args()
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app, args.datetime_format)
+    cases = (
+        ('stdlib', lambda rows: stdlib.dumps(rows).encode(), lambda rows: rows),
+        ('fast', fast.encode, lambda rows: rows),
+        ('fast+columnar', fast.encode, to_columnar),
+    )
+
+    print(f"encoder: {'orjson' if orjson else 'stdlib fallback'}, dates: {args.datetime_format}")
+    for table_name in VALID_TABLE:
+        with db_cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {table_name}")
+            rows = cursor.fetchall()
+        print(f"{table_name} ({len(rows)} rows)")
+        for label, encode, shape in cases:
+            payload = shape(rows)
+            size = len(encode(payload))
+            ms = encode_time(encode, payload, args.iterations)
+            print(f"  {label:<14} {size:>10} bytes  {ms:8.3f}ms")
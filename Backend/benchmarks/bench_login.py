@@ -0,0 +1,99 @@
+# Login burst benchmark: `--logins` clients POST /login in a loop while
+# `--readers` clients keep hitting a read endpoint. Reports throughput and
+# latency for both groups, and how many logins were turned away with 503
+# because the bcrypt pool was full. Run against a server started with the
+# settings under test, e.g.:
+#
+#   cd Backend && BCRYPT_WORKERS=4 SESSION_STORE=sqlite python app.py
+#   python benchmarks/bench_login.py --logins 50 --readers 20 --duration 20 \
+#       --username admin --password Admin123
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+def summarize(name, timings, statuses, elapsed):
+    timings.sort()
+    return {
+        'group': name,
+        'requests': len(timings),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 2) if timings else None,
+        'p99_ms': round(timings[max(0, int(len(timings) * 0.99) - 1)] * 1000, 2) if timings else None,
+        'busy_503': statuses.count(503),
+        'errors': len([s for s in statuses if s != 503]),
+    }
+
+
+async def login_worker(client, args, deadline, timings, statuses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post(args.url + '/login',
+                                         json={'username': args.username, 'password': args.password})
+        except httpx.HTTPError as e:
+            statuses.append(type(e).__name__)
+            continue
+        if response.status_code != 200:
+            statuses.append(response.status_code)
+            continue
+        timings.append(time.perf_counter() - start)
+
+
+async def read_worker(client, args, deadline, timings, statuses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(args.url + '/getTable', params={'table_name': 'team', 'limit': 50})
+        except httpx.HTTPError as e:
+            statuses.append(type(e).__name__)
+            continue
+        if response.status_code >= 400:
+            statuses.append(response.status_code)
+            continue
+        timings.append(time.perf_counter() - start)
+
+
+async def main(args):
+    login_timings, login_statuses = [], []
+    read_timings, read_statuses = [], []
+    limits = httpx.Limits(max_connections=args.logins + args.readers)
+    deadline = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    # One client per login worker so each keeps its own session cookie
+    clients = [httpx.AsyncClient(limits=limits, timeout=30) for _ in range(args.logins)]
+    async with httpx.AsyncClient(limits=limits, timeout=30) as reader:
+        await asyncio.gather(
+            *(login_worker(c, args, deadline, login_timings, login_statuses) for c in clients),
+            *(read_worker(reader, args, deadline, read_timings, read_statuses) for _ in range(args.readers)),
+        )
+    for client in clients:
+        await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    results = [summarize('login', login_timings, login_statuses, elapsed),
+               summarize('read', read_timings, read_statuses, elapsed)]
+    for r in results:
+        print(f"{r['group']:<6} {r['rps']:>8} req/s  p50={r['p50_ms']}ms  p99={r['p99_ms']}ms  "
+              f"503={r['busy_503']}  errors={r['errors']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='Admin123')
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--readers', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    args.url = args.url.rstrip('/')
+    asyncio.run(main(args))
@@ -0,0 +1,64 @@
+# Times a full Elo replay over synthetic matches (no database needed) and the
+# per-match cost of the incremental path, then the leaderboard and team reads.
+#
+#   cd Backend && python benchmarks/bench_ratings.py --matches 2000000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ratings import EloRatings
+
+
+def synthetic_matches(count, teams, games, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    for i in range(count):
+        team1, team2 = rng.sample(teams, 2)
+        yield {
+            'match_id': f'M{i:07d}',
+            'match_date_time': start + timedelta(minutes=5 * i),
+            'game_id': rng.choice(games),
+            'team1_id': team1,
+            'team2_id': team2,
+            'match_winner_id': rng.choice((team1, team2)),
+        }
+
+
+def run(label, fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{label:<16} p50={statistics.median(timings):8.3f}ms "
+          f"p99={timings[int(len(timings) * 0.99) - 1]:8.3f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--matches', type=int, default=1000000)
+    parser.add_argument('--teams', type=int, default=2000)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    teams = [f'T{i:05d}' for i in range(args.teams)]
+    games = [f'G{i:03d}' for i in range(args.games)]
+    rows = list(synthetic_matches(args.matches, teams, games))
+
+    engine = EloRatings()
+    start = time.perf_counter()
+    engine.rate_rows(rows)
+    elapsed = time.perf_counter() - start
+    print(f"replay {args.matches} matches: {elapsed:.2f}s ({elapsed / args.matches * 1e6:.2f}us per match)")
+
+    rng = random.Random(2)
+    run('leaderboard', lambda: engine.leaderboard(rng.choice(games), 20), args.iterations)
+    run('team', lambda: engine.team(rng.choice(teams)), args.iterations)
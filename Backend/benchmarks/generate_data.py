@@ -0,0 +1,391 @@
+# Synthetic MatchTracker data at benchmark scale. Writes one tab-separated
+# file per table plus manifest.json into --out, and with --load replaces the
+# contents of every base table with them (UserAccount and SchemaMigration are
+# left alone) using LOAD DATA LOCAL INFILE, then rebuilds the derived tables.
+#
+#   cd Backend && python benchmarks/generate_data.py --scale small --out /tmp/mt-small --load
+#   cd Backend && python benchmarks/generate_data.py --scale large --teams 10000 --matches 5000000 \
+#       --out /tmp/mt-large --load
+#
+# The data is skewed the way real esports data is: a few games hold most of
+# the tournaments, strong teams enter far more tournaments than weak ones,
+# tournament sizes follow a long tail, the stronger team usually wins, and
+# recent years have more events than early ones. The same --seed always gives
+# the same files.
+#
+# Keys are a letter prefix plus five base-36 digits (60M values), since the
+# schema's id columns are VARCHAR(6).
+import argparse
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+SCALES = {
+    'tiny':  {'games': 5,  'teams': 200,   'tournaments': 100,   'matches': 10000},
+    'small': {'games': 10, 'teams': 2000,  'tournaments': 2000,  'matches': 200000},
+    'large': {'games': 20, 'teams': 10000, 'tournaments': 50000, 'matches': 5000000},
+}
+
+# Parents before children; --load empties them in reverse
+TABLE_COLUMNS = {
+    'Game': ('game_id', 'game_name', 'game_rules', 'game_team_size'),
+    'Venue': ('venue_id', 'venue_name', 'venue_location', 'venue_capacity'),
+    'PrizePool': ('prize_pool_id', 'prize_pool_amount', 'prize_pool_currency'),
+    'Sponsor': ('sponsor_id', 'sponsor_name', 'sponsor_type', 'sponsor_contact'),
+    'Commentator': ('commentator_id', 'commentator_name', 'commentator_experience', 'commentator_language'),
+    'Organizer': ('organizer_id', 'organizer_name', 'organizer_organization', 'organizer_contact'),
+    'Manager': ('manager_id', 'manager_name', 'manager_contact'),
+    'Coach': ('coach_id', 'coach_name', 'coach_specialty'),
+    'Team': ('team_id', 'team_name', 'team_region', 'team_achievements', 'team_earnings',
+             'manager_id', 'coach_id'),
+    'Tournament': ('tournament_id', 'tournament_name', 'tournament_rules', 'tournament_duration',
+                   'tournament_schedule', 'tournament_format', 'game_id', 'venue_id',
+                   'prize_pool_id', 'organizer_id'),
+    'Placement': ('placement_id', 'placement_rank', 'placement_points', 'placement_prize_amount',
+                  'team_id', 'tournament_id'),
+    'Player': ('player_id', 'player_username', 'player_real_name', 'player_role', 'player_rank',
+               'player_aliases', 'player_age', 'player_games'),
+    'TeamPlayer': ('team_id', 'player_id'),
+    'PlayerGame': ('player_id', 'game_id'),
+    'MatchInfo': ('match_id', 'match_rounds', 'match_date_time', 'match_results', 'tournament_id',
+                  'game_id', 'team1_id', 'team2_id', 'match_winner_id'),
+    'MatchCommentator': ('match_id', 'commentator_id'),
+    'TournamentTeam': ('tournament_id', 'team_id', 'placement_id'),
+    'TournamentSponsor': ('tournament_id', 'sponsor_id'),
+    'TournamentCommentator': ('tournament_id', 'commentator_id'),
+}
+
+GAME_NAMES = ['League of Legends', 'Counter-Strike 2', 'Valorant', 'Dota 2', 'Overwatch 2',
+              'Rocket League', 'Rainbow Six Siege', 'Apex Legends', 'Fortnite', 'PUBG',
+              'Street Fighter 6', 'Tekken 8', 'Super Smash Bros', 'StarCraft II', 'Call of Duty',
+              'Hearthstone', 'Halo Infinite', 'Mobile Legends', 'Free Fire', 'Teamfight Tactics']
+TEAM_SIZES = [5, 5, 5, 5, 5, 3, 5, 3, 4, 4, 1, 1, 1, 1, 4, 1, 4, 5, 4, 1]
+REGIONS = ['NA', 'EU', 'KR', 'CN', 'BR', 'SEA', 'JP', 'OCE', 'LATAM', 'CIS', 'MENA']
+TEAM_WORDS = ['Storm', 'Phoenix', 'Titan', 'Vortex', 'Falcon', 'Nova', 'Rogue', 'Shadow', 'Apex',
+              'Cipher', 'Dragon', 'Fury', 'Ghost', 'Hydra', 'Inferno', 'Jaguar', 'Kraken', 'Legion',
+              'Monarch', 'Nomad', 'Onyx', 'Pulse', 'Quantum', 'Raven', 'Sentinel', 'Tempest',
+              'Union', 'Viper', 'Wolf', 'Zenith']
+TEAM_SUFFIXES = ['Gaming', 'Esports', 'Club', 'Squad', 'Academy', 'Collective', 'United', 'Crew']
+FIRST_NAMES = ['Alex', 'Min-jun', 'Lucas', 'Wei', 'Sofia', 'Mateo', 'Yuki', 'Ivan', 'Omar', 'Lena',
+               'Kai', 'Jonas', 'Hana', 'Diego', 'Aarav', 'Chloe', 'Mikhail', 'Ji-woo', 'Noah', 'Lin']
+LAST_NAMES = ['Kim', 'Silva', 'Chen', 'Novak', 'Garcia', 'Sato', 'Petrov', 'Haddad', 'Muller',
+              'Nguyen', 'Park', 'Rossi', 'Santos', 'Lee', 'Kowalski', 'Tanaka', 'Ivanova', 'Wang']
+SYLLABLES = ['fa', 'ker', 'zy', 'nox', 'vi', 'ral', 'shi', 'ro', 'tek', 'mo', 'dex', 'lu', 'qua',
+             'zen', 'ka', 'rix', 'sol', 'ty', 'xo', 'bur']
+ROLES = ['Carry', 'Support', 'Entry', 'IGL', 'Sniper', 'Flex', 'Tank', 'Jungle', 'Mid', 'Anchor']
+RANKS = ['Challenger', 'Grandmaster', 'Master', 'Diamond', 'Platinum', 'Gold']
+SERIES = ['Masters', 'Championship', 'Invitational', 'Open', 'Cup', 'League', 'Major', 'Clash']
+FORMATS = ['Single Elimination', 'Double Elimination', 'Round Robin', 'Swiss', 'Group Stage + Playoffs']
+CURRENCIES = ['USD', 'USD', 'USD', 'EUR', 'KRW', 'CNY', 'BRL']
+CITIES = ['Seoul', 'Los Angeles', 'Berlin', 'Shanghai', 'Sao Paulo', 'Katowice', 'Tokyo',
+          'Copenhagen', 'Riyadh', 'Sydney', 'Paris', 'Singapore', 'Toronto', 'Madrid']
+LANGUAGES = ['English', 'Korean', 'Chinese', 'Portuguese', 'Spanish', 'Russian', 'Japanese', 'French']
+
+DATA_START = datetime(2019, 1, 1)
+DATA_END = datetime(2026, 12, 31)
+ID_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def make_id(prefix, n):
+    digits = []
+    for _ in range(5):
+        n, d = divmod(n, 36)
+        digits.append(ID_DIGITS[d])
+    if n:
+        raise ValueError(f'{prefix} ids exhausted')
+    return prefix + ''.join(reversed(digits))
+
+
+# Cumulative Zipf weights: item i is picked in proportion to 1 / (i + 1) ** s
+def zipf_weights(count, s=1.1):
+    return list(itertools.accumulate(1 / (i + 1) ** s for i in range(count)))
+
+
+def pick(rng, items, cum_weights):
+    return items[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+# More events in later years: the square root of a uniform draw leans toward 1
+def recent_datetime(rng):
+    return DATA_START + (DATA_END - DATA_START) * math.sqrt(rng.random())
+
+
+def tsv_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+class TableWriter:
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.files = {}
+        self.counts = {}
+
+    def write(self, table, row):
+        f = self.files.get(table)
+        if f is None:
+            f = self.files[table] = open(os.path.join(self.out_dir, f'{table}.tsv'), 'w', encoding='utf-8')
+            self.counts[table] = 0
+        f.write('\t'.join(map(tsv_value, row)))
+        f.write('\n')
+        self.counts[table] += 1
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+def person_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def generate(args, out):
+    rng = random.Random(args.seed)
+
+    # ----- small lookup tables -----
+    games = [make_id('G', i) for i in range(args.games)]
+    for i, game_id in enumerate(games):
+        base = GAME_NAMES[i % len(GAME_NAMES)]
+        name = base if i < len(GAME_NAMES) else f"{base} {i // len(GAME_NAMES) + 1}"
+        out.write('Game', (game_id, name, f"Official {name} competitive ruleset",
+                           TEAM_SIZES[i % len(TEAM_SIZES)]))
+    team_size = {game_id: TEAM_SIZES[i % len(TEAM_SIZES)] for i, game_id in enumerate(games)}
+    game_weights = zipf_weights(len(games), 1.2)
+
+    venues = [make_id('V', i) for i in range(max(10, args.tournaments // 50))]
+    for i, venue_id in enumerate(venues):
+        city = CITIES[i % len(CITIES)]
+        out.write('Venue', (venue_id, f"{city} Arena {i}"[:30], city, rng.choice((2000, 5000, 12000, 20000))))
+
+    organizers = [make_id('O', i) for i in range(max(5, args.tournaments // 200))]
+    for i, organizer_id in enumerate(organizers):
+        out.write('Organizer', (organizer_id, f"{rng.choice(TEAM_WORDS)} Events {i}",
+                                f"{rng.choice(TEAM_WORDS)} Media", f"events{i}@example.com"))
+    organizer_weights = zipf_weights(len(organizers))
+
+    sponsors = [make_id('S', i) for i in range(max(10, args.tournaments // 100))]
+    for i, sponsor_id in enumerate(sponsors):
+        out.write('Sponsor', (sponsor_id, f"{rng.choice(TEAM_WORDS)} {rng.choice(('Energy', 'Tech', 'Bank', 'Motors'))} {i}",
+                              rng.choice(('Hardware', 'Beverage', 'Apparel', 'Finance', 'Telecom')),
+                              f"partners{i}@example.com"))
+    sponsor_weights = zipf_weights(len(sponsors))
+
+    commentators = [make_id('C', i) for i in range(max(10, args.tournaments // 20))]
+    for i, commentator_id in enumerate(commentators):
+        out.write('Commentator', (commentator_id, person_name(rng), f"{rng.randint(1, 15)} years",
+                                  rng.choice(LANGUAGES)))
+    commentator_weights = zipf_weights(len(commentators))
+
+    managers = [make_id('N', i) for i in range(max(1, args.teams // 2))]
+    for i, manager_id in enumerate(managers):
+        out.write('Manager', (manager_id, person_name(rng), f"manager{i}@example.com"))
+    coaches = [make_id('K', i) for i in range(max(1, args.teams // 2))]
+    for coach_id in coaches:
+        out.write('Coach', (coach_id, person_name(rng), rng.choice(ROLES) + ' play'))
+
+    # ----- teams and players -----
+    # Each team plays one game. Its position in that game's list is its
+    # strength: the first teams win more and are invited more often.
+    teams_by_game = {game_id: [] for game_id in games}
+    team_ids = [make_id('T', i) for i in range(args.teams)]
+    for i, team_id in enumerate(team_ids):
+        game_id = pick(rng, games, game_weights)
+        teams_by_game[game_id].append(team_id)
+        name = f"{rng.choice(TEAM_WORDS)} {rng.choice(TEAM_SUFFIXES)} {i}"
+        out.write('Team', (team_id, name, rng.choice(REGIONS), None,
+                           round(min(999999.99, rng.paretovariate(1.5) * 1000), 2),
+                           rng.choice(managers), rng.choice(coaches)))
+    # A game with fewer than two teams borrows some, so every game can host matches
+    for game_id, members in teams_by_game.items():
+        while len(members) < 2:
+            team_id = rng.choice(team_ids)
+            if team_id not in members:
+                members.append(team_id)
+    strength = {}
+    team_weights = {}
+    for game_id, members in teams_by_game.items():
+        team_weights[game_id] = zipf_weights(len(members), 0.9)
+        for rank, team_id in enumerate(members):
+            strength[team_id] = 1 / (rank + 1) ** 0.5
+
+    player_count = 0
+    for game_id, members in teams_by_game.items():
+        for team_id in members:
+            for _ in range(team_size[game_id] + rng.choice((0, 1, 1, 2))):
+                player_id = make_id('P', player_count)
+                player_count += 1
+                username = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+                out.write('Player', (player_id, f"{username}{player_count % 1000}", person_name(rng),
+                                     rng.choice(ROLES), rng.choice(RANKS),
+                                     username.upper() if rng.random() < 0.3 else None,
+                                     rng.randint(16, 32), None))
+                out.write('TeamPlayer', (team_id, player_id))
+                out.write('PlayerGame', (player_id, game_id))
+                if rng.random() < 0.1:
+                    other = rng.choice(games)
+                    if other != game_id:
+                        out.write('PlayerGame', (player_id, other))
+
+    # ----- tournaments, placements and matches -----
+    # Match counts per tournament follow a long tail: most events are small,
+    # a few (league seasons) run thousands of matches
+    sizes = [rng.choice((8, 16, 16, 16, 32, 32, 64)) for _ in range(args.tournaments)]
+    shares = [rng.lognormvariate(0, 1) * size for size in sizes]
+    total_share = sum(shares)
+    match_counts = [int(args.matches * share / total_share) for share in shares]
+    for i in range(args.matches - sum(match_counts)):
+        match_counts[i % len(match_counts)] += 1
+
+    now = datetime.now()
+    match_number = placement_number = prize_number = 0
+    for t, (size, match_count) in enumerate(zip(sizes, match_counts)):
+        tournament_id = make_id('R', t)
+        game_id = pick(rng, games, game_weights)
+        members = teams_by_game[game_id]
+        weights = team_weights[game_id]
+        entrants = set()
+        for _ in range(size * 4):
+            if len(entrants) >= min(size, len(members)):
+                break
+            entrants.add(pick(rng, members, weights))
+        entrants = sorted(entrants)
+        schedule = recent_datetime(rng)
+        days = max(1, min(180, match_count // max(1, len(entrants))))
+
+        prize_pool_id = make_id('Z', prize_number)
+        prize_number += 1
+        prize = int(min(99999999, rng.paretovariate(1.2) * 10000))
+        out.write('PrizePool', (prize_pool_id, prize, rng.choice(CURRENCIES)))
+        out.write('Tournament', (
+            tournament_id,
+            f"{GAME_NAMES[games.index(game_id) % len(GAME_NAMES)][:18]} {rng.choice(SERIES)} {schedule.year} #{t}",
+            'Standard competitive rules', f"{days} days", schedule, rng.choice(FORMATS), game_id,
+            rng.choice(venues), prize_pool_id, pick(rng, organizers, organizer_weights)))
+        for sponsor_id in {pick(rng, sponsors, sponsor_weights) for _ in range(rng.randint(0, 3))}:
+            out.write('TournamentSponsor', (tournament_id, sponsor_id))
+        for commentator_id in {pick(rng, commentators, commentator_weights) for _ in range(rng.randint(1, 3))}:
+            out.write('TournamentCommentator', (tournament_id, commentator_id))
+
+        # Final standings follow strength with some noise
+        finished = schedule + timedelta(days=days) < now
+        order = sorted(entrants, key=lambda team_id: -strength[team_id] * rng.uniform(0.5, 1.5))
+        for rank, team_id in enumerate(order, 1):
+            placement_id = None
+            if finished:
+                placement_id = make_id('L', placement_number)
+                placement_number += 1
+                share = (0.5, 0.25, 0.12, 0.08)[rank - 1] if rank <= 4 else 0
+                out.write('Placement', (placement_id, str(rank), str(max(0, 100 - 10 * (rank - 1)))[:3],
+                                        round(min(999999.99, prize * share), 2), team_id, tournament_id))
+            out.write('TournamentTeam', (tournament_id, team_id, placement_id))
+
+        if len(entrants) < 2:
+            continue
+        for _ in range(match_count):
+            match_id = make_id('M', match_number)
+            match_number += 1
+            team1, team2 = rng.sample(entrants, 2)
+            when = schedule + timedelta(minutes=rng.randrange(days * 24 * 60))
+            rounds = rng.choice((1, 1, 3, 3, 5))
+            winner = None
+            if when < now and rng.random() > 0.02:
+                p1 = strength[team1] / (strength[team1] + strength[team2])
+                winner = team1 if rng.random() < p1 else team2
+            results = None
+            if winner is not None:
+                won = rounds // 2 + 1
+                results = f"{won}-{rng.randint(0, won - 1)}" if winner == team1 else f"{rng.randint(0, won - 1)}-{won}"
+            out.write('MatchInfo', (match_id, rounds, when, results, tournament_id, game_id,
+                                    team1, team2, winner))
+            if rng.random() < 0.3:
+                out.write('MatchCommentator', (match_id, pick(rng, commentators, commentator_weights)))
+
+
+def load(out_dir, counts):
+    import mysql.connector
+    import standings
+    from app import db_config
+
+    connection = mysql.connector.connect(**db_config, allow_local_infile=True)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for table in reversed(list(TABLE_COLUMNS)):
+            cursor.execute(f"TRUNCATE TABLE {table}")
+        for table, columns in TABLE_COLUMNS.items():
+            if not counts.get(table):
+                continue
+            start = time.perf_counter()
+            path = os.path.abspath(os.path.join(out_dir, f'{table}.tsv'))
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})", (path,))
+            connection.commit()
+            print(f"loaded {counts[table]:>10} rows into {table} in {time.perf_counter() - start:.1f}s")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+        # Derived tables exist once the migrations are applied
+        cursor.execute(
+            "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+        existing = {row['TABLE_NAME'].lower() for row in cursor.fetchall()}
+        if {'teamwinssummary', 'tournamentstandings'} <= existing:
+            rebuilt = standings.rebuild(cursor)
+            print(f"rebuilt {rebuilt['team_wins']} team win rows and {rebuilt['standings']} standings rows")
+        # Ratings are replayed from MatchInfo the next time the app starts
+        for table in ('TeamRating', 'RatingCheckpoint'):
+            if table.lower() in existing:
+                cursor.execute(f"DELETE FROM {table}")
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='tiny')
+    parser.add_argument('--games', type=int)
+    parser.add_argument('--teams', type=int)
+    parser.add_argument('--tournaments', type=int)
+    parser.add_argument('--matches', type=int)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', required=True, help='directory for the .tsv files and manifest.json')
+    parser.add_argument('--load', action='store_true', help='replace the database contents with the generated data')
+    args = parser.parse_args()
+    for name, value in SCALES[args.scale].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+    writer = TableWriter(args.out)
+    try:
+        generate(args, writer)
+    finally:
+        writer.close()
+    manifest = {
+        'scale': args.scale,
+        'seed': args.seed,
+        'params': {name: getattr(args, name) for name in ('games', 'teams', 'tournaments', 'matches')},
+        'rows': writer.counts,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"generated {sum(writer.counts.values())} rows in {time.perf_counter() - start:.1f}s")
+    for table, count in writer.counts.items():
+        print(f"  {table:<22} {count:>10}")
+    if args.load:
+        load(args.out, writer.counts)
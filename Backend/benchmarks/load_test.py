@@ -0,0 +1,90 @@
+# Load test for the read endpoints: drives the same request mix at a fixed
+# concurrency against one or more servers and reports requests/sec and
+# p50/p99 latency. Start the two servers first, e.g.:
+#
+#   cd Backend && VIEW_CACHE_SIZE=0 python app.py                          # sync, :5000
+#   cd Backend && VIEW_CACHE_SIZE=0 uvicorn asgi_app:application --port 8000  # async
+#   python benchmarks/load_test.py --concurrency 200 --duration 30 \
+#       sync=http://127.0.0.1:5000 async=http://127.0.0.1:8000
+#
+# VIEW_CACHE_SIZE=0 turns the result cache off so every request reaches MySQL.
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+REQUEST_MIX = [
+    ('/getTable', {'table_name': 'team', 'limit': 100}),
+    ('/getEntry', {'table_name': 'team', 'id': 'TM001'}),
+    ('/byGame', {'game_id': 'G001'}),
+    ('/getMatchesInTournament', {'search': 'Worlds Championship 2024'}),
+    ('/getPlacementPoints', {'search': 'Worlds Championship 2024'}),
+    ('/getTeamWins', {'search': 'T1'}),
+]
+
+
+async def worker(client, base_url, deadline, timings, errors, offset):
+    i = offset
+    while time.perf_counter() < deadline:
+        path, params = REQUEST_MIX[i % len(REQUEST_MIX)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(base_url + path, params=params)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        timings.append(time.perf_counter() - start)
+
+
+async def run_target(name, base_url, concurrency, duration):
+    timings = []
+    errors = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, base_url, deadline, timings, errors, n) for n in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'target': name,
+        'url': base_url,
+        'concurrency': concurrency,
+        'requests': len(timings),
+        'errors': len(errors),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 2) if timings else None,
+        'p99_ms': round(timings[max(0, int(len(timings) * 0.99) - 1)] * 1000, 2) if timings else None,
+    }
+
+
+async def main(args):
+    results = []
+    for target in args.targets:
+        name, _, url = target.partition('=')
+        results.append(await run_target(name, url.rstrip('/'), args.concurrency, args.duration))
+    for r in results:
+        print(f"{r['target']:<8} {r['rps']:>9} req/s  p50={r['p50_ms']}ms  p99={r['p99_ms']}ms  "
+              f"errors={r['errors']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('targets', nargs='+', help='name=base_url, e.g. sync=http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--json', help='also write the results to this file')
+    asyncio.run(main(parser.parse_args()))
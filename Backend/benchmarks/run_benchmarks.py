@@ -0,0 +1,277 @@
+# Benchmark runner: drives each route in turn at a fixed concurrency and
+# writes throughput, p50/p99 latency, error counts and the server's peak RSS
+# as JSON, so two versions can be compared run against run. Load a dataset
+# first (benchmarks/generate_data.py --load), then either point it at a
+# running server:
+#
+#   python benchmarks/run_benchmarks.py --url http://127.0.0.1:5000 --pid <server pid> \
+#       --output results.json
+#
+# or let it start one (sync app.py, or the ASGI app under uvicorn) with the
+# given environment and stop it afterwards:
+#
+#   cd Backend && python benchmarks/run_benchmarks.py --spawn sync --env VIEW_CACHE_SIZE=0 \
+#       --dataset /tmp/mt-small --output results.json --compare baseline.json
+#
+# Request parameters are drawn at random (fixed --seed) from ids read off the
+# server at start, so the result cache sees a realistic hit rate. Spawned
+# servers run with ADMISSION_ENABLED=0 unless --env says otherwise, since a
+# benchmark from one address would otherwise measure the rate limits. Peak
+# RSS is read from /proc and is only reported on Linux.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+# name -> (method, path, params(rng, ids)); POST sends params as the JSON body
+def route_scenarios():
+    return {
+        'me': ('GET', '/me', lambda rng, ids: {}),
+        'getTable_team': ('GET', '/getTable', lambda rng, ids: {'table_name': 'team', 'limit': 100}),
+        'getTable_matchinfo_page': ('GET', '/getTable', lambda rng, ids: {
+            'table_name': 'matchinfo', 'limit': 500, 'after': rng.choice(ids['match'])}),
+        'getTable_matchinfo_filter': ('POST', '/getTable', lambda rng, ids: {
+            'table_name': 'matchinfo', 'limit': 100,
+            'filters': {'tournament_id': rng.choice(ids['tournament'])}}),
+        'getEntry': ('GET', '/getEntry', lambda rng, ids: {
+            'table_name': 'team', 'id': rng.choice(ids['team'])}),
+        'getEntry_batch_expand': ('POST', '/getEntry', lambda rng, ids: {
+            'table_name': 'matchinfo', 'ids': rng.sample(ids['match'], min(20, len(ids['match']))),
+            'expand': True}),
+        'byGame': ('GET', '/byGame', lambda rng, ids: {'game_id': rng.choice(ids['game'])}),
+        'upcomingTournaments': ('GET', '/upcomingTournaments', lambda rng, ids: {
+            'search': f"{rng.randint(2019, 2026)}-01-01 00:00:00"}),
+        'getMatchesInTournament': ('GET', '/getMatchesInTournament', lambda rng, ids: {
+            'search': rng.choice(ids['tournament_name'])}),
+        'getPlacementPoints': ('GET', '/getPlacementPoints', lambda rng, ids: {
+            'search': rng.choice(ids['tournament_name'])}),
+        'getTeamsInTournament': ('GET', '/getTeamsInTournament', lambda rng, ids: {
+            'search': rng.choice(ids['tournament_name'])}),
+        'getTeamWins': ('GET', '/getTeamWins', lambda rng, ids: {'search': rng.choice(ids['team_name'])}),
+        'search': ('GET', '/search', lambda rng, ids: {'q': rng.choice(ids['team_name'])[:4]}),
+        'headToHead': ('GET', '/headToHead', lambda rng, ids: dict(zip(
+            ('team_a', 'team_b'), rng.sample(ids['team'], 2)))),
+        'teamForm': ('GET', '/teamForm', lambda rng, ids: {'team_id': rng.choice(ids['team'])}),
+        'winRates': ('GET', '/winRates', lambda rng, ids: {'game_id': rng.choice(ids['game'])}),
+        'ratings': ('GET', '/ratings', lambda rng, ids: {'team_id': rng.choice(ids['team'])}),
+        'leaderboard': ('GET', '/leaderboard', lambda rng, ids: {'game_id': rng.choice(ids['game'])}),
+    }
+
+
+def rss_kb(pid, field):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def mb(kb):
+    return round(kb / 1024, 1) if kb is not None else None
+
+
+async def sample_ids(client, url, sample_size):
+    async def column(table, column, filters=None):
+        response = await client.post(url + '/getTable', json={
+            'table_name': table, 'columns': [column], 'limit': sample_size, 'filters': filters or {}})
+        response.raise_for_status()
+        return [row[column] for row in response.json()['rows'] if row[column] is not None]
+
+    return {
+        'game': await column('game', 'game_id'),
+        'team': await column('team', 'team_id'),
+        'team_name': await column('team', 'team_name'),
+        'tournament': await column('tournament', 'tournament_id'),
+        'tournament_name': await column('tournament', 'tournament_name'),
+        'match': await column('matchinfo', 'match_id'),
+    }
+
+
+async def worker(client, url, scenario, ids, rng, deadline, timings, statuses):
+    method, path, params = scenario
+    while time.perf_counter() < deadline:
+        args = params(rng, ids)
+        start = time.perf_counter()
+        try:
+            if method == 'GET':
+                response = await client.get(url + path, params=args)
+            else:
+                response = await client.post(url + path, json=args)
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+            continue
+        if response.status_code >= 400:
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            continue
+        timings.append(time.perf_counter() - start)
+
+
+async def run_route(client, url, name, scenario, ids, args, pid):
+    rng = random.Random(f'{args.seed}-{name}')
+    if args.warmup:
+        deadline = time.perf_counter() + args.warmup
+        await asyncio.gather(*(worker(client, url, scenario, ids, rng, deadline, [], {})
+                               for _ in range(args.concurrency)))
+    timings, statuses = [], {}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(worker(client, url, scenario, ids, rng, deadline, timings, statuses)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        'route': name,
+        'method': scenario[0],
+        'path': scenario[1],
+        'requests': len(timings),
+        'errors': statuses,
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 2) if timings else None,
+        'p99_ms': round(timings[max(0, int(len(timings) * 0.99) - 1)] * 1000, 2) if timings else None,
+        'rss_mb': mb(rss_kb(pid, 'VmRSS')) if pid else None,
+        'peak_rss_mb': mb(rss_kb(pid, 'VmHWM')) if pid else None,
+    }
+
+
+def spawn_server(mode, port, env_overrides):
+    env = {**os.environ, 'ADMISSION_ENABLED': '0'}
+    env.update(env_overrides)
+    if mode == 'sync':
+        command = [sys.executable, 'app.py']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi_app:application', '--port', str(port)]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(client, url, timeout=120):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get(url + '/poolStats')).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f'server at {url} did not come up within {timeout}s')
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r['route']: r for r in json.load(f)['routes']}
+    print(f"\n{'route':<28} {'rps':>16} {'p99 ms':>18}   vs {baseline_path}")
+    for r in results['routes']:
+        old = baseline.get(r['route'])
+        if old is None or not old['rps'] or r['p99_ms'] is None or old['p99_ms'] is None:
+            continue
+        rps_change = (r['rps'] - old['rps']) / old['rps'] * 100
+        p99_change = (r['p99_ms'] - old['p99_ms']) / old['p99_ms'] * 100
+        print(f"{r['route']:<28} {r['rps']:>8} {rps_change:+6.1f}%  {r['p99_ms']:>9} {p99_change:+6.1f}%")
+
+
+async def main(args):
+    scenarios = route_scenarios()
+    selected = args.routes or list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"unknown routes: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+
+    server = None
+    pid = args.pid
+    url = args.url.rstrip('/')
+    if args.spawn:
+        port = 5000 if args.spawn == 'sync' else args.port
+        url = f'http://127.0.0.1:{port}'
+        server = spawn_server(args.spawn, port, dict(item.split('=', 1) for item in args.env))
+        pid = server.pid
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            if server is not None:
+                await wait_ready(client, url)
+            ids = await sample_ids(client, url, args.sample)
+            routes = []
+            for name in selected:
+                result = await run_route(client, url, name, scenarios[name], ids, args, pid)
+                routes.append(result)
+                errors = sum(result['errors'].values())
+                print(f"{name:<28} {result['rps']:>9} req/s  p50={result['p50_ms']}ms  "
+                      f"p99={result['p99_ms']}ms  errors={errors}  rss={result['rss_mb']}MB")
+    finally:
+        peak = rss_kb(pid, 'VmHWM') if pid else None
+        if server is not None:
+            server.terminate()
+            server.wait(30)
+
+    dataset = None
+    if args.dataset:
+        with open(os.path.join(args.dataset, 'manifest.json')) as f:
+            dataset = json.load(f)
+    results = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'url': url,
+            'server': args.spawn or 'external',
+            'env': args.env,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'dataset': dataset,
+        },
+        'server_peak_rss_mb': mb(peak),
+        'routes': routes,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--pid', type=int, help='pid of the server at --url, for RSS readings')
+    parser.add_argument('--spawn', choices=('sync', 'async'), help='start the server here instead of using --url')
+    parser.add_argument('--port', type=int, default=8000, help='port for --spawn async')
+    parser.add_argument('--env', action='append', default=[], help='KEY=VALUE for the spawned server')
+    parser.add_argument('--routes', nargs='+', help='route names to run (default: all)')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15, help='seconds measured per route')
+    parser.add_argument('--warmup', type=float, default=3, help='seconds run per route before measuring')
+    parser.add_argument('--sample', type=int, default=500, help='ids read per table for request parameters')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--dataset', help='generate_data.py --out directory, recorded in the results')
+    parser.add_argument('--output', help='write the results here instead of stdout')
+    parser.add_argument('--compare', help='earlier results file to print changes against')
+    asyncio.run(main(parser.parse_args()))
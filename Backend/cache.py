@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ================== RESULT CACHE ==================
+# In-process TTL + LRU cache for read endpoint results.
+#
+# Every entry is tagged with the base tables it was read from. A write to one
+# of those tables drops the entry. Each table also has a generation counter
+# that goes up on every invalidation. A reader grabs the generations before
+# querying and passes them to set(); if a write landed in between, the result
+# is thrown away instead of cached, so a slow read can't put back data that a
+# write has just replaced.
+
+
+class ResultCache:
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value, tables)
+        self._by_table = {}             # table -> set of keys
+        self._generations = {}          # table -> int
+        self._changed_at = {}           # table -> monotonic time of the last invalidation
+        self._last_change = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, entry[1]
+                self._remove(key)
+            self._misses += 1
+            return False, None
+
+    def generation(self, tables):
+        with self._lock:
+            return tuple(self._generations.get(t, 0) for t in tables)
+
+    def set(self, key, value, tables, generation=None):
+        with self._lock:
+            if generation is not None and generation != tuple(self._generations.get(t, 0) for t in tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tuple(tables))
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    # Drop every entry read from `table`. Called by the write endpoints.
+    def invalidate(self, table):
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            self._changed_at[table] = self._last_change = time.monotonic()
+            for key in list(self._by_table.get(table, ())):
+                self._remove(key)
+                self._invalidations += 1
+
+    # True if any of `tables` (any table at all when None) was invalidated in
+    # the last `seconds` seconds
+    def changed_within(self, tables, seconds):
+        since = time.monotonic() - seconds
+        with self._lock:
+            if tables is None:
+                return self._last_change is not None and self._last_change > since
+            return any(self._changed_at.get(t, since) > since for t in tables)
+
+    def clear(self):
+        with self._lock:
+            self._last_change = time.monotonic()
+            for table in self._by_table:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._entries.clear()
+            self._by_table.clear()
+
+    # Caller holds the lock
+    def _remove(self, key):
+        _, _, tables = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
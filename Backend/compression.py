@@ -0,0 +1,190 @@
+import threading
+import time
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only
+    brotli = None
+
+# ================== RESPONSE COMPRESSION ==================
+# Compresses text responses of at least min_size bytes with the best encoding
+# the client accepts: brotli (when the brotli package is installed), then gzip.
+# Streamed responses (/exportTable) are compressed chunk by chunk, each chunk
+# flushed so rows still arrive as they are read. Server-sent events and
+# files served as-is are left alone.
+#
+# Per route it counts responses, how many were compressed, and body bytes
+# before and after, reported by stats() and as Prometheus counters by render().
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain',
+    'text/css', 'text/javascript', 'application/javascript',
+}
+
+
+# Best of `offered` for an Accept-Encoding header, in offered order on equal
+# quality; None when the client accepts none of them
+def negotiate(header, offered):
+    qualities = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+    best, best_quality = None, 0.0
+    for encoding in offered:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Compressor:
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._lock = threading.Lock()
+        self._routes = {}   # route -> [responses, compressed, bytes in, bytes out, seconds]
+
+    def eligible(self, status, mimetype, headers):
+        return (status == 200 and mimetype in COMPRESSIBLE_TYPES
+                and 'Content-Encoding' not in headers)
+
+    def choose(self, accept_encoding):
+        return negotiate(accept_encoding or '', self.encodings)
+
+    def record(self, route, raw, sent, compressed, seconds=0.0):
+        with self._lock:
+            counts = self._routes.get(route)
+            if counts is None:
+                counts = self._routes[route] = [0, 0, 0, 0, 0.0]
+            counts[0] += 1
+            counts[1] += compressed
+            counts[2] += raw
+            counts[3] += sent
+            counts[4] += seconds
+
+    def _compressobj(self, encoding):
+        if encoding == 'br':
+            return brotli.Compressor(quality=self.brotli_quality)
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)     # 31: gzip container
+
+    # (body, encoding) to send; encoding is None when the body is sent as is
+    def encode(self, data, accept_encoding, route):
+        encoding = self.choose(accept_encoding) if len(data) >= self.min_size else None
+        if encoding is None:
+            self.record(route, len(data), len(data), False)
+            return data, None
+        start = time.perf_counter()
+        if encoding == 'br':
+            body = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressor = self._compressobj(encoding)
+            body = compressor.compress(data) + compressor.flush()
+        elapsed = time.perf_counter() - start
+        if len(body) >= len(data):
+            self.record(route, len(data), len(data), False, elapsed)
+            return data, None
+        self.record(route, len(data), len(body), True, elapsed)
+        return body, encoding
+
+    # Compress an iterable of chunks as it is consumed
+    def stream(self, chunks, encoding, route):
+        compressor = self._compressobj(encoding)
+        raw = sent = 0
+        elapsed = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                start = time.perf_counter()
+                if encoding == 'br':
+                    out = compressor.process(chunk) + compressor.flush()
+                else:
+                    out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                elapsed += time.perf_counter() - start
+                raw += len(chunk)
+                sent += len(out)
+                if out:
+                    yield out
+            out = compressor.finish() if encoding == 'br' else compressor.flush()
+            sent += len(out)
+            yield out
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+            self.record(route, raw, sent, True, elapsed)
+
+    # Compress a werkzeug response in place (Flask after_request)
+    def apply(self, response, accept_encoding, route):
+        if response.direct_passthrough or not self.eligible(
+                response.status_code, response.mimetype, response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.is_streamed:
+            encoding = self.choose(accept_encoding)
+            if encoding is not None:
+                response.response = self.stream(response.response, encoding, route)
+                response.headers['Content-Encoding'] = encoding
+                response.headers.pop('Content-Length', None)
+            return response
+        body, encoding = self.encode(response.get_data(), accept_encoding, route)
+        if encoding is not None:
+            response.set_data(body)
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def stats(self):
+        with self._lock:
+            routes = {route: list(counts) for route, counts in self._routes.items()}
+        return {
+            'min_size': self.min_size,
+            'encodings': list(self.encodings),
+            'routes': {
+                route: {
+                    'responses': responses,
+                    'compressed': compressed,
+                    'bytes_in': bytes_in,
+                    'bytes_out': bytes_out,
+                    'ratio': round(bytes_out / bytes_in, 4) if bytes_in else None,
+                    'compress_seconds': round(seconds, 6),
+                }
+                for route, (responses, compressed, bytes_in, bytes_out, seconds) in sorted(routes.items())
+            },
+        }
+
+    def render(self):
+        with self._lock:
+            routes = {route: list(counts) for route, counts in self._routes.items()}
+        lines = ["# HELP http_response_body_bytes_total Response body bytes before (raw) and after (sent) compression",
+                 "# TYPE http_response_body_bytes_total counter"]
+        for route, (_, _, bytes_in, bytes_out, _) in sorted(routes.items()):
+            lines.append(f'http_response_body_bytes_total{{route="{route}",stage="raw"}} {bytes_in}')
+            lines.append(f'http_response_body_bytes_total{{route="{route}",stage="sent"}} {bytes_out}')
+        lines.append("# HELP http_responses_compressed_total Responses sent compressed")
+        lines.append("# TYPE http_responses_compressed_total counter")
+        for route, (_, compressed, _, _, _) in sorted(routes.items()):
+            lines.append(f'http_responses_compressed_total{{route="{route}"}} {compressed}')
+        return lines
+
+
+def init_app(app, compressor):
+
+    @app.after_request
+    def compress_response(response):
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        return compressor.apply(response, request.headers.get('Accept-Encoding'), route)
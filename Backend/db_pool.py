@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+# ================== CONNECTION POOL ==================
+# Keeps MySQL connections open between requests so a route only pays the
+# TCP + auth handshake when the pool has to grow.
+#
+#   size          connections kept open while idle
+#   max_overflow  extra connections opened under load, closed again on return
+#   idle_timeout  seconds an idle connection may sit before it is closed
+#   timeout       seconds a request waits for a free connection before failing
+#   pre_ping      ping a connection on checkout and replace it if it is dead
+
+
+class PoolError(Exception):
+    pass
+
+
+class PoolTimeout(PoolError):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, db_config, size=5, max_overflow=5, idle_timeout=300,
+                 timeout=10, pre_ping=True):
+        self.db_config = db_config
+        self.size = size
+        self.max_overflow = max_overflow
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle = deque()      # (connection, returned_at), most recent last
+        self._open = 0            # idle + in use
+        self._in_use = 0
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+
+    def _connect(self):
+        try:
+            connection = mysql.connector.connect(**self.db_config)
+        except Error as e:
+            raise PoolError(f"Database connection failed: {e}") from e
+        with self._cond:
+            self._created += 1
+        return connection
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    # Move idle connections past idle_timeout out of the pool. Caller holds the lock.
+    def _reap(self, now, stale):
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            connection, _ = self._idle.popleft()
+            stale.append(connection)
+            self._open -= 1
+            self._discarded += 1
+
+    def _is_alive(self, connection):
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        stale = []
+        connection = None
+
+        with self._cond:
+            while True:
+                self._reap(time.monotonic(), stale)
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    for conn in stale:
+                        self._close(conn)
+                    raise PoolTimeout(
+                        f"Database connection failed: no connection free after {self.timeout}s")
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                wait_time = time.monotonic() - start
+                self._waits += 1
+                self._wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+
+        for conn in stale:
+            self._close(conn)
+
+        try:
+            if connection is None:
+                connection = self._connect()
+            elif self.pre_ping and not self._is_alive(connection):
+                self._close(connection)
+                with self._cond:
+                    self._discarded += 1
+                connection = self._connect()
+        except PoolError:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return connection
+
+    def release(self, connection):
+        # Never hand the next borrower an open transaction (or its snapshot)
+        discard = False
+        try:
+            if getattr(connection, 'in_transaction', True):
+                connection.rollback()
+        except Error:
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or len(self._idle) >= self.size:
+                self._open -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+                connection = None
+            self._cond.notify()
+
+        if connection is not None:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    # Share of the connection limit in use, for picking the least busy pool
+    @property
+    def load(self):
+        return self._in_use / (self.size + self.max_overflow)
+
+    def close_all(self):
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_total': round(self._wait_time, 6),
+                'wait_time_avg': round(self._wait_time / self._waits, 6) if self._waits else 0.0,
+                'wait_time_max': round(self._max_wait_time, 6),
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'discarded': self._discarded,
+            }
@@ -0,0 +1,58 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:     # optional: falls back to the stdlib encoder
+    orjson = None
+
+# ================== JSON ENCODING ==================
+# Flask JSON provider that encodes with orjson when it is installed. The
+# output matches Flask's default provider: keys sorted, Decimal as a string,
+# and dates in HTTP format ("Tue, 15 Oct 2024 09:00:00 GMT"). With
+# datetime_format='iso', orjson writes datetimes natively as ISO 8601, which
+# is faster but changes what clients see. Types orjson does not handle itself
+# (Decimal, and dates unless 'iso') go through Flask's own default().
+
+
+def to_columnar(rows, columns=None):
+    # [{...}, {...}] -> {"columns": [...], "rows": [[...], [...]]}, dropping repeated keys;
+    # columns defaults to the first row's key order
+    if not rows:
+        return {'columns': [], 'rows': []}
+    columns = columns or list(rows[0])
+    return {'columns': columns, 'rows': [[row[c] for c in columns] for row in rows]}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+
+    def __init__(self, app, datetime_format='http'):
+        super().__init__(app)
+        self.datetime_format = datetime_format
+
+    def _options(self, indent):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if self.datetime_format != 'iso':
+            options |= orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    # Encode obj to UTF-8 JSON bytes. Both dumps() and response() go through
+    # here, so subclasses only need to wrap this one method.
+    def encode(self, obj, indent=False):
+        if orjson is None:
+            layout = {'indent': 2} if indent else {'separators': (',', ':')}
+            return super().dumps(obj, **layout).encode()
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if set(kwargs) - {'indent'}:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, indent=bool(kwargs.get('indent'))).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,235 @@
+import asyncio
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+# ================== LIVE UPDATES ==================
+# Push changes to a tournament's matches and placements to subscribers
+# (GET /subscribe?tournament=<name>, Server-Sent Events) so live pages do not
+# have to poll /getMatchesInTournament and /getPlacementPoints.
+#
+# The write endpoints take a snapshot of the affected rows before and after
+# the write, inside their transaction:
+#   before = snapshot(cursor, table, ids)
+#   ... INSERT / UPDATE / DELETE, standings.refresh ...
+#   changes = diff(table, before, snapshot(cursor, table, ids))
+# and publish the changes after the commit. Each change is encoded into one
+# SSE frame which every subscriber of that tournament receives as is, so a
+# write costs the same however many viewers are connected.
+#
+# The hub lives in the process. Subscribers only hear about writes made by
+# the same process.
+#
+# Topics are tournament names and match case-insensitively, like the MySQL
+# lookups behind them. The history of a topic with no subscribers is dropped
+# once it has seen no event for topic_ttl seconds; a client reconnecting with
+# an event id from before that gets RESET_FRAME.
+
+# Rows pushed for each live table, shaped like the rows of the matching view
+# endpoint plus their primary key: (primary key, tournament column, query)
+LIVE_SOURCES = {
+    'matchinfo': ('match_id', 'tournament_name', """
+        SELECT match_id, match_date_time AS schedule, match_rounds AS rounds,
+               team1_name, team2_name, winning_team_name, tournament_name
+        FROM TournamentMatches
+        WHERE match_id IN ({})
+    """),
+    'placement': ('placement_id', 'tournament', """
+        SELECT placement_id, team_name, placement_rank, placement_points AS points,
+               placement_prize_amount AS prize_amount, tournament_name AS tournament
+        FROM TournamentStandings
+        WHERE placement_id IN ({})
+    """),
+}
+
+# Sent to a subscriber whose history can no longer be replayed. The client
+# should reload the view and reconnect.
+RESET_FRAME = "event: reset\ndata: {}\n\n"
+
+
+def topic_key(topic):
+    return topic.casefold() if isinstance(topic, str) else topic
+
+
+# {id: row} for the given primary keys of a live table, {} for other tables
+def snapshot(cursor, table_name, ids):
+    source = LIVE_SOURCES.get(table_name)
+    ids = [id for id in ids if id is not None]
+    if source is None or not ids:
+        return {}
+    primary_key, _, query = source
+    cursor.execute(query.format(', '.join(['%s'] * len(ids))), ids)
+    return {row[primary_key]: row for row in cursor.fetchall()}
+
+
+# {tournament: [change, ...]} between two snapshots. A row that moved to
+# another tournament is a delete in the old one and an upsert in the new one.
+def diff(table_name, before, after):
+    source = LIVE_SOURCES.get(table_name)
+    if source is None:
+        return {}
+    _, tournament_column, _ = source
+    changes = {}
+    for id, row in before.items():
+        new = after.get(id)
+        if new is None or new[tournament_column] != row[tournament_column]:
+            changes.setdefault(row[tournament_column], []).append({'op': 'delete', 'id': id})
+    for id, row in after.items():
+        if before.get(id) != row:
+            changes.setdefault(row[tournament_column], []).append({'op': 'upsert', 'id': id, 'row': row})
+    return changes
+
+
+class Subscriber:
+
+    def __init__(self, topic, max_pending):
+        self.topic = topic
+        self.queue = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+
+    # A subscriber that falls max_pending frames behind gets only RESET_FRAME
+    def deliver(self, frame):
+        with self._lock:
+            try:
+                self.queue.put_nowait(frame)
+            except queue.Full:
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(RESET_FRAME)
+
+    # Next frame, or None if nothing arrived within timeout
+    def next_frame(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+# Subscriber for the ASGI app; frames are handed to its event loop
+class AsyncSubscriber:
+
+    def __init__(self, topic, max_pending, loop):
+        self.topic = topic
+        self.queue = asyncio.Queue(max_pending)
+        self._loop = loop
+
+    def deliver(self, frame):
+        self._loop.call_soon_threadsafe(self._put, frame)
+
+    def _put(self, frame):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET_FRAME)
+
+    async def next_frame(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+
+    def __init__(self, encode, max_pending=100, replay=200, topic_ttl=600):
+        self._encode = encode           # obj -> JSON text
+        self.max_pending = max_pending
+        self.replay = replay
+        self.topic_ttl = topic_ttl
+        self._lock = threading.Lock()
+        self._subscribers = {}          # topic -> set of subscribers
+        self._recent = {}               # topic -> deque of (seq, frame)
+        self._evicted = {}              # topic -> seq of the newest frame dropped from _recent
+        self._last_event = {}           # topic -> monotonic time of its newest frame
+        self._dropped_seq = 0           # newest frame of any topic whose history was dropped
+        self._swept_at = time.monotonic()
+        self._seq = 0
+        self.epoch = uuid.uuid4().hex[:8]   # event ids from an earlier run never match
+        self.published = 0
+        self.delivered = 0
+
+    # Register a subscriber for topic. If last_event_id is given (the
+    # Last-Event-ID header of a reconnecting EventSource), frames it missed are
+    # queued first, or RESET_FRAME if they are no longer kept.
+    def subscribe(self, topic, last_event_id=None, loop=None):
+        topic = topic_key(topic)
+        if loop is None:
+            subscriber = Subscriber(topic, self.max_pending)
+        else:
+            subscriber = AsyncSubscriber(topic, self.max_pending, loop)
+        with self._lock:
+            if last_event_id:
+                for frame in self._missed(topic, last_event_id):
+                    subscriber.deliver(frame)
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+        return subscriber
+
+    def _missed(self, topic, last_event_id):
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return [RESET_FRAME]
+        seq = int(seq)
+        if topic not in self._recent:
+            # Without its history, any dropped frame newer than seq may have been this topic's
+            return [RESET_FRAME] if seq < self._dropped_seq else []
+        if seq < self._evicted.get(topic, 0):
+            return [RESET_FRAME]
+        return [frame for frame_seq, frame in self._recent[topic] if frame_seq > seq]
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.topic]
+
+    # Encode data once and hand the same frame to every subscriber of topic
+    def publish(self, topic, event, data):
+        topic = topic_key(topic)
+        with self._lock:
+            self._seq += 1
+            frame = f"id: {self.epoch}-{self._seq}\nevent: {event}\ndata: {self._encode(data)}\n\n"
+            recent = self._recent.get(topic)
+            if recent is None:
+                recent = self._recent[topic] = deque(maxlen=self.replay)
+                if self._dropped_seq:
+                    # Its earlier history may have been dropped
+                    self._evicted[topic] = self._dropped_seq
+            if len(recent) == recent.maxlen:
+                self._evicted[topic] = recent[0][0]
+            recent.append((self._seq, frame))
+            now = time.monotonic()
+            self._last_event[topic] = now
+            if now - self._swept_at >= self.topic_ttl:
+                self._sweep(now)
+            subscribers = list(self._subscribers.get(topic, ()))
+            self.published += 1
+            self.delivered += len(subscribers)
+        for subscriber in subscribers:
+            subscriber.deliver(frame)
+
+    # Drop the history of topics nobody follows that have been quiet for
+    # topic_ttl; called with the lock held
+    def _sweep(self, now):
+        self._swept_at = now
+        for topic, last_event in list(self._last_event.items()):
+            if now - last_event >= self.topic_ttl and topic not in self._subscribers:
+                recent = self._recent.pop(topic)
+                self._dropped_seq = max(self._dropped_seq, recent[-1][0])
+                self._evicted.pop(topic, None)
+                del self._last_event[topic]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'topics': len(self._subscribers),
+                'topics_kept': len(self._recent),
+                'subscribers': sum(len(s) for s in self._subscribers.values()),
+                'published': self.published,
+                'delivered': self.delivered,
+            }
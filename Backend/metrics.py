@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import request
+from json_provider import FastJSONProvider
+
+# ================== REQUEST METRICS ==================
+# Per-route wall time, DB time, connection-acquire time, serialization time
+# and rows fetched, exposed as Prometheus histograms on /metrics. SQL slower
+# than the configured threshold is logged with its EXPLAIN plan.
+#
+# Turned on with METRICS_ENABLED=1. When it is off none of the hooks are
+# installed. db_cursor() then only pays for a ContextVar lookup and a clock
+# read per borrowed connection.
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+slow_query_log = logging.getLogger('matchtracker.slow_query')
+
+# Stats for the request being handled. Worker threads that run queries for a
+# request (query_executor) are started with a copy of the context, so they
+# add to the same RequestStats object.
+current_stats = ContextVar('current_stats', default=None)
+
+
+class RequestStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.acquire_time = 0.0
+        self.serialize_time = 0.0
+        self.rows = 0
+        self.queries = 0
+
+    def add(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+
+class Histogram:
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}   # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = dict(self._series)
+        for labels, values in sorted(series.items()):
+            base = ','.join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {values[-1]}')
+            lines.append(f'{self.name}_sum{{{base}}} {values[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {values[-1]}')
+        return lines
+
+
+class RequestMetrics:
+
+    LABELS = ('route', 'method', 'status')
+
+    def __init__(self, slow_query_ms=200):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.request_time = Histogram(
+            'http_request_duration_seconds', 'Wall time per request', SECONDS_BUCKETS)
+        self.db_time = Histogram(
+            'db_query_duration_seconds', 'Time spent executing SQL and fetching rows per request', SECONDS_BUCKETS)
+        self.acquire_time = Histogram(
+            'db_acquire_duration_seconds', 'Time spent waiting for a pooled connection per request', SECONDS_BUCKETS)
+        self.serialize_time = Histogram(
+            'serialization_duration_seconds', 'Time spent encoding the JSON response per request', SECONDS_BUCKETS)
+        self.rows = Histogram(
+            'db_rows_fetched', 'Rows fetched from MySQL per request', ROW_BUCKETS)
+        self._lock = threading.Lock()
+        self.slow_queries = 0
+
+    def observe(self, labels, stats):
+        self.request_time.observe(labels, time.perf_counter() - stats.start)
+        self.db_time.observe(labels, stats.db_time)
+        self.acquire_time.observe(labels, stats.acquire_time)
+        self.serialize_time.observe(labels, stats.serialize_time)
+        self.rows.observe(labels, stats.rows)
+
+    def record_slow_query(self, query, params, elapsed, plan):
+        with self._lock:
+            self.slow_queries += 1
+        slow_query_log.warning(
+            "slow query (%.1f ms): %s params=%r explain=%r",
+            elapsed * 1000, ' '.join(query.split()), params, plan)
+
+    def render(self):
+        lines = []
+        for histogram in (self.request_time, self.db_time, self.acquire_time,
+                          self.serialize_time, self.rows):
+            lines.extend(histogram.render(self.LABELS))
+        lines.append("# HELP slow_queries_total Statements slower than the slow query threshold")
+        lines.append("# TYPE slow_queries_total counter")
+        lines.append(f"slow_queries_total {self.slow_queries}")
+        return lines
+
+
+# Wraps a cursor to time statements, count rows and catch slow SQL
+class InstrumentedCursor:
+
+    def __init__(self, cursor, connection, stats, metrics):
+        self._cursor = cursor
+        self._connection = connection
+        self._stats = stats
+        self._metrics = metrics
+        self._statement = None
+        self._elapsed = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._elapsed += elapsed
+            self._stats.add(db_time=elapsed)
+
+    # Called once the previous statement's rows have been read
+    def _finish_statement(self):
+        if self._statement is None:
+            return
+        query, params = self._statement
+        elapsed = self._elapsed
+        self._statement = None
+        self._elapsed = 0.0
+        if elapsed < self._metrics.slow_query_seconds:
+            return
+        plan = None
+        if query.lstrip().upper().startswith('SELECT'):
+            try:
+                explain = self._connection.cursor(dictionary=True)
+                explain.execute("EXPLAIN " + query, params)
+                plan = explain.fetchall()
+                explain.close()
+            except Exception as e:
+                plan = f"EXPLAIN failed: {e}"
+        self._metrics.record_slow_query(query, params, elapsed, plan)
+
+    def execute(self, query, params=None, *args, **kwargs):
+        self._finish_statement()
+        self._statement = (query, params)
+        self._stats.add(queries=1)
+        return self._timed(lambda: self._cursor.execute(query, params, *args, **kwargs))
+
+    def executemany(self, query, seq_params):
+        self._finish_statement()
+        self._statement = (query, None)
+        self._stats.add(queries=1)
+        return self._timed(self._cursor.executemany, query, seq_params)
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._stats.add(rows=len(rows))
+        return rows
+
+    def fetchmany(self, size=1):
+        rows = self._timed(self._cursor.fetchmany, size)
+        self._stats.add(rows=len(rows))
+        return rows
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._stats.add(rows=1)
+        return row
+
+    # `for row in cursor` reads through fetchone(), so the rows are timed and
+    # counted; __getattr__ does not cover it since iter() looks on the class
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._finish_statement()
+        return self._cursor.close()
+
+
+class TimedJSONProvider(FastJSONProvider):
+
+    def encode(self, obj, indent=False):
+        stats = current_stats.get()
+        if stats is None:
+            return super().encode(obj, indent)
+        start = time.perf_counter()
+        try:
+            return super().encode(obj, indent)
+        finally:
+            stats.add(serialize_time=time.perf_counter() - start)
+
+
+def init_app(app, metrics):
+    app.json = TimedJSONProvider(app, app.json.datetime_format)
+
+    @app.before_request
+    def start_request_stats():
+        request.metrics_token = current_stats.set(RequestStats())
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = current_stats.get()
+        if stats is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe((route, request.method, str(response.status_code)), stats)
+        return response
+
+    @app.teardown_request
+    def reset_request_stats(exc):
+        token = getattr(request, 'metrics_token', None)
+        if token is not None:
+            current_stats.reset(token)
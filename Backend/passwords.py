@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import bcrypt
+
+# ================== PASSWORD HASHING ==================
+# bcrypt runs on a small dedicated thread pool instead of in the request
+# thread. A login burst then uses at most `workers` cores for hashing, and
+# the request threads stay free to serve reads. No more than max_pending
+# hashes may be queued or running; past that, callers get HasherBusy (503)
+# right away instead of piling up behind the pool. A hash still queued after
+# `timeout` seconds raises HasherBusy as well.
+#
+# bcrypt releases the GIL while hashing, so the workers run in parallel.
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+
+    def __init__(self, rounds=12, workers=4, max_pending=64, timeout=10):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Made once, on the pool, so startup does not wait for it
+        self._dummy_hash = self._executor.submit(bcrypt.hashpw, b'unused', bcrypt.gensalt(rounds))
+        self._lock = threading.Lock()
+        self.hashed = 0
+        self.verified = 0
+        self.rejected = 0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy('Too many logins in progress, retry shortly')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is freed when the hash finishes, even if the caller gave up waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy(f'Password check took over {self.timeout}s, retry shortly')
+
+    def hash(self, password):
+        hashed = self._run(lambda: bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)))
+        with self._lock:
+            self.hashed += 1
+        return hashed.decode()
+
+    # With no stored hash (unknown user) a throwaway hash is checked anyway, so
+    # a wrong username takes as long as a wrong password
+    def verify(self, password, hashed):
+        if hashed is None:
+            self._run(bcrypt.checkpw, password.encode(), self._dummy_hash.result())
+            return False
+        ok = self._run(bcrypt.checkpw, password.encode(), hashed.encode())
+        with self._lock:
+            self.verified += 1
+        return ok
+
+    # True if hashed was made with a different cost factor than self.rounds
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'hashed': self.hashed,
+                'verified': self.verified,
+                'rejected': self.rejected,
+            }
@@ -0,0 +1,399 @@
+import heapq
+import json
+import threading
+import time
+
+# ================== TEAM RATINGS ==================
+# Per-game Elo ratings computed from MatchInfo in match time order.
+#
+#   load()        start from the last checkpoint (TeamRating/RatingCheckpoint,
+#                 Database/migrations/003_ratings.sql) and rate only newer
+#                 matches, or replay everything if there is no usable checkpoint.
+#                 Games whose older matches changed since the checkpoint was
+#                 written are marked for replay.
+#   refresh()     after a MatchInfo write. A newly decided match later than
+#                 every rated one is rated on the spot. Any other change to
+#                 a rated match (an edit, a delete, a result entered out of
+#                 order) marks its game for replay.
+#   verify()      every verify_interval seconds, compare a per-game fingerprint
+#                 of the rated matches with the one last seen and mark the
+#                 games that changed for replay
+#   catch_up()    replay the marked games
+#   checkpoint()  write the current ratings, the last rated match and the
+#                 fingerprint of the matches up to it, after a replay and every
+#                 checkpoint_every newly rated matches
+# ensure_current() does whichever of load/verify/catch_up is needed;
+# checkpoint() is left to the caller since it writes. Apart from the first
+# load, the app runs both from a background thread (app.py).
+#
+# Updates run one at a time and rate into a scratch instance, then swap the
+# result in, so team()/leaderboard() only wait for the swap, never for a query.
+#
+# The ratings live in each process, and refresh() only sees the writes made
+# by this one. Writes made by other workers, or while this process was down,
+# are picked up by verify() and load(), so a process can serve ratings that
+# miss another worker's write for up to verify_interval seconds. A game this
+# process changed itself is also seen as changed by the next verify() and
+# replayed once more.
+#
+# A match is rated once it has a game, a time, two different teams and a
+# winner that is one of them. The newer of two matches at the same time is
+# the one with the larger match_id.
+
+MATCHES_SELECT = """
+    SELECT match_id, match_date_time, game_id, team1_id, team2_id, match_winner_id
+    FROM MatchInfo
+"""
+RATED_MATCHES_QUERY = MATCHES_SELECT + """
+    WHERE game_id IS NOT NULL AND match_date_time IS NOT NULL
+      AND team1_id <> team2_id AND match_winner_id IN (team1_id, team2_id)
+"""
+REPLAY_ORDER = " ORDER BY match_date_time, match_id"
+# Count and checksum of the rated matches of each game; any edit, delete or
+# insert of a rated match changes its game's pair
+FINGERPRINT_QUERY = """
+    SELECT game_id, COUNT(*) AS matches,
+           SUM(CRC32(CONCAT_WS('|', match_id, match_date_time, team1_id, team2_id, match_winner_id))) AS checksum
+    FROM (""" + RATED_MATCHES_QUERY + """) M
+"""
+REPLAY_BATCH = 5000
+
+
+def rated(row):
+    return (row is not None and row['game_id'] is not None and row['match_date_time'] is not None
+            and row['team1_id'] is not None and row['team2_id'] is not None
+            and row['team1_id'] != row['team2_id']
+            and row['match_winner_id'] in (row['team1_id'], row['team2_id']))
+
+
+def match_key(row):
+    return (row['match_date_time'], row['match_id'])
+
+
+# {game_id: [matches, checksum]} of the rated matches, or of those up to watermark
+def fingerprint(cursor, watermark=None):
+    if watermark is None:
+        cursor.execute(FINGERPRINT_QUERY + " GROUP BY game_id")
+    else:
+        cursor.execute(FINGERPRINT_QUERY + " WHERE (match_date_time, match_id) <= (%s, %s) GROUP BY game_id",
+                       watermark)
+    return {row['game_id']: [row['matches'], int(row['checksum'])] for row in cursor.fetchall()}
+
+
+class EloRatings:
+
+    def __init__(self, k=24, k_provisional=40, provisional_matches=20, initial=1500.0,
+                 checkpoint_every=1000, verify_interval=30):
+        # Held briefly: by readers, and by updates to swap in what they computed
+        self._lock = threading.RLock()
+        # Held by load/replay/refresh/verify/checkpoint for all their work, so
+        # only one update runs at a time and readers never wait on a query
+        self._update_lock = threading.RLock()
+        # Stored with each checkpoint; a checkpoint made with other values is not reused
+        self.params = {'k': k, 'k_provisional': k_provisional,
+                       'provisional_matches': provisional_matches, 'initial': initial}
+        self.checkpoint_every = checkpoint_every
+        self.verify_interval = verify_interval  # 0 compares fingerprints only on load
+        self._ratings = {}          # game_id -> {team_id: [rating, matches]}
+        self._applied = {}          # match_id -> game_id of every rated match
+        self.watermark = None       # match_key of the newest rated match
+        self._dirty = set()         # games to replay before the next read
+        self._since_checkpoint = 0  # matches rated since the last checkpoint
+        self._fingerprint = {}      # fingerprint() as of the last load or verify
+        self._verified_at = 0.0
+        self.verify_replays = 0     # games verify() found changed
+        self.loaded = False
+
+    # An empty instance with the same parameters to rate into without the lock
+    def _scratch(self):
+        return EloRatings(**self.params, checkpoint_every=self.checkpoint_every, verify_interval=0)
+
+    def _rate(self, row):
+        p = self.params
+        table = self._ratings.setdefault(row['game_id'], {})
+        team1 = table.setdefault(row['team1_id'], [p['initial'], 0])
+        team2 = table.setdefault(row['team2_id'], [p['initial'], 0])
+        expected = 1 / (1 + 10 ** ((team2[0] - team1[0]) / 400))
+        score = 1.0 if row['match_winner_id'] == row['team1_id'] else 0.0
+        k1 = p['k_provisional'] if team1[1] < p['provisional_matches'] else p['k']
+        k2 = p['k_provisional'] if team2[1] < p['provisional_matches'] else p['k']
+        team1[0] += k1 * (score - expected)
+        team2[0] += k2 * (expected - score)
+        team1[1] += 1
+        team2[1] += 1
+        self._applied[row['match_id']] = row['game_id']
+        key = match_key(row)
+        if self.watermark is None or key > self.watermark:
+            self.watermark = key
+
+    def _rate_query(self, cursor, query, params=()):
+        cursor.execute(query, params)
+        count = 0
+        while True:
+            rows = cursor.fetchmany(REPLAY_BATCH)
+            if not rows:
+                return count
+            self.rate_rows(rows)
+            count += len(rows)
+
+    # Rate matches given in time order. Same arithmetic as _rate(), with the
+    # lookups hoisted out of the loop since full replays spend their time here.
+    def rate_rows(self, rows):
+        if not rows:
+            return
+        p = self.params
+        initial, k, k_provisional, provisional = p['initial'], p['k'], p['k_provisional'], p['provisional_matches']
+        with self._lock:
+            ratings = self._ratings
+            applied = self._applied
+            for row in rows:
+                game_id = row['game_id']
+                table = ratings.get(game_id)
+                if table is None:
+                    table = ratings[game_id] = {}
+                team1_id = row['team1_id']
+                team1 = table.get(team1_id)
+                if team1 is None:
+                    team1 = table[team1_id] = [initial, 0]
+                team2 = table.get(row['team2_id'])
+                if team2 is None:
+                    team2 = table[row['team2_id']] = [initial, 0]
+                expected = 1 / (1 + 10 ** ((team2[0] - team1[0]) / 400))
+                score = 1.0 if row['match_winner_id'] == team1_id else 0.0
+                team1[0] += (k_provisional if team1[1] < provisional else k) * (score - expected)
+                team2[0] += (k_provisional if team2[1] < provisional else k) * (expected - score)
+                team1[1] += 1
+                team2[1] += 1
+                applied[row['match_id']] = game_id
+            key = match_key(rows[-1])
+            if self.watermark is None or key > self.watermark:
+                self.watermark = key
+            self.loaded = True
+
+    # Recompute one game (or every game) from its full history. The replay is
+    # rated into a scratch instance and swapped in, so reads carry on meanwhile.
+    def replay(self, cursor, game_id=None):
+        with self._update_lock:
+            scratch = self._scratch()
+            if game_id is None:
+                # Taken first, so a write during the replay shows up at the next verify
+                current = fingerprint(cursor)
+                count = scratch._rate_query(cursor, RATED_MATCHES_QUERY + REPLAY_ORDER)
+                with self._lock:
+                    self._ratings = scratch._ratings
+                    self._applied = scratch._applied
+                    self.watermark = scratch.watermark
+                    self._dirty.clear()
+                    self._set_fingerprint(current)
+            else:
+                count = scratch._rate_query(
+                    cursor, RATED_MATCHES_QUERY + " AND game_id = %s" + REPLAY_ORDER, (game_id,))
+                applied = {id: game for id, game in self._applied.items() if game != game_id}
+                applied.update(scratch._applied)
+                with self._lock:
+                    if game_id in scratch._ratings:
+                        self._ratings[game_id] = scratch._ratings[game_id]
+                    else:
+                        self._ratings.pop(game_id, None)
+                    self._applied = applied
+                    if scratch.watermark is not None and (
+                            self.watermark is None or scratch.watermark > self.watermark):
+                        self.watermark = scratch.watermark
+                    self._dirty.discard(game_id)
+            # A replay may have changed any rating, so save it at the next chance
+            self._since_checkpoint = self.checkpoint_every
+            self.loaded = True
+            return count
+
+    def _set_fingerprint(self, current):
+        self._fingerprint = current
+        self._verified_at = time.monotonic()
+
+    def load(self, cursor):
+        with self._update_lock:
+            cursor.execute("""
+                SELECT last_match_time, last_match_id, params, fingerprint
+                FROM RatingCheckpoint WHERE checkpoint_id = 1
+            """)
+            rows = cursor.fetchall()
+            checkpoint = rows[0] if rows else None
+            if (checkpoint is None or checkpoint['fingerprint'] is None
+                    or json.loads(checkpoint['params']) != self.params):
+                return {'replayed': self.replay(cursor), 'from_checkpoint': False}
+
+            current = fingerprint(cursor)
+            scratch = self._scratch()
+            cursor.execute("SELECT game_id, team_id, rating, matches FROM TeamRating")
+            for row in cursor.fetchall():
+                scratch._ratings.setdefault(row['game_id'], {})[row['team_id']] = [row['rating'], row['matches']]
+            changed = set()
+            if checkpoint['last_match_id'] is not None:
+                scratch.watermark = (checkpoint['last_match_time'], checkpoint['last_match_id'])
+                # Which matches the checkpoint covers, without rating them again
+                cursor.execute(
+                    "SELECT match_id, game_id FROM (" + RATED_MATCHES_QUERY + ") M"
+                    " WHERE (match_date_time, match_id) <= (%s, %s)", scratch.watermark)
+                scratch._applied = {row['match_id']: row['game_id'] for row in cursor.fetchall()}
+                query = RATED_MATCHES_QUERY + " AND (match_date_time, match_id) > (%s, %s)" + REPLAY_ORDER
+                count = scratch._rate_query(cursor, query, scratch.watermark)
+                # Matches up to the checkpoint edited or deleted since it was written
+                saved = json.loads(checkpoint['fingerprint'])
+                now = fingerprint(cursor, scratch.watermark)
+                changed = {game for game in saved.keys() | now.keys() if saved.get(game) != now.get(game)}
+            else:
+                count = scratch._rate_query(cursor, RATED_MATCHES_QUERY + REPLAY_ORDER)
+            with self._lock:
+                self._ratings = scratch._ratings
+                self._applied = scratch._applied
+                self.watermark = scratch.watermark
+                self._dirty = changed
+                self._set_fingerprint(current)
+                self._since_checkpoint = count
+                self.loaded = True
+            return {'replayed': count, 'from_checkpoint': True, 'games_changed': len(changed)}
+
+    @property
+    def verify_due(self):
+        return (self.loaded and self.verify_interval > 0
+                and time.monotonic() - self._verified_at >= self.verify_interval)
+
+    # Mark the games whose rated matches changed since the last load or verify;
+    # returns how many there are
+    def verify(self, cursor):
+        with self._update_lock:
+            current = fingerprint(cursor)
+            changed = {game for game in current.keys() | self._fingerprint.keys()
+                       if current.get(game) != self._fingerprint.get(game)}
+            with self._lock:
+                self._dirty |= changed
+                self.verify_replays += len(changed)
+                self._set_fingerprint(current)
+            return len(changed)
+
+    # Re-read matches after a write to MatchInfo; other tables are ignored
+    def refresh(self, cursor, table_name, ids):
+        ids = [id for id in ids if id is not None]
+        if table_name != 'matchinfo' or not ids:
+            return
+        with self._update_lock:
+            cursor.execute(
+                MATCHES_SELECT + f"WHERE match_id IN ({', '.join(['%s'] * len(ids))})", ids)
+            current = {row['match_id']: row for row in cursor.fetchall()}
+            # Oldest first, so a batch of new matches is rated without a replay
+            ids.sort(key=lambda id: (0, *match_key(current[id])) if rated(current.get(id)) else (1,))
+            with self._lock:
+                for id in ids:
+                    old_game = self._applied.get(id)
+                    row = current.get(id)
+                    if not rated(row):
+                        row = None
+                    if old_game is None and row is not None and (
+                            self.watermark is None or match_key(row) > self.watermark):
+                        self._rate(row)
+                        self._since_checkpoint += 1
+                        continue
+                    if old_game is not None:
+                        self._dirty.add(old_game)
+                    if row is not None:
+                        self._dirty.add(row['game_id'])
+
+    # Replay the games refresh() or verify() marked; True if anything was replayed
+    def catch_up(self, cursor):
+        with self._update_lock:
+            dirty = list(self._dirty)
+            for game_id in dirty:
+                self.replay(cursor, game_id)
+            return bool(dirty)
+
+    @property
+    def checkpoint_due(self):
+        return self._since_checkpoint >= self.checkpoint_every
+
+    # True if ensure_current() has work to do
+    @property
+    def stale(self):
+        return not self.loaded or bool(self._dirty) or self.verify_due
+
+    # Load, verify and replay marked games as needed; only reads
+    def ensure_current(self, cursor):
+        with self._update_lock:
+            if not self.loaded:
+                self.load(cursor)
+            elif self.verify_due:
+                self.verify(cursor)
+            self.catch_up(cursor)
+
+    # Write the ratings and the newest rated match; run inside a transaction.
+    # The ratings are first brought up to the transaction's view of MatchInfo,
+    # so the saved fingerprint describes exactly the matches they include.
+    def checkpoint(self, cursor):
+        with self._update_lock:
+            self.verify(cursor)
+            self.catch_up(cursor)
+            with self._lock:
+                rows = [(game_id, team_id, rating, matches)
+                        for game_id, table in self._ratings.items()
+                        for team_id, (rating, matches) in table.items()]
+                watermark = self.watermark
+                matches_rated = len(self._applied)
+                self._since_checkpoint = 0
+            saved = fingerprint(cursor, watermark) if watermark is not None else {}
+            cursor.execute("DELETE FROM TeamRating")
+            for start in range(0, len(rows), REPLAY_BATCH):
+                cursor.executemany(
+                    "INSERT INTO TeamRating (game_id, team_id, rating, matches) VALUES (%s, %s, %s, %s)",
+                    rows[start:start + REPLAY_BATCH])
+            cursor.execute("""
+                REPLACE INTO RatingCheckpoint (checkpoint_id, last_match_time, last_match_id,
+                                               matches_rated, params, fingerprint)
+                VALUES (1, %s, %s, %s, %s, %s)
+            """, (*(watermark or (None, None)), matches_rated, json.dumps(self.params, sort_keys=True),
+                  json.dumps(saved)))
+            return len(rows)
+
+    # Ratings of one team, in every game or one, best first
+    def team(self, team_id, game_id=None):
+        with self._lock:
+            games = [game_id] if game_id is not None else list(self._ratings)
+            result = []
+            for game in games:
+                table = self._ratings.get(game, {})
+                if team_id not in table:
+                    continue
+                rating, matches = table[team_id]
+                result.append({
+                    'game_id': game,
+                    'rating': round(rating, 1),
+                    'matches': matches,
+                    'rank': 1 + sum(1 for r, _ in table.values() if r > rating),
+                    'teams': len(table),
+                })
+        return sorted(result, key=lambda r: -r['rating'])
+
+    def leaderboard(self, game_id, limit=20, min_matches=1):
+        with self._lock:
+            table = self._ratings.get(game_id, {})
+            top = heapq.nlargest(limit, (
+                (rating, team_id, matches)
+                for team_id, (rating, matches) in table.items() if matches >= min_matches))
+        return [{
+            'rank': rank,
+            'team_id': team_id,
+            'rating': round(rating, 1),
+            'matches': matches,
+        } for rank, (rating, team_id, matches) in enumerate(top, 1)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'games': len(self._ratings),
+                'teams_rated': sum(len(t) for t in self._ratings.values()),
+                'matches_rated': len(self._applied),
+                'last_match': list(self.watermark) if self.watermark else None,
+                'games_pending_replay': len(self._dirty),
+                'since_checkpoint': self._since_checkpoint,
+                'seconds_since_verify': round(time.monotonic() - self._verified_at, 1) if self.loaded else None,
+                'verify_replays': self.verify_replays,
+                'params': self.params,
+            }
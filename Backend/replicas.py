@@ -0,0 +1,157 @@
+import itertools
+import threading
+import time
+
+from mysql.connector import Error
+
+from db_pool import ConnectionPool, PoolError
+
+# ================== READ REPLICAS ==================
+# A ConnectionPool per MySQL read replica, plus a background thread that
+# checks each one every check_interval seconds. A replica serves reads only
+# while its last check passed:
+#   - it answered a query,
+#   - replication is running (unless require_replication=False, for testing
+#     against a plain copy of the database), and
+#   - it is at most max_lag seconds behind the primary.
+# A replica whose pool fails during a request is taken out right away and
+# comes back after its next passing check.
+#
+# choose() picks among the healthy ones, in turn ('round_robin') or the one
+# with the fewest connections in use ('least_loaded'), and returns None when
+# there are none, in which case the caller reads from the primary.
+
+REPLICA_STATUS_QUERIES = ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS")   # MySQL >= 8.0.22, older
+
+
+class Replica:
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = False        # until the first check passes
+        self.lag = None
+        self.error = None
+        self.checked_at = None
+        self.chosen = 0
+        self.failures = 0
+
+
+class ReplicaSet:
+
+    def __init__(self, configs, pool_options=None, strategy='round_robin', max_lag=5,
+                 check_interval=5, require_replication=True):
+        if strategy not in ('round_robin', 'least_loaded'):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.replicas = [
+            Replica(f"{config['host']}:{config.get('port', 3306)}", ConnectionPool(config, **(pool_options or {})))
+            for config in configs
+        ]
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.require_replication = require_replication
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+        self.fallbacks = 0          # reads sent to the primary for want of a replica
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='replica-health', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check_all()
+            self._stop.wait(self.check_interval)
+
+    # Seconds behind the primary; None if the server is not replicating
+    def _replication_lag(self, cursor):
+        for query in REPLICA_STATUS_QUERIES:
+            try:
+                cursor.execute(query)
+            except Error:
+                continue
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+            status = rows[0]
+            running = all(status.get(key) in ('Yes', None) for key in (
+                'Replica_IO_Running', 'Replica_SQL_Running', 'Slave_IO_Running', 'Slave_SQL_Running'))
+            lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            return lag if running else None
+        return None
+
+    def check(self, replica):
+        error = None
+        lag = None
+        try:
+            with replica.pool.connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    lag = self._replication_lag(cursor)
+                finally:
+                    cursor.close()
+            if lag is None and self.require_replication:
+                error = 'replication is not running'
+            elif lag is not None and lag > self.max_lag:
+                error = f'{lag}s behind the primary'
+        except (Error, PoolError) as e:
+            error = str(e)
+        with self._lock:
+            replica.lag = lag
+            replica.error = error
+            replica.healthy = error is None
+            replica.checked_at = time.time()
+        return replica.healthy
+
+    def check_all(self):
+        for replica in self.replicas:
+            self.check(replica)
+
+    def choose(self):
+        with self._lock:
+            healthy = [r for r in self.replicas if r.healthy]
+            if not healthy:
+                self.fallbacks += 1
+                return None
+            if self.strategy == 'least_loaded':
+                replica = min(healthy, key=lambda r: r.pool.load)
+            else:
+                replica = healthy[next(self._turn) % len(healthy)]
+            replica.chosen += 1
+            return replica
+
+    def mark_failed(self, replica, error):
+        with self._lock:
+            replica.healthy = False
+            replica.error = str(error)
+            replica.failures += 1
+
+    def close(self):
+        self.stop()
+        for replica in self.replicas:
+            replica.pool.close_all()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'strategy': self.strategy,
+                'max_lag': self.max_lag,
+                'fallbacks': self.fallbacks,
+                'replicas': [{
+                    'name': r.name,
+                    'healthy': r.healthy,
+                    'lag': r.lag,
+                    'error': r.error,
+                    'checked_at': r.checked_at,
+                    'chosen': r.chosen,
+                    'failures': r.failures,
+                    'pool': r.pool.stats(),
+                } for r in self.replicas],
+            }
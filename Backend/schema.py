@@ -0,0 +1,195 @@
+import threading
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+# ================== SCHEMA CACHE ==================
+# Table, column, type, primary key and foreign key metadata read from
+# information_schema once, so insert/update payloads can be validated and
+# coerced in memory before a connection is borrowed. Call load() again to
+# pick up schema changes.
+#
+# Tables are keyed by lower-case name, the way the API refers to them.
+
+INT_TYPES = {'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint'}
+FLOAT_TYPES = {'float', 'double', 'real'}
+DECIMAL_TYPES = {'decimal', 'numeric'}
+DATETIME_TYPES = {'datetime', 'timestamp'}
+STRING_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext'}
+
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+
+COLUMNS_QUERY = """
+    SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, IS_NULLABLE,
+           COLUMN_DEFAULT, CHARACTER_MAXIMUM_LENGTH, EXTRA
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+KEYS_QUERY = """
+    SELECT TABLE_NAME, COLUMN_NAME, CONSTRAINT_NAME,
+           REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+    FROM information_schema.KEY_COLUMN_USAGE
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+"""
+
+
+class SchemaError(ValueError):
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class SchemaCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = None
+        self.loaded_at = None
+
+    @property
+    def loaded(self):
+        return self._tables is not None
+
+    # Read metadata with an open cursor and swap it in as one unit
+    def load(self, cursor):
+        cursor.execute(COLUMNS_QUERY)
+        tables = {}
+        for row in cursor.fetchall():
+            table = tables.setdefault(row['TABLE_NAME'].lower(), {
+                'name': row['TABLE_NAME'],
+                'columns': {},
+                'primary_key': [],
+                'foreign_keys': {},
+            })
+            enum_values = None
+            if row['DATA_TYPE'] in ('enum', 'set'):
+                enum_values = [v.strip("'") for v in row['COLUMN_TYPE'][len(row['DATA_TYPE']) + 1:-1].split(',')]
+            table['columns'][row['COLUMN_NAME']] = {
+                'type': row['DATA_TYPE'],
+                'nullable': row['IS_NULLABLE'] == 'YES',
+                'has_default': row['COLUMN_DEFAULT'] is not None or 'auto_increment' in row['EXTRA'],
+                'max_length': row['CHARACTER_MAXIMUM_LENGTH'],
+                'enum': enum_values,
+            }
+
+        cursor.execute(KEYS_QUERY)
+        for row in cursor.fetchall():
+            table = tables.get(row['TABLE_NAME'].lower())
+            if table is None:
+                continue
+            if row['CONSTRAINT_NAME'] == 'PRIMARY':
+                table['primary_key'].append(row['COLUMN_NAME'])
+            elif row['REFERENCED_TABLE_NAME']:
+                table['foreign_keys'][row['COLUMN_NAME']] = (
+                    row['REFERENCED_TABLE_NAME'].lower(), row['REFERENCED_COLUMN_NAME'])
+
+        with self._lock:
+            self._tables = tables
+            self.loaded_at = datetime.now()
+        return tables
+
+    def _table(self, table_name):
+        tables = self._tables
+        if tables is None:
+            raise SchemaError('Schema not loaded')
+        table = tables.get(table_name)
+        if table is None:
+            raise SchemaError(f'Unknown table: {table_name}')
+        return table
+
+    def has_table(self, table_name):
+        return self._tables is not None and table_name in self._tables
+
+    def columns(self, table_name):
+        return list(self._table(table_name)['columns'])
+
+    def primary_key(self, table_name):
+        return tuple(self._table(table_name)['primary_key'])
+
+    def foreign_keys(self, table_name):
+        return dict(self._table(table_name)['foreign_keys'])
+
+    # Check a payload against the table and return a copy with values coerced
+    # to the column types. partial=True (updates) skips the required-column check.
+    def validate(self, table_name, payload, partial=False):
+        if not isinstance(payload, dict) or not payload:
+            raise SchemaError('Entry must be a non-empty object')
+        columns = self._table(table_name)['columns']
+        errors = []
+        coerced = {}
+        for name, value in payload.items():
+            column = columns.get(name)
+            if column is None:
+                errors.append(f'Unknown column: {name}')
+                continue
+            try:
+                coerced[name] = coerce(column, value)
+            except ValueError as e:
+                errors.append(f'{name}: {e}')
+        if not partial:
+            for name, column in columns.items():
+                if name not in payload and not column['nullable'] and not column['has_default']:
+                    errors.append(f'Missing required column: {name}')
+        if errors:
+            raise SchemaError('Invalid entry: ' + '; '.join(errors), errors)
+        return coerced
+
+    def stats(self):
+        tables = self._tables or {}
+        return {
+            'loaded': self._tables is not None,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'tables': len(tables),
+            'columns': sum(len(t['columns']) for t in tables.values()),
+        }
+
+
+def coerce(column, value):
+    if value is None:
+        if not column['nullable']:
+            raise ValueError('may not be null')
+        return None
+
+    data_type = column['type']
+    if data_type in INT_TYPES:
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError('expected an integer')
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError('expected an integer')
+    if data_type in DECIMAL_TYPES:
+        try:
+            return Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError('expected a number')
+    if data_type in FLOAT_TYPES:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError('expected a number')
+    if data_type in DATETIME_TYPES or data_type == 'date':
+        if isinstance(value, (datetime, date)):
+            return value
+        for fmt in DATETIME_FORMATS:
+            try:
+                parsed = datetime.strptime(str(value), fmt)
+                return parsed.date() if data_type == 'date' else parsed
+            except ValueError:
+                pass
+        raise ValueError('expected a date/time like YYYY-MM-DD HH:MM:SS')
+    if column['enum'] is not None:
+        if value not in column['enum']:
+            raise ValueError(f"expected one of {', '.join(column['enum'])}")
+        return value
+    if data_type in STRING_TYPES:
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise ValueError('expected a string')
+        value = str(value)
+        if column['max_length'] is not None and len(value) > column['max_length']:
+            raise ValueError(f"longer than {column['max_length']} characters")
+        return value
+    return value
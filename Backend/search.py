@@ -0,0 +1,194 @@
+import bisect
+import heapq
+import threading
+import unicodedata
+
+# ================== NAME SEARCH ==================
+# In-memory index over team, player, tournament and game names for
+# typeahead (GET /search). Lookups never touch MySQL.
+#
+#   full:     a sorted list of (term, key, field), one per name
+#   words:    the same for every later word-start suffix of a name
+#             ("sang-hyeok", "hyeok" for "lee sang-hyeok"), so bisect finds
+#             "sang" as fast as "lee"
+#   trigrams: trigram -> keys, used to fill the results with fuzzy and
+#             infix matches when the prefixes run out
+#
+# Names are compared case- and accent-insensitively. load() builds the index
+# from the database and refresh() re-reads single rows after a write.
+
+# kind -> (table, primary key, searchable columns; the first is the display name)
+SEARCH_SOURCES = {
+    'team': ('Team', 'team_id', ('team_name',)),
+    'player': ('Player', 'player_id', ('player_username', 'player_real_name', 'player_aliases')),
+    'tournament': ('Tournament', 'tournament_id', ('tournament_name',)),
+    'game': ('Game', 'game_id', ('game_name',)),
+}
+
+# Scores: whole-name prefix, word prefix, then trigram overlap below 1
+FULL_PREFIX = 3.0
+WORD_PREFIX = 2.0
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold().strip()
+
+
+def word_suffixes(term):
+    yield term
+    for i in range(1, len(term)):
+        if not term[i - 1].isalnum() and term[i].isalnum():
+            yield term[i:]
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}      # (kind, id) -> {'kind', 'id', 'name', 'terms': [(field, term), ...]}
+        self._full = []         # sorted [(term, key, field)]
+        self._words = []        # sorted [(word-start suffix, key, field)]
+        self._trigrams = {}     # trigram -> set of keys
+        self.loaded = False
+
+    def load(self, cursor):
+        fresh = SearchIndex()
+        for kind, (table, primary_key, columns) in SEARCH_SOURCES.items():
+            cursor.execute(f"SELECT {primary_key}, {', '.join(columns)} FROM {table}")
+            for row in cursor.fetchall():
+                fresh._add(kind, row[primary_key], row, columns)
+        fresh._full.sort()
+        fresh._words.sort()
+        with self._lock:
+            self._entries = fresh._entries
+            self._full = fresh._full
+            self._words = fresh._words
+            self._trigrams = fresh._trigrams
+            self.loaded = True
+        return len(self._entries)
+
+    # Re-read the given rows of a table after a write; rows that are gone are dropped
+    def refresh(self, cursor, table_name, ids):
+        source = SEARCH_SOURCES.get(table_name)
+        ids = [id for id in ids if id is not None]
+        if source is None or not ids:
+            return
+        table, primary_key, columns = source
+        cursor.execute(
+            f"SELECT {primary_key}, {', '.join(columns)} FROM {table} "
+            f"WHERE {primary_key} IN ({', '.join(['%s'] * len(ids))})", ids)
+        rows = {row[primary_key]: row for row in cursor.fetchall()}
+        with self._lock:
+            for id in ids:
+                self._remove((table_name, id))
+                if id in rows:
+                    self._add(table_name, id, rows[id], columns, keep_sorted=True)
+
+    def _add(self, kind, id, row, columns, keep_sorted=False):
+        key = (kind, id)
+        terms = []
+        for field in columns:
+            if row.get(field):
+                term = normalize(row[field])
+                if term:
+                    terms.append((field, term))
+        if not terms:
+            return
+        self._entries[key] = {'kind': kind, 'id': id, 'name': row[columns[0]], 'terms': terms}
+        for field, term in terms:
+            for n, suffix in enumerate(word_suffixes(term)):
+                terms_list = self._words if n else self._full
+                item = (suffix, key, field)
+                if keep_sorted:
+                    bisect.insort(terms_list, item)
+                else:
+                    terms_list.append(item)
+            for gram in trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for field, term in entry['terms']:
+            for n, suffix in enumerate(word_suffixes(term)):
+                terms_list = self._words if n else self._full
+                item = (suffix, key, field)
+                i = bisect.bisect_left(terms_list, item)
+                if i < len(terms_list) and terms_list[i] == item:
+                    del terms_list[i]
+            for gram in trigrams(term):
+                keys = self._trigrams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._trigrams[gram]
+
+    # Top `limit` matches for text, best first:
+    #   [{'kind', 'id', 'name', 'field', 'score'}, ...]
+    def search(self, text, kinds=None, limit=10):
+        query = normalize(text)
+        if not query:
+            return []
+        best = {}   # key -> (score, field)
+
+        def offer(key, score, field):
+            if kinds and key[0] not in kinds:
+                return
+            if key not in best or best[key][0] < score:
+                best[key] = (score, field)
+
+        def scan(terms_list, score):
+            i = bisect.bisect_left(terms_list, (query,))
+            while i < len(terms_list) and terms_list[i][0].startswith(query):
+                _, key, field = terms_list[i]
+                offer(key, score, field)
+                i += 1
+
+        with self._lock:
+            # Every whole-name match, then word matches only if those cannot
+            # fill the results: any whole-name match outranks any word match
+            scan(self._full, FULL_PREFIX)
+            if len(best) < limit:
+                scan(self._words, WORD_PREFIX)
+
+            if len(best) < limit:
+                grams = trigrams(query)
+                counts = {}
+                for gram in grams:
+                    for key in self._trigrams.get(gram, ()):
+                        counts[key] = counts.get(key, 0) + 1
+                for key, shared in counts.items():
+                    # Best-matching field of the entry, by share of the query's trigrams
+                    score = shared / len(grams)
+                    if score >= 0.3:
+                        field = max(self._entries[key]['terms'],
+                                    key=lambda t: len(grams & trigrams(t[1])))[0]
+                        offer(key, score, field)
+
+            ranked = heapq.nsmallest(
+                limit, best.items(),
+                key=lambda item: (-item[1][0], len(str(self._entries[item[0]]['name'])),
+                                  str(self._entries[item[0]]['name'])))
+            return [{
+                'kind': key[0],
+                'id': key[1],
+                'name': self._entries[key]['name'],
+                'field': field,
+                'score': round(score, 3),
+            } for key, (score, field) in ranked]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'entries': len(self._entries),
+                'prefix_terms': len(self._full) + len(self._words),
+                'trigrams': len(self._trigrams),
+            }
@@ -0,0 +1,200 @@
+import json
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from cache import ResultCache
+
+# ================== SERVER-SIDE SESSIONS ==================
+# Keeps session data (user_id, username, role) on the server; the cookie only
+# carries a signed random session id. Logging out takes effect right away,
+# which a signed-cookie session cannot do. rotate() gives a session a fresh
+# id (on login), so an id handed out earlier never becomes an authenticated one.
+#
+# Stores:
+#   MemorySessionStore   a dict in this process, lost on restart
+#   SQLiteSessionStore   a local SQLite file shared by the processes on one
+#                        host. Reads go through an in-process ResultCache, so
+#                        the role checks on admin requests rarely touch the
+#                        file. A logout in one process can take up to
+#                        cache_ttl seconds to reach the others.
+#
+# Installed with app.session_interface = ServerSessionInterface(store). Code
+# using flask.session does not change.
+
+
+class MemorySessionStore:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}     # sid -> (expires_at, data)
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._sessions[sid]
+                return None
+            return dict(entry[1])
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._sessions[sid] = (time.time() + ttl, dict(data))
+            if len(self._sessions) % 1000 == 0:
+                self._purge()
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    # Caller holds the lock
+    def _purge(self):
+        now = time.time()
+        for sid in [sid for sid, (expires_at, _) in self._sessions.items() if expires_at <= now]:
+            del self._sessions[sid]
+
+    def stats(self):
+        with self._lock:
+            return {'store': 'memory', 'sessions': len(self._sessions)}
+
+
+class SQLiteSessionStore:
+
+    def __init__(self, path, cache_ttl=30, cache_size=10000):
+        self.path = path
+        self._local = threading.local()     # one connection per thread
+        self.cache = ResultCache(max_entries=cache_size, ttl=cache_ttl)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    sid        TEXT PRIMARY KEY,
+                    user_id    INTEGER,
+                    data       TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def get(self, sid):
+        hit, data = self.cache.get(sid)
+        if hit:
+            return dict(data) if data is not None else None
+        # Tagged with the sid, which set/delete invalidate
+        tags = (sid,)
+        generation = self.cache.generation(tags)
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())).fetchone()
+        data = json.loads(row[0]) if row else None
+        self.cache.set(sid, data, tags, generation)
+        return dict(data) if data is not None else None
+
+    def set(self, sid, data, ttl):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?)",
+                (sid, data.get('user_id'), json.dumps(data), time.time() + ttl))
+            if secrets.randbelow(1000) == 0:
+                db.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        self.cache.invalidate(sid)
+
+    def delete(self, sid):
+        with self._connect() as db:
+            db.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+        self.cache.invalidate(sid)
+
+    def stats(self):
+        sessions = self._connect().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        return {'store': 'sqlite', 'path': self.path, 'sessions': sessions, 'cache': self.cache.stats()}
+
+
+class ServerSession(CallbackDict, SessionMixin):
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.replaced_sid = None
+
+    # Move the data to a new sid; the old one is deleted when the session is saved
+    def rotate(self):
+        if not self.new and self.replaced_sid is None:
+            self.replaced_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-session')
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.get(sid)
+                if data is not None:
+                    return ServerSession(data, sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.replaced_sid is not None:
+            self.store.delete(session.replaced_sid)
+
+        # Emptied (logout): drop it from the store and the browser
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            self.store.set(session.sid, dict(session),
+                           int(app.permanent_session_lifetime.total_seconds()))
+        if session.new or session.modified:
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid.encode()).decode(),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def make_session_interface(kind, sqlite_path='sessions.db', cache_ttl=30):
+    if kind == 'memory':
+        return ServerSessionInterface(MemorySessionStore())
+    if kind == 'sqlite':
+        return ServerSessionInterface(SQLiteSessionStore(sqlite_path, cache_ttl=cache_ttl))
+    raise ValueError(f"Unknown session store: {kind}")
@@ -0,0 +1,283 @@
+import array
+import bisect
+import json
+import mmap
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# ================== READ SNAPSHOTS ==================
+# A single file holding the result rows of the read endpoints, so they can be
+# answered with no database at all (app.py, SNAPSHOT_PATH).
+#
+# Every dataset is a list of rows, each stored as the JSON bytes the endpoint
+# would send for it, and one lookup index: the rows for a key ('exact'), or
+# for every key from a given one up ('range'). Indexes are sorted key arrays
+# with a posting list of row numbers per key, all read in place through mmap,
+# so opening a snapshot costs the same for 1k rows or 10M.
+#
+# Layout (integers little-endian, arrays 8-byte aligned):
+#   sections ...            row data, row offsets (u64), index keys,
+#                           key offsets (u64), posting offsets (u64), postings (u32)
+#   header JSON             dataset name -> (offset, length) of each section
+#   header offset (u64), MAGIC
+#
+# SnapshotWriter writes to a temporary file and renames it into place, so a process
+# reading the old file keeps its mapping while the new one appears.
+# SnapshotHolder watches the path and swaps to a new file between requests.
+
+MAGIC = b'MTSNAP01'
+VERSION = 1
+
+
+def key_bytes(key):
+    if isinstance(key, datetime):
+        key = key.strftime('%Y-%m-%d %H:%M:%S')
+    return str(key).encode()
+
+
+class SnapshotWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        self._file = open(self._tmp, 'wb')
+        self._datasets = {}
+        self.build_id = uuid.uuid4().hex[:12]
+
+    def _section(self, data):
+        padding = -self._file.tell() % 8
+        if padding:
+            self._file.write(b'\0' * padding)
+        offset = self._file.tell()
+        self._file.write(data)
+        return [offset, len(data)]
+
+    # rows: iterable of (key, encoded row); rows with a None key are not indexed.
+    # columns records the row key order, which the encoded rows do not keep.
+    def add(self, name, kind, rows, columns=None):
+        if kind not in ('exact', 'range'):
+            raise ValueError(f"Unknown index kind: {kind}")
+        padding = -self._file.tell() % 8
+        if padding:
+            self._file.write(b'\0' * padding)
+        data_start = self._file.tell()
+        row_offsets = array.array('Q', [0])
+        postings = {}
+        for number, (key, row) in enumerate(rows):
+            self._file.write(row)
+            row_offsets.append(row_offsets[-1] + len(row))
+            if key is not None:
+                postings.setdefault(key_bytes(key), []).append(number)
+        data = [data_start, row_offsets[-1]]
+
+        keys = sorted(postings)
+        key_offsets = array.array('Q', [0])
+        posting_offsets = array.array('Q', [0])
+        posting_rows = array.array('I')
+        for key in keys:
+            key_offsets.append(key_offsets[-1] + len(key))
+            posting_rows.extend(postings[key])
+            posting_offsets.append(len(posting_rows))
+        self._datasets[name] = {
+            'kind': kind,
+            'columns': columns,
+            'rows': len(row_offsets) - 1,
+            'keys': len(keys),
+            'data': data,
+            'row_offsets': self._section(row_offsets.tobytes()),
+            'key_data': self._section(b''.join(keys)),
+            'key_offsets': self._section(key_offsets.tobytes()),
+            'posting_offsets': self._section(posting_offsets.tobytes()),
+            'postings': self._section(posting_rows.tobytes()),
+        }
+
+    def finish(self, meta=None):
+        header = json.dumps({
+            'version': VERSION,
+            'build_id': self.build_id,
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+            'meta': meta or {},
+            'datasets': self._datasets,
+        }).encode()
+        offset = self._section(header)[0]
+        self._file.write(offset.to_bytes(8, 'little') + MAGIC)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.unlink(self._tmp)
+
+
+class Dataset:
+
+    def __init__(self, view, spec):
+        self._parts = []
+
+        def section(name, fmt=None):
+            offset, length = spec[name]
+            part = view[offset:offset + length]
+            self._parts.append(part)
+            if fmt:
+                # A length that is not a whole number of items raises TypeError
+                part = part.cast(fmt)
+                self._parts.append(part)
+            return part
+        try:
+            self.kind = spec['kind']
+            self.columns = spec['columns']
+            self.rows = spec['rows']
+            self._data = section('data')
+            self._row_offsets = section('row_offsets', 'Q')
+            self._key_data = section('key_data')
+            self._key_offsets = section('key_offsets', 'Q')
+            self._posting_offsets = section('posting_offsets', 'Q')
+            self._postings = section('postings', 'I')
+        except Exception:
+            self.release()
+            raise
+        self._keys = _Keys(self._key_data, self._key_offsets)
+
+    def row(self, number):
+        return self._data[self._row_offsets[number]:self._row_offsets[number + 1]].tobytes()
+
+    def _rows_for(self, first_key, last_key):
+        start = self._posting_offsets[first_key]
+        end = self._posting_offsets[last_key]
+        return [self.row(number) for number in self._postings[start:end]]
+
+    # Encoded rows whose key equals `key`, in build order
+    def lookup(self, key):
+        key = key_bytes(key)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._rows_for(i, i + 1)
+        return []
+
+    # Encoded rows whose key is at least `key`, in key order
+    def range_from(self, key):
+        i = bisect.bisect_left(self._keys, key_bytes(key))
+        return self._rows_for(i, len(self._keys))
+
+    # Casts first, since a view cannot be released while a cast of it is alive
+    def release(self):
+        for part in reversed(self._parts):
+            part.release()
+
+
+# Read-only sequence of index keys for bisect
+class _Keys:
+
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._data[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+
+class Snapshot:
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._view = None
+        self.datasets = {}
+        try:
+            if self._map[-8:] != MAGIC:
+                raise ValueError(f"{path} is not a snapshot file")
+            header_offset = int.from_bytes(self._map[-16:-8], 'little')
+            self.header = json.loads(self._map[header_offset:len(self._map) - 16])
+            if self.header['version'] != VERSION:
+                raise ValueError(f"{path} has snapshot version {self.header['version']}, expected {VERSION}")
+            self._view = memoryview(self._map)
+            for name, spec in self.header['datasets'].items():
+                self.datasets[name] = Dataset(self._view, spec)
+        except Exception:
+            self.close()
+            raise
+        self.build_id = self.header['build_id']
+        self.loaded_at = time.time()
+
+    def dataset(self, name):
+        dataset = self.datasets.get(name)
+        if dataset is None:
+            raise KeyError(f"Snapshot has no {name} dataset")
+        return dataset
+
+    # The map can only be closed once no view of it is left
+    def close(self):
+        for dataset in self.datasets.values():
+            dataset.release()
+        if self._view is not None:
+            self._view.release()
+        self._map.close()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'build_id': self.build_id,
+            'built_at': self.header['built_at'],
+            'bytes': len(self._map),
+            'meta': self.header['meta'],
+            'datasets': {name: {'kind': d.kind, 'rows': d.rows, 'keys': len(d._keys)}
+                         for name, d in self.datasets.items()},
+        }
+
+
+class SnapshotHolder:
+
+    def __init__(self, path, poll_interval=5):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self.current = Snapshot(path)
+        self.swaps = 0
+        self.last_error = None
+        self._thread = None
+
+    # Swap to the file now at self.path if it is a different one. Requests
+    # that already took self.current finish on the old mapping, which is
+    # unmapped once nothing references it.
+    def reload(self, force=False):
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+                if not force and (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self.current.identity:
+                    return False
+                self.current = Snapshot(self.path)
+                self.swaps += 1
+                self.last_error = None
+                return True
+            except Exception as e:
+                # A broken or half-copied file: keep serving the current one
+                self.last_error = f"{type(e).__name__}: {e}"
+                return False
+
+    def start(self):
+        if self._thread is None and self.poll_interval > 0:
+            self._thread = threading.Thread(target=self._watch, name='snapshot-watch', daemon=True)
+            self._thread.start()
+
+    # Nothing may end this loop, or the process would serve one file forever
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def stats(self):
+        return {**self.current.stats(), 'swaps': self.swaps, 'last_error': self.last_error}
@@ -0,0 +1,117 @@
+# ================== MATERIALIZED STANDINGS ==================
+# TeamWinsSummary and TournamentStandings (Database/migrations/002_standings.sql)
+# hold precomputed copies of the TeamWins and PlacementPoints views, so
+# /getTeamWins and /getPlacementPoints do one indexed lookup instead of an
+# aggregate or sort.
+#
+# The write endpoints keep them current inside their own transaction:
+#   before = touched_keys(cursor, table, ids)   # rows the write may change
+#   ... INSERT / UPDATE / DELETE ...
+#   after = touched_keys(cursor, table, ids)
+#   refresh(cursor, table, before | after)
+# refresh() recounts only the affected (team, tournament) pairs or placements.
+
+# Base tables whose writes affect the summaries: (table, primary key, key columns)
+KEY_SOURCES = {
+    'matchinfo': ('MatchInfo', 'match_id', ('match_winner_id', 'tournament_id')),
+    'placement': ('Placement', 'placement_id', ('placement_id',)),
+    'team': ('Team', 'team_id', ('team_id',)),
+    'tournament': ('Tournament', 'tournament_id', ('tournament_id',)),
+}
+
+TEAM_WINS_SELECT = """
+    SELECT M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name, COUNT(*)
+    FROM MatchInfo M
+    INNER JOIN Team TM ON M.match_winner_id = TM.team_id
+    INNER JOIN Tournament T ON M.tournament_id = T.tournament_id
+"""
+
+STANDINGS_SELECT = """
+    SELECT P.placement_id, P.tournament_id, T.tournament_name, P.team_id, TM.team_name,
+           P.placement_rank, P.placement_points, P.placement_prize_amount
+    FROM Placement P
+    INNER JOIN Team TM ON P.team_id = TM.team_id
+    INNER JOIN Tournament T ON P.tournament_id = T.tournament_id
+"""
+
+TEAM_WINS_INSERT = """
+    INSERT INTO TeamWinsSummary (team_id, tournament_id, team_name, tournament_name, wins)
+"""
+
+STANDINGS_INSERT = """
+    INSERT INTO TournamentStandings (placement_id, tournament_id, tournament_name, team_id,
+                                     team_name, placement_rank, placement_points,
+                                     placement_prize_amount)
+"""
+
+
+# Summary keys fed by the rows with the given primary keys
+def touched_keys(cursor, table_name, ids):
+    source = KEY_SOURCES.get(table_name)
+    ids = [id for id in ids if id is not None]
+    if source is None or not ids:
+        return set()
+    table, primary_key, columns = source
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {primary_key} IN ({placeholders})",
+        ids)
+    keys = set()
+    for row in cursor.fetchall():
+        values = tuple(row[c] for c in columns)
+        if None in values:
+            continue
+        keys.add(values if len(values) > 1 else values[0])
+    return keys
+
+
+def refresh(cursor, table_name, keys):
+    if table_name == 'matchinfo':
+        for team_id, tournament_id in keys:
+            cursor.execute(
+                "DELETE FROM TeamWinsSummary WHERE team_id = %s AND tournament_id = %s",
+                (team_id, tournament_id))
+            cursor.execute(
+                TEAM_WINS_INSERT + TEAM_WINS_SELECT + """
+                WHERE M.match_winner_id = %s AND M.tournament_id = %s
+                GROUP BY M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name
+                """, (team_id, tournament_id))
+
+    elif table_name == 'placement':
+        for placement_id in keys:
+            cursor.execute("DELETE FROM TournamentStandings WHERE placement_id = %s", (placement_id,))
+            cursor.execute(STANDINGS_INSERT + STANDINGS_SELECT + " WHERE P.placement_id = %s",
+                           (placement_id,))
+
+    # Names are copied into the summaries, so renames have to be carried over
+    elif table_name == 'team':
+        for team_id in keys:
+            for summary in ('TeamWinsSummary', 'TournamentStandings'):
+                cursor.execute(f"""
+                    UPDATE {summary} S
+                    INNER JOIN Team TM ON S.team_id = TM.team_id
+                    SET S.team_name = TM.team_name
+                    WHERE S.team_id = %s
+                """, (team_id,))
+
+    elif table_name == 'tournament':
+        for tournament_id in keys:
+            for summary in ('TeamWinsSummary', 'TournamentStandings'):
+                cursor.execute(f"""
+                    UPDATE {summary} S
+                    INNER JOIN Tournament T ON S.tournament_id = T.tournament_id
+                    SET S.tournament_name = T.tournament_name
+                    WHERE S.tournament_id = %s
+                """, (tournament_id,))
+
+
+# Recompute both summaries from scratch
+def rebuild(cursor):
+    cursor.execute("DELETE FROM TeamWinsSummary")
+    cursor.execute(TEAM_WINS_INSERT + TEAM_WINS_SELECT + """
+        GROUP BY M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name
+    """)
+    wins = cursor.rowcount
+    cursor.execute("DELETE FROM TournamentStandings")
+    cursor.execute(STANDINGS_INSERT + STANDINGS_SELECT)
+    return {'team_wins': wins, 'standings': cursor.rowcount}
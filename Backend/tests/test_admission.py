@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+pytest.importorskip('flask')
+
+from admission import AdmissionControl, Overloaded, RateLimited, TokenBucket  # noqa: E402
+
+
+def test_bucket_allows_burst_then_refills():
+    bucket = TokenBucket(rate=2, burst=3, now=0)
+    assert [bucket.take(0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+    assert bucket.take(0.5) > 0
+
+
+def test_bucket_does_not_fill_past_burst():
+    bucket = TokenBucket(rate=10, burst=2, now=0)
+    assert bucket.take(100) == 0
+    assert bucket.take(100) == 0
+    assert bucket.take(100) > 0
+
+
+def test_rate_limit_per_client_and_scope():
+    control = AdmissionControl(client_limit={'rate': 1, 'burst': 2},
+                               routes={'/getTable': {'rate': 1, 'burst': 1}})
+    scopes = control.scopes('/getTable')
+    assert scopes == ['client', 'route:/getTable']
+    control.check_rate('ip:a', scopes)
+    with pytest.raises(RateLimited) as e:
+        control.check_rate('ip:a', scopes)
+    assert 'route:/getTable' in str(e.value)
+    assert e.value.retry_after > 0
+    # Another client has its own buckets
+    control.check_rate('ip:b', scopes)
+    assert control.stats()['rate_limited'] == 1
+
+
+def test_scopes_skip_unlimited_routes_and_tables():
+    control = AdmissionControl(tables={'matchinfo': {'rate': 5}})
+    assert control.scopes('/other', 'team') == ['client']
+    assert control.scopes('/other', 'matchinfo') == ['client', 'table:matchinfo']
+
+
+def test_least_recently_used_bucket_is_dropped():
+    control = AdmissionControl(client_limit={'rate': 1, 'burst': 1}, max_buckets=2)
+    control.check_rate('a', ['client'])
+    control.check_rate('b', ['client'])
+    control.check_rate('c', ['client'])
+    assert control.stats()['clients_tracked'] == 2
+    # a's empty bucket was dropped, so it starts full again
+    control.check_rate('a', ['client'])
+
+
+def test_concurrency_slots():
+    control = AdmissionControl(routes={'/export': {'concurrency': 1}})
+    scopes = control.scopes('/export')
+    held = control.acquire(scopes)
+    assert control.stats()['in_flight'] == {'route:/export': 1}
+    with pytest.raises(Overloaded):
+        control.acquire(scopes, blocking=False)
+    control.release(held)
+    control.release(control.acquire(scopes))
+    assert control.stats()['in_flight'] == {'route:/export': 0}
+    assert control.stats()['overloaded'] == 1
+
+
+def test_acquire_waits_for_queue_timeout():
+    control = AdmissionControl(routes={'/export': {'concurrency': 1, 'queue_timeout': 5}})
+    scopes = control.scopes('/export')
+    held = control.acquire(scopes)
+    threading.Timer(0.05, control.release, (held,)).start()
+    control.release(control.acquire(scopes))
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from analytics import MatchAnalytics  # noqa: E402
+
+
+def match(id, day, team1, team2, winner, game='G1', tournament='T1'):
+    return {'match_id': id, 'match_date_time': datetime(2025, 1, day), 'match_rounds': 1,
+            'team1_id': team1, 'team2_id': team2, 'match_winner_id': winner,
+            'game_id': game, 'tournament_id': tournament}
+
+
+@pytest.fixture
+def engine():
+    engine = MatchAnalytics(compact_at=3)
+    engine.load_rows([
+        match('M1', 1, 'A', 'B', 'A'),
+        match('M2', 2, 'B', 'A', 'B'),
+        match('M3', 3, 'A', 'C', 'A', game='G2'),
+        match('M4', 4, 'A', 'B', None),
+    ])
+    return engine
+
+
+def test_head_to_head(engine):
+    result = engine.head_to_head('A', 'B')
+    assert result['matches'] == 3
+    assert result['wins'] == {'A': 1, 'B': 1}
+    assert result['undecided'] == 1
+    assert [m['match_id'] for m in result['recent']] == ['M4', 'M2', 'M1']
+    assert engine.head_to_head('A', 'Z')['matches'] == 0
+    assert engine.head_to_head('A', 'B', game_id='G9')['matches'] == 0
+
+
+def test_form(engine):
+    result = engine.form('A')
+    assert result['results'] == 'WLW'
+    assert result['streak'] == {'result': 'W', 'length': 1}
+    assert engine.form('A', game_id='G1')['results'] == 'WL'
+
+
+def test_win_rates(engine):
+    rates = {row['team_id']: (row['matches'], row['wins']) for row in engine.win_rates()}
+    assert rates == {'A': (3, 2), 'B': (2, 1), 'C': (1, 0)}
+    by_game = {row['game_id']: row['wins'] for row in engine.win_rates(team_id='A')}
+    assert by_game == {'G1': 1, 'G2': 1}
+
+
+def test_apply_edits_deletes_and_compacts(engine):
+    engine.apply(['M1', 'M5'], [match('M1', 1, 'A', 'B', 'B'), match('M5', 5, 'D', 'B', 'D')])
+    assert engine.head_to_head('A', 'B')['wins'] == {'A': 0, 'B': 2}
+    engine.apply(['M2'], [])
+    assert engine.head_to_head('A', 'B')['matches'] == 2
+    engine.apply(['M6'], [match('M6', 6, 'D', 'C', 'C')])
+    stats = engine.stats()
+    assert stats['delta_matches'] == 0
+    assert stats['base_matches'] == 5
+    assert engine.form('D')['results'] == 'WL'
+
+
+def test_queries_decode_with_the_codes_of_their_blocks(engine):
+    teams, games, tournaments, blocks = engine._snapshot()
+    # A reload in the middle of a query swaps in new Codes; the snapshot keeps the old pair
+    engine.load_rows([match('M9', 9, 'X', 'Y', 'X')])
+    a, b = teams.find('A'), teams.find('B')
+    columns = engine._collect(blocks, lambda block: block.pair_positions(a, b))
+    assert {m['team1_id'] for m in engine._match_list(teams, *columns)} == {'A', 'B'}
+    assert engine.head_to_head('X', 'Y')['matches'] == 1
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('mysql.connector')
+
+os.environ.setdefault('SEARCH_INDEX_ON_START', '0')
+
+import app as backend  # noqa: E402
+from schema import SchemaError  # noqa: E402
+
+
+class FakeSchema:
+
+    # PrizePool <- Tournament <- TournamentTeam -> Team
+    FOREIGN_KEYS = {
+        'prizepool': {},
+        'tournament': {'prize_pool_id': ('prizepool', 'prize_pool_id')},
+        'team': {},
+        'tournamentteam': {'tournament_id': ('tournament', 'tournament_id'), 'team_id': ('team', 'team_id')},
+    }
+
+    def foreign_keys(self, table_name):
+        return dict(self.FOREIGN_KEYS.get(table_name, {}))
+
+    def validate(self, table_name, payload, partial=False):
+        if not isinstance(payload, dict) or not payload:
+            raise SchemaError('Entry must be a non-empty object')
+        return dict(payload)
+
+
+@pytest.fixture(autouse=True)
+def schema(monkeypatch):
+    monkeypatch.setattr(backend, 'get_schema', lambda: FakeSchema())
+
+
+def operations(*ops):
+    return [{'index': i, 'op': op, 'table_name': table} for i, (op, table) in enumerate(ops)]
+
+
+def order(ops):
+    return [(o['op'], o['table_name']) for o in backend.batch_order(operations(*ops))]
+
+
+def test_ancestors_follow_foreign_keys_through_the_batch():
+    ancestors = backend.foreign_key_ancestors({'prizepool', 'tournament', 'tournamentteam', 'team'})
+    assert ancestors['tournamentteam'] == {'tournament', 'prizepool', 'team'}
+    assert ancestors['tournament'] == {'prizepool'}
+    assert ancestors['prizepool'] == set()
+    # Tables outside the batch don't count
+    assert backend.foreign_key_ancestors({'tournamentteam', 'prizepool'}) == {'tournamentteam': set(), 'prizepool': set()}
+
+
+def test_writes_go_parents_first():
+    assert order(('insert', 'tournamentteam'), ('insert', 'tournament'), ('insert', 'prizepool'),
+                 ('insert', 'team')) == [
+        ('insert', 'prizepool'), ('insert', 'tournament'), ('insert', 'team'), ('insert', 'tournamentteam')]
+
+
+def test_deletes_go_children_first():
+    assert order(('delete', 'prizepool'), ('delete', 'tournament'), ('delete', 'tournamentteam')) == [
+        ('delete', 'tournamentteam'), ('delete', 'tournament'), ('delete', 'prizepool')]
+
+
+def test_operations_on_one_table_keep_their_order():
+    ops = operations(('delete', 'team'), ('insert', 'team'), ('update', 'team'))
+    assert [o['index'] for o in backend.batch_order(ops)] == [0, 1, 2]
+
+
+def test_unrelated_tables_keep_the_given_order():
+    assert order(('insert', 'team'), ('insert', 'prizepool')) == [('insert', 'team'), ('insert', 'prizepool')]
+
+
+def test_interleaved_order_runs_the_earliest():
+    # The prizepool delete waits on the tournament delete, which is queued
+    # behind a tournament insert waiting on the prizepool insert: nothing is
+    # ready, so the earliest goes first
+    ops = operations(('delete', 'prizepool'), ('insert', 'prizepool'), ('insert', 'tournament'),
+                     ('delete', 'tournament'))
+    assert [o['index'] for o in backend.batch_order(ops)] == [0, 1, 2, 3]
+
+
+def test_parse_operation():
+    parsed = backend.parse_operation(0, {'op': 'insert', 'table_name': 'Team', 'entry': {'team_id': 'T1'}})
+    assert parsed == {'index': 0, 'op': 'insert', 'table_name': 'team', 'entry': {'team_id': 'T1'}}
+
+    parsed = backend.parse_operation(1, {'op': 'update', 'table_name': 'team', 'id': 'T1',
+                                         'update_colms': {'team_name': 'A'}})
+    assert parsed['key'] == ['T1'] and parsed['update_colms'] == {'team_name': 'A'}
+
+    parsed = backend.parse_operation(2, {'op': 'delete', 'table_name': 'tournamentteam',
+                                         'id': {'team_id': 'T1', 'tournament_id': 'W1'}})
+    assert parsed['key'] == ['W1', 'T1']
+    parsed = backend.parse_operation(3, {'op': 'delete', 'table_name': 'tournamentteam', 'id': ['W1', 'T1']})
+    assert parsed['key'] == ['W1', 'T1']
+
+
+@pytest.mark.parametrize('operation', [
+    'insert',
+    {'op': 'upsert', 'table_name': 'team'},
+    {'op': 'insert', 'table_name': 'users', 'entry': {'x': 1}},
+    {'op': 'insert', 'table_name': 'team', 'entry': {}},
+    {'op': 'delete', 'table_name': 'team'},
+    {'op': 'delete', 'table_name': 'tournamentteam', 'id': {'team_id': 'T1'}},
+    {'op': 'delete', 'table_name': 'tournamentteam', 'id': ['W1']},
+])
+def test_parse_operation_rejects(operation):
+    with pytest.raises(SchemaError):
+        backend.parse_operation(0, operation)
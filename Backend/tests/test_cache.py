@@ -0,0 +1,78 @@
+import time
+
+from cache import ResultCache
+
+
+def test_hit_and_miss():
+    cache = ResultCache()
+    assert cache.get('k') == (False, None)
+    cache.set('k', [1], ('team',))
+    assert cache.get('k') == (True, [1])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.set('k', 1, ('team',))
+    now[0] += 9
+    assert cache.get('k') == (True, 1)
+    now[0] += 2
+    assert cache.get('k') == (False, None)
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.set('a', 1, ('team',))
+    cache.set('b', 2, ('team',))
+    cache.get('a')
+    cache.set('c', 3, ('team',))
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_drops_only_entries_of_that_table():
+    cache = ResultCache()
+    cache.set('teams', 1, ('team',))
+    cache.set('roster', 2, ('team', 'player'))
+    cache.set('games', 3, ('game',))
+    cache.invalidate('team')
+    assert cache.get('teams') == (False, None)
+    assert cache.get('roster') == (False, None)
+    assert cache.get('games') == (True, 3)
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_stale_generation_is_not_cached():
+    cache = ResultCache()
+    generation = cache.generation(('team', 'player'))
+    cache.invalidate('player')
+    cache.set('roster', 1, ('team', 'player'), generation)
+    assert cache.get('roster') == (False, None)
+
+    generation = cache.generation(('team', 'player'))
+    cache.set('roster', 1, ('team', 'player'), generation)
+    assert cache.get('roster') == (True, 1)
+
+
+def test_clear_bumps_generations():
+    cache = ResultCache()
+    cache.set('teams', 1, ('team',))
+    generation = cache.generation(('team',))
+    cache.clear()
+    cache.set('teams', 1, ('team',), generation)
+    assert cache.get('teams') == (False, None)
+
+
+def test_changed_within():
+    cache = ResultCache()
+    assert not cache.changed_within(None, 60)
+    cache.invalidate('team')
+    assert cache.changed_within(None, 60)
+    assert cache.changed_within(('team', 'game'), 60)
+    assert not cache.changed_within(('game',), 60)
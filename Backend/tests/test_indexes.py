@@ -0,0 +1,36 @@
+import pytest
+
+# EXPLAIN each view query against the database in .env (Database/MatchTracker-mysql.sql
+# with the migrations applied); skipped when there is no database to reach.
+pytest.importorskip('flask')
+pytest.importorskip('mysql.connector')
+
+import app as backend  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def cursor():
+    try:
+        with backend.db_cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            yield cursor
+    except backend.PoolError as e:
+        pytest.skip(f"no database: {e}")
+
+
+def test_required_indexes_present(cursor):
+    assert backend.find_missing_indexes() == []
+
+
+@pytest.mark.parametrize('endpoint', sorted(backend.VIEW_QUERIES))
+def test_view_query_uses_indexes(cursor, endpoint):
+    cursor.execute("EXPLAIN " + backend.VIEW_QUERIES[endpoint], backend.EXPLAIN_PARAMS[endpoint])
+    rows = cursor.fetchall()
+    assert rows
+    for row in rows:
+        if not row['table'] or row['table'].startswith('<') or row['type'] in ('system', 'const'):
+            continue
+        assert row['type'] != 'ALL', f"{endpoint} scans {row['table']}"
+        assert row['key'] is not None, f"{endpoint} reads {row['table']} without an index"
+    assert backend.full_scans(rows) == []
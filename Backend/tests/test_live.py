@@ -0,0 +1,79 @@
+import json
+import time
+
+import live
+
+
+def hub(**kwargs):
+    return live.EventHub(json.dumps, **kwargs)
+
+
+def event_id(frame):
+    return frame.split('\n')[0][len('id: '):]
+
+
+def test_diff_moves_and_deletes():
+    before = {'M1': {'tournament_name': 'A', 'x': 1}, 'M2': {'tournament_name': 'A', 'x': 2}}
+    after = {'M1': {'tournament_name': 'B', 'x': 1}, 'M2': {'tournament_name': 'A', 'x': 2}}
+    assert live.diff('matchinfo', before, after) == {
+        'A': [{'op': 'delete', 'id': 'M1'}],
+        'B': [{'op': 'upsert', 'id': 'M1', 'row': after['M1']}],
+    }
+    assert live.diff('team', before, after) == {}
+
+
+def test_topics_match_case_insensitively():
+    events = hub()
+    subscriber = events.subscribe('Worlds 2024')
+    events.publish('WORLDS 2024', 'matchinfo', {'n': 1})
+    frame = subscriber.next_frame(0)
+    assert 'data: {"n": 1}' in frame
+    events.unsubscribe(subscriber)
+    assert events.stats()['topics'] == 0
+
+
+def test_reconnect_replays_missed_frames():
+    events = hub()
+    events.publish('t', 'matchinfo', {'n': 1})
+    first = events.subscribe('t')
+    events.publish('t', 'matchinfo', {'n': 2})
+    last_seen = event_id(first.next_frame(0))
+    events.unsubscribe(first)
+    events.publish('t', 'matchinfo', {'n': 3})
+    again = events.subscribe('T', last_seen)
+    assert '"n": 3' in again.next_frame(0)
+    assert again.next_frame(0) is None
+
+
+def test_reconnect_past_the_replay_window_resets():
+    events = hub(replay=2)
+    subscriber = events.subscribe('t')
+    events.publish('t', 'matchinfo', {'n': 1})
+    last_seen = event_id(subscriber.next_frame(0))
+    for n in range(2, 5):
+        events.publish('t', 'matchinfo', {'n': n})
+    assert events.subscribe('t', last_seen).next_frame(0) is live.RESET_FRAME
+    assert events.subscribe('t', 'otherepoch-1').next_frame(0) is live.RESET_FRAME
+
+
+def test_slow_subscriber_gets_reset():
+    events = hub(max_pending=2)
+    subscriber = events.subscribe('t')
+    for n in range(3):
+        events.publish('t', 'matchinfo', {'n': n})
+    assert subscriber.next_frame(0) is live.RESET_FRAME
+    assert subscriber.next_frame(0) is None
+
+
+def test_quiet_unfollowed_topics_are_dropped():
+    events = hub(topic_ttl=0.05)
+    follower = events.subscribe('followed')
+    events.publish('followed', 'matchinfo', {})
+    events.publish('old', 'matchinfo', {})
+    last_seen = event_id(follower.next_frame(0))
+    time.sleep(0.06)
+    events.publish('new', 'matchinfo', {})
+    assert events.stats()['topics_kept'] == 2
+    # The dropped topic's history is gone, so a client that may have missed it resets
+    assert events.subscribe('old', last_seen).next_frame(0) is live.RESET_FRAME
+    assert events.subscribe('followed', last_seen).next_frame(0) is None
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip('flask')
+
+import metrics  # noqa: E402
+
+
+class FakeCursor:
+
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def instrumented(rows):
+    stats = metrics.RequestStats()
+    cursor = metrics.InstrumentedCursor(FakeCursor(rows), None, stats, metrics.RequestMetrics(slow_query_ms=1e9))
+    return cursor, stats
+
+
+def test_iteration_is_counted():
+    cursor, stats = instrumented([{'id': 1}, {'id': 2}, {'id': 3}])
+    cursor.execute("SELECT id FROM Team")
+    assert [row['id'] for row in cursor] == [1, 2, 3]
+    assert stats.rows == 3
+    assert stats.queries == 1
+
+
+def test_fetchall_is_counted():
+    cursor, stats = instrumented([{'id': 1}, {'id': 2}])
+    cursor.execute("SELECT id FROM Team")
+    assert len(cursor.fetchall()) == 2
+    assert stats.rows == 2
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('bcrypt')
+
+from passwords import HasherBusy, PasswordHasher  # noqa: E402
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(rounds=4, workers=2)
+    hashed = hasher.hash('secret')
+    assert hasher.verify('secret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert hasher.needs_rehash(hashed) is False
+    assert PasswordHasher(rounds=5).needs_rehash(hashed) is True
+
+
+def test_unknown_user_checks_the_one_dummy_hash():
+    hasher = PasswordHasher(rounds=4, workers=2)
+    dummy = hasher._dummy_hash
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher.verify('x', None))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [False] * 4
+    assert hasher._dummy_hash is dummy
+
+
+def test_full_pool_rejects():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1)
+    hasher._dummy_hash.result()
+    release = threading.Event()
+    holder = threading.Thread(target=lambda: hasher._run(release.wait, 5))
+    holder.start()
+    try:
+        while hasher._slots._value:     # until the holder has the only slot
+            time.sleep(0.001)
+        with pytest.raises(HasherBusy):
+            hasher.hash('secret')
+        assert hasher.stats()['rejected'] == 1
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_slow_hash_times_out():
+    hasher = PasswordHasher(rounds=4, workers=1, timeout=0.05)
+    hasher._dummy_hash.result()
+    release = threading.Event()
+    with pytest.raises(HasherBusy):
+        hasher._run(release.wait, 5)
+    release.set()
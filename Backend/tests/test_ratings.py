@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import ratings
+from ratings import EloRatings
+
+
+def match(id, day, game='G1', team1='A', team2='B', winner='A'):
+    return {'match_id': id, 'match_date_time': datetime(2025, 1, day), 'game_id': game,
+            'team1_id': team1, 'team2_id': team2, 'match_winner_id': winner}
+
+
+class FakeCursor:
+    """MatchInfo in a list, answering the queries ratings.py makes outside a checkpoint"""
+
+    def __init__(self, matches, block=None):
+        self.matches = matches
+        self.block = block      # Event the next replay query waits on
+        self._rows = []
+
+    def execute(self, query, params=()):
+        if 'match_id IN (' in query:
+            self._rows = [m for m in self.matches if m['match_id'] in params]
+            return
+        rows = sorted((m for m in self.matches if ratings.rated(m)), key=ratings.match_key)
+        if 'game_id = %s' in query:
+            rows = [m for m in rows if m['game_id'] == params[0]]
+        if self.block is not None:
+            self.block.wait(5)
+        self._rows = rows
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+
+@pytest.fixture(autouse=True)
+def fake_fingerprint(monkeypatch):
+    def fingerprint(cursor, watermark=None):
+        result = {}
+        for m in cursor.matches:
+            if ratings.rated(m):
+                count, checksum = result.get(m['game_id'], [0, 0])
+                result[m['game_id']] = [count + 1, checksum + hash(tuple(sorted(m.items())))]
+        return result
+    monkeypatch.setattr(ratings, 'fingerprint', fingerprint)
+
+
+def ratings_of(engine, game='G1'):
+    return {row['team_id']: row['rating'] for row in engine.leaderboard(game, limit=100)}
+
+
+def test_replay_rates_in_time_order():
+    engine = EloRatings()
+    engine.replay(FakeCursor([match('M2', 2, winner='B'), match('M1', 1)]))
+    first = EloRatings()
+    first.rate_rows([match('M1', 1), match('M2', 2, winner='B')])
+    assert ratings_of(engine) == ratings_of(first)
+    assert engine.stats()['matches_rated'] == 2
+    assert engine.watermark == (datetime(2025, 1, 2), 'M2')
+
+
+def test_refresh_rates_a_new_match_on_the_spot():
+    matches = [match('M1', 1)]
+    engine = EloRatings()
+    engine.replay(FakeCursor(matches))
+    matches.append(match('M2', 2, winner='B'))
+    engine.refresh(FakeCursor(matches), 'matchinfo', ['M2'])
+    assert not engine.stale
+    expected = EloRatings()
+    expected.replay(FakeCursor(matches))
+    assert ratings_of(engine) == ratings_of(expected)
+
+
+def test_refresh_of_an_older_match_replays_its_game():
+    matches = [match('M1', 1), match('M2', 2), match('M3', 1, game='G2')]
+    engine = EloRatings()
+    engine.replay(FakeCursor(matches))
+    matches[0] = match('M1', 1, winner='B')
+    engine.refresh(FakeCursor(matches), 'matchinfo', ['M1'])
+    assert engine.stats()['games_pending_replay'] == 1
+    engine.ensure_current(FakeCursor(matches))
+    expected = EloRatings()
+    expected.replay(FakeCursor(matches))
+    assert ratings_of(engine) == ratings_of(expected)
+    assert ratings_of(engine, 'G2') == ratings_of(expected, 'G2')
+
+
+def test_refresh_ignores_other_tables():
+    engine = EloRatings()
+    engine.replay(FakeCursor([match('M1', 1)]))
+    engine.refresh(None, 'team', ['A'])
+    assert not engine.stale
+
+
+def test_verify_finds_another_workers_edit():
+    matches = [match('M1', 1), match('M2', 2), match('M3', 1, game='G2')]
+    engine = EloRatings(verify_interval=0)
+    engine.replay(FakeCursor(matches))
+    assert engine.verify(FakeCursor(matches)) == 0
+    matches[0] = match('M1', 1, winner='B')
+    assert engine.verify(FakeCursor(matches)) == 1
+    engine.catch_up(FakeCursor(matches))
+    expected = EloRatings()
+    expected.replay(FakeCursor(matches))
+    assert ratings_of(engine) == ratings_of(expected)
+
+
+def test_reads_do_not_wait_for_a_replay():
+    matches = [match('M1', 1), match('M2', 2, winner='B')]
+    engine = EloRatings()
+    engine.replay(FakeCursor(matches))
+    before = ratings_of(engine)
+    block = threading.Event()
+    replay = threading.Thread(target=engine.replay, args=(FakeCursor(matches + [match('M3', 3)], block),))
+    replay.start()
+    try:
+        time.sleep(0.05)
+        start = time.perf_counter()
+        assert ratings_of(engine) == before
+        assert time.perf_counter() - start < 1
+    finally:
+        block.set()
+        replay.join()
+    assert engine.stats()['matches_rated'] == 3
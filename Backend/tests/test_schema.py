@@ -0,0 +1,116 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from schema import COLUMNS_QUERY, KEYS_QUERY, SchemaCache, SchemaError
+
+
+def column(table, name, data_type, nullable='NO', default=None, max_length=None, extra='', column_type=None):
+    return {
+        'TABLE_NAME': table, 'COLUMN_NAME': name, 'DATA_TYPE': data_type,
+        'COLUMN_TYPE': column_type or data_type, 'IS_NULLABLE': nullable,
+        'COLUMN_DEFAULT': default, 'CHARACTER_MAXIMUM_LENGTH': max_length, 'EXTRA': extra,
+    }
+
+
+def key(table, name, constraint='PRIMARY', ref_table=None, ref_column=None):
+    return {
+        'TABLE_NAME': table, 'COLUMN_NAME': name, 'CONSTRAINT_NAME': constraint,
+        'REFERENCED_TABLE_NAME': ref_table, 'REFERENCED_COLUMN_NAME': ref_column,
+    }
+
+
+COLUMNS = [
+    column('Team', 'team_id', 'varchar', max_length=10),
+    column('Team', 'team_name', 'varchar', max_length=5),
+    column('Team', 'founded', 'date', nullable='YES'),
+    column('Team', 'wins', 'int', default='0'),
+    column('Team', 'earnings', 'decimal', nullable='YES'),
+    column('Team', 'region', 'enum', nullable='YES', column_type="enum('EU','NA')"),
+    column('Team', 'created_at', 'datetime', nullable='YES'),
+    column('Player', 'player_id', 'int', extra='auto_increment'),
+    column('Player', 'team_id', 'varchar', nullable='YES', max_length=10),
+]
+
+KEYS = [
+    key('Team', 'team_id'),
+    key('Player', 'player_id'),
+    key('Player', 'team_id', 'fk_player_team', 'Team', 'team_id'),
+    key('Dropped', 'x'),
+]
+
+
+class FakeCursor:
+
+    def __init__(self, results):
+        self.results = results
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self._rows = self.results[query]
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+@pytest.fixture
+def schema():
+    schema = SchemaCache()
+    schema.load(FakeCursor({COLUMNS_QUERY: COLUMNS, KEYS_QUERY: KEYS}))
+    return schema
+
+
+def test_not_loaded():
+    schema = SchemaCache()
+    assert not schema.loaded
+    with pytest.raises(SchemaError):
+        schema.columns('team')
+
+
+def test_load(schema):
+    assert schema.loaded
+    assert schema.columns('team') == ['team_id', 'team_name', 'founded', 'wins', 'earnings', 'region', 'created_at']
+    assert schema.primary_key('team') == ('team_id',)
+    assert schema.foreign_keys('player') == {'team_id': ('team', 'team_id')}
+    assert schema.foreign_keys('team') == {}
+    assert not schema.has_table('dropped')
+    assert schema.stats()['tables'] == 2
+    with pytest.raises(SchemaError):
+        schema.columns('nope')
+
+
+def test_validate_coerces_values(schema):
+    entry = schema.validate('team', {
+        'team_id': 'T1', 'team_name': 42, 'founded': '2020-01-02', 'wins': '3',
+        'earnings': 1.5, 'region': 'EU', 'created_at': '2024-05-06T07:08:09',
+    })
+    assert entry == {
+        'team_id': 'T1', 'team_name': '42', 'founded': date(2020, 1, 2), 'wins': 3,
+        'earnings': Decimal('1.5'), 'region': 'EU', 'created_at': datetime(2024, 5, 6, 7, 8, 9),
+    }
+
+
+def test_validate_collects_every_error(schema):
+    with pytest.raises(SchemaError) as e:
+        schema.validate('team', {
+            'team_name': 'too long', 'wins': 1.5, 'region': 'APAC', 'founded': 'soon', 'color': 'red',
+        })
+    errors = e.value.errors
+    assert 'Unknown column: color' in errors
+    assert 'wins: expected an integer' in errors
+    assert 'team_name: longer than 5 characters' in errors
+    assert 'region: expected one of EU, NA' in errors
+    assert any(error.startswith('founded:') for error in errors)
+    assert 'Missing required column: team_id' in errors
+
+
+def test_defaults_and_partial_updates(schema):
+    # wins has a default and player_id is auto_increment, so neither is required
+    assert schema.validate('team', {'team_id': 'T1', 'team_name': 'A'}) == {'team_id': 'T1', 'team_name': 'A'}
+    assert schema.validate('player', {'team_id': None}) == {'team_id': None}
+    assert schema.validate('team', {'wins': 2}, partial=True) == {'wins': 2}
+    with pytest.raises(SchemaError):
+        schema.validate('team', {'team_name': None}, partial=True)
+    with pytest.raises(SchemaError):
+        schema.validate('team', {}, partial=True)
@@ -0,0 +1,85 @@
+from search import FULL_PREFIX, WORD_PREFIX, SearchIndex, normalize
+
+
+class FakeCursor:
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._rows = []
+
+    def execute(self, query, params=()):
+        table = query.split(' FROM ')[1].split()[0]
+        rows = self.tables.get(table, [])
+        if params:
+            key = next(iter(rows[0])) if rows else None
+            rows = [row for row in rows if row[key] in params]
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def build(teams=(), players=()):
+    index = SearchIndex()
+    index.load(FakeCursor({
+        'Team': [{'team_id': id, 'team_name': name} for id, name in teams],
+        'Player': [{'player_id': id, 'player_username': name, 'player_real_name': real,
+                    'player_aliases': None} for id, name, real in players],
+    }))
+    return index
+
+
+def test_normalize_folds_case_and_accents():
+    assert normalize('  Ñoño ÉLITE ') == 'nono elite'
+
+
+def test_whole_name_beats_word_prefix():
+    index = build(teams=[('T1', 'Team Faker'), ('T2', 'Fnatic')])
+    results = index.search('f')
+    assert [r['id'] for r in results] == ['T2', 'T1']
+    assert results[0]['score'] == FULL_PREFIX
+    assert results[1]['score'] == WORD_PREFIX
+
+
+def test_whole_name_match_late_in_the_alphabet_is_found():
+    # More word-prefix candidates than limit * 4, all sorting before the whole-name match
+    teams = [(f'C{i:02d}', f'Club Fa{chr(97 + i % 26)}{i:02d}') for i in range(60)]
+    index = build(teams=teams + [('T99', 'Faze')])
+    results = index.search('fa', limit=5)
+    assert results[0]['id'] == 'T99'
+    assert results[0]['score'] == FULL_PREFIX
+    assert len(results) == 5
+
+
+def test_shorter_name_ranks_first_among_equal_scores():
+    index = build(teams=[('T1', 'Faze Clan'), ('T2', 'Faze')])
+    assert [r['id'] for r in index.search('faz')] == ['T2', 'T1']
+
+
+def test_kinds_and_fields():
+    index = build(teams=[('T1', 'Sang Team')], players=[('P1', 'Faker', 'Lee Sang-hyeok')])
+    results = index.search('sang', kinds={'player'})
+    assert [(r['kind'], r['id'], r['name'], r['field']) for r in results] == \
+        [('player', 'P1', 'Faker', 'player_real_name')]
+
+
+def test_trigram_fallback_finds_typos():
+    index = build(teams=[('T1', 'Fnatic')])
+    results = index.search('fnatc')
+    assert [r['id'] for r in results] == ['T1']
+    assert results[0]['score'] < WORD_PREFIX
+
+
+def test_refresh_adds_renames_and_drops():
+    tables = {'Team': [{'team_id': 'T1', 'team_name': 'Fnatic'}]}
+    index = SearchIndex()
+    index.load(FakeCursor(tables))
+    tables['Team'] = [{'team_id': 'T1', 'team_name': 'Vitality'}, {'team_id': 'T2', 'team_name': 'Fnatic Rising'}]
+    index.refresh(FakeCursor(tables), 'team', ['T1', 'T2'])
+    assert [r['id'] for r in index.search('vit')] == ['T1']
+    assert [r['id'] for r in index.search('fnatic')] == ['T2']
+    tables['Team'] = []
+    index.refresh(FakeCursor(tables), 'team', ['T1', 'T2'])
+    assert index.search('vit') == []
+    assert index.stats()['entries'] == 0
+    assert index.stats()['prefix_terms'] == 0
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+import snapshot
+
+
+def write(path, rows=None):
+    writer = snapshot.SnapshotWriter(str(path))
+    rows = rows if rows is not None else [
+        ('B', b'{"name":"b1"}'), ('A', b'{"name":"a1"}'), ('B', b'{"name":"b2"}'), (None, b'{"name":"x"}'),
+    ]
+    writer.add('teams', 'exact', rows, columns=['name'])
+    writer.add('by_time', 'range', [('2024-01-0%d' % day, b'%d' % day) for day in (3, 1, 2)])
+    writer.finish({'source': 'test'})
+    return writer.build_id
+
+
+# Rewrite the header of a snapshot file with edit(header) applied
+def edit_header(path, edit):
+    data = bytearray(open(path, 'rb').read())
+    offset = int.from_bytes(data[-16:-8], 'little')
+    header = json.loads(bytes(data[offset:-16]))
+    edit(header)
+    encoded = json.dumps(header).encode()
+    with open(path, 'wb') as f:
+        f.write(bytes(data[:offset]) + encoded + offset.to_bytes(8, 'little') + snapshot.MAGIC)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'snap.bin'
+    build_id = write(path)
+    snap = snapshot.Snapshot(str(path))
+    assert snap.build_id == build_id
+    assert snap.header['meta'] == {'source': 'test'}
+    teams = snap.dataset('teams')
+    assert teams.rows == 4
+    assert teams.columns == ['name']
+    assert teams.lookup('B') == [b'{"name":"b1"}', b'{"name":"b2"}']
+    assert teams.lookup('A') == [b'{"name":"a1"}']
+    assert teams.lookup('C') == []
+    assert teams.row(3) == b'{"name":"x"}'
+    assert snap.dataset('by_time').range_from('2024-01-02') == [b'2', b'3']
+    with pytest.raises(KeyError):
+        snap.dataset('missing')
+    snap.close()
+
+
+def test_empty_dataset(tmp_path):
+    path = tmp_path / 'snap.bin'
+    write(path, rows=[])
+    snap = snapshot.Snapshot(str(path))
+    assert snap.dataset('teams').lookup('A') == []
+    snap.close()
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / 'snap.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        snapshot.Snapshot(str(path))
+
+
+def test_bad_section_length_releases_the_map(tmp_path):
+    path = tmp_path / 'snap.bin'
+    write(path)
+
+    def shorten(header):
+        header['datasets']['teams']['row_offsets'][1] -= 3
+    edit_header(str(path), shorten)
+    with pytest.raises(TypeError):
+        snapshot.Snapshot(str(path))
+
+
+def test_reload_keeps_serving_after_a_bad_file(tmp_path):
+    path = tmp_path / 'snap.bin'
+    first = write(path)
+    holder = snapshot.SnapshotHolder(str(path), poll_interval=0)
+
+    bad = tmp_path / 'bad.bin'
+    write(bad)
+    edit_header(str(bad), lambda header: header['datasets']['by_time']['postings'].__setitem__(1, 5))
+    os.replace(bad, path)
+    assert holder.reload() is False
+    assert holder.current.build_id == first
+    assert 'TypeError' in holder.last_error
+
+    second = write(path)
+    assert holder.reload() is True
+    assert holder.current.build_id == second
+    assert holder.last_error is None
+    assert holder.swaps == 1
+
+
+def test_writer_replaces_atomically(tmp_path):
+    path = tmp_path / 'snap.bin'
+    write(path)
+    writer = snapshot.SnapshotWriter(str(path))
+    writer.add('teams', 'exact', [('A', b'new')])
+    writer.abort()
+    assert snapshot.Snapshot(str(path)).dataset('teams').lookup('A') == [b'{"name":"a1"}']
+    assert os.listdir(tmp_path) == ['snap.bin']
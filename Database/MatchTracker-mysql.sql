@@ -1,5 +1,7 @@
 -- SJSU CMPE 138 FALL 2025 TEAM7 --
 -- Match Maker Database -- 
+-- Includes everything in migrations/001-003; those scripts are only for
+-- databases created from an older copy of this file.
 -- DROP & CREATE TABLE --
 DROP DATABASE IF EXISTS MatchTracker;
 CREATE DATABASE MatchTracker;
@@ -292,6 +294,77 @@ CREATE VIEW TeamWins AS
 --     ORDER BY T.tournament_schedule DESC;
 
 
+-- MATERIALIZED STANDINGS --
+-- Precomputed copies of the TeamWins and PlacementPoints views, read by
+-- /getTeamWins and /getPlacementPoints and kept current by the app's writes
+-- (same as migrations/002_standings.sql; filled at the end of this script).
+CREATE TABLE IF NOT EXISTS SchemaMigration(
+    version     INT PRIMARY KEY,
+    description VARCHAR(100) NOT NULL,
+    applied_at  DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE TeamWinsSummary(
+    team_id         VARCHAR(6),
+    tournament_id   VARCHAR(6),
+    team_name       VARCHAR(50) NOT NULL,
+    tournament_name VARCHAR(50),
+    wins            INT NOT NULL,
+
+    PRIMARY KEY (team_id, tournament_id),
+    INDEX idx_teamwins_team (team_name, wins)
+);
+
+CREATE TABLE TournamentStandings(
+    placement_id           VARCHAR(6) PRIMARY KEY,
+    tournament_id          VARCHAR(6),
+    tournament_name        VARCHAR(50),
+    team_id                VARCHAR(6),
+    team_name              VARCHAR(50) NOT NULL,
+    placement_rank         TEXT,
+    placement_points       VARCHAR(3),
+    placement_prize_amount DECIMAL(8,2),
+
+    INDEX idx_standings_tournament (tournament_name, placement_rank(20))
+);
+
+-- TEAM RATINGS --
+-- Elo checkpoints written by Backend/ratings.py (same as migrations/003_ratings.sql)
+CREATE TABLE TeamRating(
+    game_id VARCHAR(6),
+    team_id VARCHAR(6),
+    rating  DOUBLE NOT NULL,
+    matches INT NOT NULL,
+
+    PRIMARY KEY (game_id, team_id),
+    INDEX idx_teamrating_game_rating (game_id, rating)
+);
+
+CREATE TABLE RatingCheckpoint(
+    checkpoint_id   INT PRIMARY KEY,
+    last_match_time DATETIME,
+    last_match_id   VARCHAR(6),
+    matches_rated   INT NOT NULL,
+    params          TEXT NOT NULL,
+    fingerprint     MEDIUMTEXT,     -- per-game count and checksum of the matches it covers
+    created_at      DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- SECONDARY INDEXES --
+-- Lookups of the view endpoints and rating replays (migrations/001_view_indexes.sql,
+-- migrations/003_ratings.sql; see the comments there)
+CREATE INDEX idx_tournament_name ON Tournament (tournament_name);
+CREATE INDEX idx_tournament_schedule
+    ON Tournament (tournament_schedule, game_id, tournament_format, tournament_name);
+CREATE INDEX idx_tournament_format
+    ON Tournament (tournament_format, tournament_schedule, game_id, tournament_name);
+CREATE INDEX idx_team_name ON Team (team_name);
+CREATE INDEX idx_matchinfo_tournament_time
+    ON MatchInfo (tournament_id, match_date_time, team1_id, team2_id, match_winner_id, match_rounds);
+CREATE INDEX idx_matchinfo_winner_tournament ON MatchInfo (match_winner_id, tournament_id);
+CREATE INDEX idx_matchinfo_game_time ON MatchInfo (game_id, match_date_time, match_id);
+CREATE INDEX idx_matchinfo_time ON MatchInfo (match_date_time, match_id);
+
 -- Populating The Tables --
 -- Games -- 
 INSERT INTO Game (game_id, game_name, game_rules, game_team_size) VALUES
@@ -532,4 +605,29 @@ INSERT INTO MatchCommentator (match_id, commentator_id) VALUES
 ('M002','C001'),
 ('M003','C002'),
 ('M004','C005'),
-('M005','C004');
\ No newline at end of file
+('M005','C004');
+
+
+-- =========================
+-- 9) Fill the materialized standings from the rows above
+-- =========================
+INSERT INTO TeamWinsSummary (team_id, tournament_id, team_name, tournament_name, wins)
+    SELECT M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name, COUNT(*)
+    FROM MatchInfo M
+    INNER JOIN Team TM ON M.match_winner_id = TM.team_id
+    INNER JOIN Tournament T ON M.tournament_id = T.tournament_id
+    GROUP BY M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name;
+
+INSERT INTO TournamentStandings (placement_id, tournament_id, tournament_name, team_id,
+                                 team_name, placement_rank, placement_points,
+                                 placement_prize_amount)
+    SELECT P.placement_id, P.tournament_id, T.tournament_name, P.team_id, TM.team_name,
+           P.placement_rank, P.placement_points, P.placement_prize_amount
+    FROM Placement P
+    INNER JOIN Team TM ON P.team_id = TM.team_id
+    INNER JOIN Tournament T ON P.tournament_id = T.tournament_id;
+
+INSERT INTO SchemaMigration (version, description) VALUES
+(1, 'secondary indexes for the view lookups'),
+(2, 'materialized team wins and tournament standings'),
+(3, 'team rating checkpoints');
@@ -0,0 +1,56 @@
+-- SJSU CMPE 138 FALL 2025 TEAM7 --
+-- Migration 001: secondary indexes for the view lookups --
+-- For a MatchTracker database created from an older MatchTracker-mysql.sql.
+-- Safe to run again: indexes that already exist are skipped.
+USE MatchTracker;
+
+-- Applied migrations are recorded here so app.py can tell what a database has
+CREATE TABLE IF NOT EXISTS SchemaMigration(
+    version     INT PRIMARY KEY,
+    description VARCHAR(100) NOT NULL,
+    applied_at  DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- MySQL has no CREATE INDEX IF NOT EXISTS; this adds an index only if the
+-- table does not have one by that name yet
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+DELIMITER //
+CREATE PROCEDURE add_index_if_missing(p_table VARCHAR(64), p_index VARCHAR(64), p_columns VARCHAR(255))
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index) THEN
+        SET @add_index = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_columns, ')');
+        PREPARE add_index FROM @add_index;
+        EXECUTE add_index;
+        DEALLOCATE PREPARE add_index;
+    END IF;
+END //
+DELIMITER ;
+
+-- /getPlacementPoints, /getMatchesInTournament, /getTeamsInTournament, /getTeamWins
+-- look tournaments up by name. InnoDB secondary indexes carry the primary key,
+-- so this covers the name -> tournament_id step of every view join.
+CALL add_index_if_missing('Tournament', 'idx_tournament_name', 'tournament_name');
+
+-- /upcomingTournaments: range on schedule, covering the columns UpcomingTournament reads
+CALL add_index_if_missing('Tournament', 'idx_tournament_schedule',
+    'tournament_schedule, game_id, tournament_format, tournament_name');
+
+-- /getFormat: equality on format, covering the columns UpcomingTournament reads
+CALL add_index_if_missing('Tournament', 'idx_tournament_format',
+    'tournament_format, tournament_schedule, game_id, tournament_name');
+
+-- /getTeamWins looks teams up by name
+CALL add_index_if_missing('Team', 'idx_team_name', 'team_name');
+
+-- TournamentMatches: matches of one tournament in schedule order, covering the team columns
+CALL add_index_if_missing('MatchInfo', 'idx_matchinfo_tournament_time',
+    'tournament_id, match_date_time, team1_id, team2_id, match_winner_id, match_rounds');
+
+-- TeamWins: wins of one team grouped by tournament
+CALL add_index_if_missing('MatchInfo', 'idx_matchinfo_winner_tournament', 'match_winner_id, tournament_id');
+
+DROP PROCEDURE add_index_if_missing;
+
+INSERT IGNORE INTO SchemaMigration (version, description)
+VALUES (1, 'secondary indexes for the view lookups');
@@ -0,0 +1,54 @@
+-- SJSU CMPE 138 FALL 2025 TEAM7 --
+-- Migration 002: materialized team wins and tournament standings --
+-- Precomputed copies of the TeamWins and PlacementPoints views. app.py keeps
+-- them current on every MatchInfo / Placement / Team / Tournament write;
+-- `flask --app app rebuild-standings` recomputes them from scratch.
+-- MatchTracker-mysql.sql creates both tables already; on such a database this
+-- only refills them.
+USE MatchTracker;
+
+CREATE TABLE IF NOT EXISTS TeamWinsSummary(
+    team_id         VARCHAR(6),
+    tournament_id   VARCHAR(6),
+    team_name       VARCHAR(50) NOT NULL,
+    tournament_name VARCHAR(50),
+    wins            INT NOT NULL,
+
+    PRIMARY KEY (team_id, tournament_id),
+    INDEX idx_teamwins_team (team_name, wins)
+);
+
+CREATE TABLE IF NOT EXISTS TournamentStandings(
+    placement_id           VARCHAR(6) PRIMARY KEY,
+    tournament_id          VARCHAR(6),
+    tournament_name        VARCHAR(50),
+    team_id                VARCHAR(6),
+    team_name              VARCHAR(50) NOT NULL,
+    placement_rank         TEXT,           -- same type as Placement.placement_rank
+    placement_points       VARCHAR(3),
+    placement_prize_amount DECIMAL(8,2),
+
+    INDEX idx_standings_tournament (tournament_name, placement_rank(20))
+);
+
+DELETE FROM TeamWinsSummary;
+DELETE FROM TournamentStandings;
+
+INSERT INTO TeamWinsSummary (team_id, tournament_id, team_name, tournament_name, wins)
+    SELECT M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name, COUNT(*)
+    FROM MatchInfo M
+    INNER JOIN Team TM ON M.match_winner_id = TM.team_id
+    INNER JOIN Tournament T ON M.tournament_id = T.tournament_id
+    GROUP BY M.match_winner_id, M.tournament_id, TM.team_name, T.tournament_name;
+
+INSERT INTO TournamentStandings (placement_id, tournament_id, tournament_name, team_id,
+                                 team_name, placement_rank, placement_points,
+                                 placement_prize_amount)
+    SELECT P.placement_id, P.tournament_id, T.tournament_name, P.team_id, TM.team_name,
+           P.placement_rank, P.placement_points, P.placement_prize_amount
+    FROM Placement P
+    INNER JOIN Team TM ON P.team_id = TM.team_id
+    INNER JOIN Tournament T ON P.tournament_id = T.tournament_id;
+
+INSERT IGNORE INTO SchemaMigration (version, description)
+VALUES (2, 'materialized team wins and tournament standings');
@@ -0,0 +1,53 @@
+-- SJSU CMPE 138 FALL 2025 TEAM7 --
+-- Migration 003: team rating checkpoints --
+-- Per-game Elo ratings as of the last checkpoint written by Backend/ratings.py.
+-- On startup the app loads them and rates only matches newer than the
+-- checkpoint instead of replaying all of MatchInfo. They are filled in the
+-- first time the app runs; `flask --app app rebuild-ratings` replays from scratch.
+-- Safe to run again: what already exists is skipped.
+USE MatchTracker;
+
+CREATE TABLE IF NOT EXISTS TeamRating(
+    game_id VARCHAR(6),
+    team_id VARCHAR(6),
+    rating  DOUBLE NOT NULL,
+    matches INT NOT NULL,
+
+    PRIMARY KEY (game_id, team_id),
+    INDEX idx_teamrating_game_rating (game_id, rating)
+);
+
+CREATE TABLE IF NOT EXISTS RatingCheckpoint(
+    checkpoint_id   INT PRIMARY KEY,
+    last_match_time DATETIME,
+    last_match_id   VARCHAR(6),
+    matches_rated   INT NOT NULL,
+    params          TEXT NOT NULL,
+    fingerprint     MEDIUMTEXT,     -- per-game count and checksum of the matches it covers
+    created_at      DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- MySQL has no CREATE INDEX IF NOT EXISTS; this adds an index only if the
+-- table does not have one by that name yet
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+DELIMITER //
+CREATE PROCEDURE add_index_if_missing(p_table VARCHAR(64), p_index VARCHAR(64), p_columns VARCHAR(255))
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index) THEN
+        SET @add_index = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_columns, ')');
+        PREPARE add_index FROM @add_index;
+        EXECUTE add_index;
+        DEALLOCATE PREPARE add_index;
+    END IF;
+END //
+DELIMITER ;
+
+-- Replays read matches in time order, one game at a time when only part of the history changed
+CALL add_index_if_missing('MatchInfo', 'idx_matchinfo_game_time', 'game_id, match_date_time, match_id');
+CALL add_index_if_missing('MatchInfo', 'idx_matchinfo_time', 'match_date_time, match_id');
+
+DROP PROCEDURE add_index_if_missing;
+
+INSERT IGNORE INTO SchemaMigration (version, description)
+VALUES (3, 'team rating checkpoints');